@@ -1,18 +1,335 @@
 from __future__ import annotations
 
+import atexit
+import gzip
 import json
-from datetime import datetime
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional
 
+from telemetry import metrics
 
-def save_alert_log(alert: Dict[str, Any], output_dir: str = "results") -> str:
-    Path(f"{output_dir}/logs").mkdir(parents=True, exist_ok=True)
+INDEX_NAME = "index.jsonl"
+
+
+def _segment_name(seq: int) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return f"alerts-{stamp}-{os.getpid()}-{seq:04d}.jsonl"
+
+
+class AlertLog:
+    """
+    Log de alertas append-only em segmentos JSONL (<log_dir>/alerts-*.jsonl).
+
+    - append() só enfileira a linha em memória; um lote é escrito e
+      fsync'ado a cada flush_every alertas ou flush_interval_s segundos
+      (thread de fundo), e sempre em flush()/close() e na saída do processo.
+      Até lá, uma queda (SIGKILL, falta de energia) perde os alertas
+      enfileirados: esse lote é para gravações em alta taxa. Com
+      append(alert, durable=True) o alerta já está no disco (fsync) quando
+      a chamada volta — é o que save_alert_log usa.
+      Cada registro ganha "seq" (crescente) e "ts"/"logged_at" com
+      microssegundos, então alertas no mesmo segundo nunca se sobrescrevem.
+    - O segmento ativo é fechado ao passar de max_segment_bytes ou
+      max_segment_age_s; com compress=True, os fechados viram .jsonl.gz
+      numa thread à parte.
+    - index.jsonl guarda uma linha por segmento fechado (primeiro/último ts,
+      contagem), então query(start_ts, end_ts) só abre os segmentos que
+      cruzam o intervalo. Segmentos deixados sem índice por um processo que
+      morreu são indexados ao abrir o log.
+    """
+
+    def __init__(
+        self,
+        log_dir: str = "results/logs/alerts",
+        flush_every: int = 256,
+        flush_interval_s: float = 1.0,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_age_s: float = 3600.0,
+        compress: bool = True,
+    ) -> None:
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self.flush_interval_s = flush_interval_s
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age_s = max_segment_age_s
+        self.compress = compress
+
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._pending_first_ts: Optional[float] = None
+        self._pending_last_ts: Optional[float] = None
+        self._seq = 0
+        self._segment_seq = 0
+        self._file = None
+        self._segment: Optional[Path] = None
+        self._segment_opened = 0.0
+        self._segment_info: Dict[str, Any] = {}
+        self._compressions: List[threading.Thread] = []
+        self._closed = False
+
+        self._recover()
+
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="alert-log-flush", daemon=True)
+        self._flusher.start()
+
+    # ---- escrita ----
+
+    def append(self, alert: Dict[str, Any], durable: bool = False) -> str:
+        """
+        Enfileira o alerta e devolve o caminho do segmento em que ele será
+        gravado; com durable=True grava (com fsync) o lote pendente antes de voltar.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("AlertLog já foi fechado")
+            now = time.time()  # dentro do lock: ts cresce junto com seq
+            self._seq += 1
+            record = dict(alert)
+            record["seq"] = self._seq
+            record["ts"] = now
+            record["logged_at"] = datetime.fromtimestamp(now, timezone.utc).isoformat()
+            self._pending.append(json.dumps(record, ensure_ascii=False, default=str))
+            if self._pending_first_ts is None:
+                self._pending_first_ts = now
+            self._pending_last_ts = now
+
+            if self._segment is None:
+                self._open_segment()
+            segment = str(self._segment)
+            if durable or len(self._pending) >= self.flush_every:
+                self._flush_locked()
+        return segment
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._close_segment()
+            self._closed = True
+        self._stop.set()
+        self._flusher.join()
+        for t in self._compressions:
+            t.join()
+
+    def __enter__(self) -> "AlertLog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval_s):
+            with self._lock:
+                if self._closed:
+                    return
+                self._flush_locked()
+                if self._segment is not None and time.time() - self._segment_opened >= self.max_segment_age_s:
+                    self._close_segment()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        if self._segment is None:
+            self._open_segment()
+
+        data = ("\n".join(self._pending) + "\n").encode("utf-8")
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        info = self._segment_info
+        if info["first_ts"] is None:
+            info["first_ts"] = self._pending_first_ts
+        info["last_ts"] = self._pending_last_ts
+        info["count"] += len(self._pending)
+        info["bytes"] += len(data)
+        self._pending.clear()
+        self._pending_first_ts = self._pending_last_ts = None
+
+        if info["bytes"] >= self.max_segment_bytes:
+            self._close_segment()
+
+    def _open_segment(self) -> None:
+        self._segment_seq += 1
+        self._segment = self.log_dir / _segment_name(self._segment_seq)
+        self._file = open(self._segment, "ab")
+        self._segment_opened = time.time()
+        self._segment_info = {"first_ts": None, "last_ts": None, "count": 0, "bytes": 0}
+
+    def _close_segment(self) -> None:
+        if self._segment is None:
+            return
+        self._file.close()
+        segment, info = self._segment, self._segment_info
+        self._file = self._segment = None
+
+        if info["count"] == 0:
+            segment.unlink(missing_ok=True)
+            return
+        self._finish_segment(segment, info)
 
-    ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    out_path = Path(output_dir) / "logs" / f"alert_{ts}.json"
+    def _finish_segment(self, segment: Path, info: Dict[str, Any]) -> None:
+        name = segment.name + (".gz" if self.compress else "")
+        with open(self.log_dir / INDEX_NAME, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"segment": name, **info}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
 
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump(alert, f, ensure_ascii=False, indent=2)
+        if self.compress:
+            t = threading.Thread(target=_compress_segment, args=(segment,), name="alert-log-gzip")
+            t.start()
+            self._compressions = [c for c in self._compressions if c.is_alive()] + [t]
 
-    return str(out_path)
+    def _recover(self) -> None:
+        """Indexa (e comprime) segmentos .jsonl que ficaram sem índice."""
+        indexed = {e["segment"] for e in self._read_index()}
+        for segment in sorted(self.log_dir.glob("alerts-*.jsonl")):
+            if _owned_by_live_process(segment):
+                continue
+            gz_name = segment.name + ".gz"
+            if segment.name in indexed or gz_name in indexed:
+                if gz_name in indexed:
+                    # compressão interrompida: refaz, ou só apaga o original se o .gz já existe
+                    if (self.log_dir / gz_name).exists():
+                        segment.unlink()
+                    else:
+                        _compress_segment(segment)
+                continue
+
+            info = {"first_ts": None, "last_ts": None, "count": 0, "bytes": segment.stat().st_size}
+            for record in _read_records(segment):
+                ts = record.get("ts")
+                if info["first_ts"] is None:
+                    info["first_ts"] = ts
+                info["last_ts"] = ts
+                info["count"] += 1
+            if info["count"]:
+                self._finish_segment(segment, info)
+            else:
+                segment.unlink()
+
+    # ---- leitura ----
+
+    def _read_index(self) -> List[Dict[str, Any]]:
+        index_path = self.log_dir / INDEX_NAME
+        if not index_path.exists():
+            return []
+        with open(index_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def query(self, start_ts: Optional[float] = None, end_ts: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Alertas com ts em [start_ts, end_ts] (epoch, limites None = sem limite), em ordem de gravação."""
+        self.flush()
+
+        def overlaps(first: Optional[float], last: Optional[float]) -> bool:
+            if first is None:
+                return False
+            return (end_ts is None or first <= end_ts) and (start_ts is None or last >= start_ts)
+
+        segments = [
+            self.log_dir / e["segment"]
+            for e in self._read_index()
+            if overlaps(e.get("first_ts"), e.get("last_ts"))
+        ]
+        with self._lock:
+            if self._segment is not None and overlaps(self._segment_info["first_ts"], self._segment_info["last_ts"]):
+                segments.append(self._segment)
+
+        for segment in segments:
+            for record in _read_records(segment):
+                ts = record.get("ts", 0.0)
+                if (start_ts is None or ts >= start_ts) and (end_ts is None or ts <= end_ts):
+                    yield record
+
+
+def _owned_by_live_process(segment: Path) -> bool:
+    """Segmento ainda aberto por outro processo vivo (alerts-<stamp>-<pid>-<seq>.jsonl)?"""
+    try:
+        pid = int(segment.stem.split("-")[2])
+    except (IndexError, ValueError):
+        return False
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _open_segment_for_read(segment: Path):
+    # um segmento indexado como .gz pode ainda estar sendo comprimido (e vice-versa)
+    candidates = [segment, segment.with_suffix("")] if segment.suffix == ".gz" else [segment, segment.with_name(segment.name + ".gz")]
+    for path in candidates:
+        try:
+            if path.suffix == ".gz":
+                return gzip.open(path, "rt", encoding="utf-8")
+            return open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            continue
+    raise FileNotFoundError(f"Segmento de alertas não encontrado: {segment}")
+
+
+def _read_records(segment: Path) -> Iterator[Dict[str, Any]]:
+    with _open_segment_for_read(segment) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # linha truncada por uma queda no meio da escrita: o resto do segmento é válido
+                continue
+
+
+def _compress_segment(segment: Path) -> None:
+    gz_path = segment.with_name(segment.name + ".gz")
+    tmp_path = gz_path.with_name(gz_path.name + ".tmp")
+    with open(segment, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp_path, gz_path)
+    segment.unlink()
+
+
+_logs: Dict[str, AlertLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_alert_log(output_dir: str = "results") -> AlertLog:
+    """AlertLog compartilhado de <output_dir>/logs/alerts (um por diretório, fechado na saída)."""
+    log_dir = str(Path(output_dir) / "logs" / "alerts")
+    with _logs_lock:
+        log = _logs.get(log_dir)
+        if log is None:
+            log = _logs[log_dir] = AlertLog(log_dir)
+        return log
+
+
+@atexit.register
+def _close_logs() -> None:
+    for log in list(_logs.values()):
+        log.close()
+
+
+@metrics.timed("alerts.save")
+def save_alert_log(alert: Dict[str, Any], output_dir: str = "results") -> str:
+    """
+    Grava o alerta no log append-only de output_dir e devolve o caminho do
+    segmento; quando volta, o alerta já está no disco.
+    """
+    return get_alert_log(output_dir).append(alert, durable=True)
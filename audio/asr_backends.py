@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import speech_recognition as sr
+from pydub import AudioSegment
+
+from audio.vad import segment_to_samples
+from telemetry import metrics
+
+# Entrada/saída dos backends
+SpeechSpan = Tuple[float, float, AudioSegment]  # (start_s, end_s, trecho)
+Transcript = Tuple[str, float, float]  # (texto, start_s, end_s)
+
+ASR_BACKENDS = ("google", "torchaudio", "fake")
+
+
+class TransientASRError(RuntimeError):
+    """Falha temporária (rede, timeout, erro simulado): o trecho é tentado de novo."""
+
+
+def segment_to_audio_data(piece: AudioSegment) -> sr.AudioData:
+    """
+    Converte um trecho do pydub direto em sr.AudioData (PCM mono em memória),
+    sem passar por WAV temporário.
+    """
+    piece = piece.set_channels(1)
+    # sr.AudioData espera PCM com sinal; o WAV de 8 bits é sem sinal
+    if piece.sample_width == 1:
+        piece = piece.set_sample_width(2)
+    return sr.AudioData(piece.raw_data, piece.frame_rate, piece.sample_width)
+
+
+class ASRBackend:
+    """
+    Interface dos reconhecedores de fala: transcribe(segments) -> [(texto, start_s, end_s)].
+
+    A implementação base chama recognize_one() para cada trecho — em paralelo
+    quando max_workers > 1 — com até max_retries novas tentativas (backoff
+    exponencial) em TransientASRError/timeout, e devolve os textos na ordem
+    cronológica dos trechos. Trechos sem fala reconhecida voltam com texto "".
+    """
+
+    name = "base"
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        timeout_s: float = 10.0,
+        max_retries: int = 2,
+        retry_backoff_s: float = 0.5,
+    ) -> None:
+        self.max_workers = max_workers
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+
+    def recognize_one(self, piece: AudioSegment, language: str, index: int) -> str:
+        raise NotImplementedError
+
+    def _recognize_with_retry(self, piece: AudioSegment, language: str, index: int) -> str:
+        for attempt in range(self.max_retries + 1):
+            try:
+                with metrics.timer(f"audio.asr_chunk.{self.name}"):
+                    return self.recognize_one(piece, language, index).strip()
+            except (TransientASRError, socket.timeout, TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise RuntimeError(f"Erro no reconhecimento de fala ({self.name}): {e}") from e
+                metrics.count("audio.asr_retries")
+                time.sleep(self.retry_backoff_s * (2 ** attempt))
+        return ""
+
+    def transcribe(
+        self,
+        segments: Sequence[SpeechSpan],
+        language: str = "en-US",
+        first_index: int = 0,
+    ) -> List[Transcript]:
+        """first_index numera os trechos quando a lista é um lote de uma sequência maior."""
+
+        def _one(item: Tuple[int, SpeechSpan]) -> str:
+            index, (_, _, piece) = item
+            return self._recognize_with_retry(piece, language, index)
+
+        items = list(enumerate(segments, start=first_index))
+        if self.max_workers > 1 and len(items) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"asr-{self.name}") as pool:
+                texts = list(pool.map(_one, items))  # map preserva a ordem
+        else:
+            texts = [_one(item) for item in items]
+
+        return [(text, start_s, end_s) for text, (start_s, end_s, _) in zip(texts, segments)]
+
+
+class GoogleASRBackend(ASRBackend):
+    """Google Web Speech via SpeechRecognition (precisa de rede)."""
+
+    name = "google"
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._recognizer = sr.Recognizer()
+        self._recognizer.operation_timeout = self.timeout_s
+
+    def recognize_one(self, piece: AudioSegment, language: str, index: int) -> str:
+        try:
+            return self._recognizer.recognize_google(segment_to_audio_data(piece), language=language)
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError as e:
+            raise TransientASRError(str(e)) from e
+
+
+class TorchaudioASRBackend(ASRBackend):
+    """
+    Reconhecimento offline com wav2vec2 (torchaudio.pipelines, inglês).
+
+    Os pesos precisam estar disponíveis localmente: em weights_path (state dict
+    salvo com torch.save; padrão: $AUDIO_ASR_WEIGHTS) ou no cache do torch hub
+    (baixados antes, com rede).
+    Roda em CPU, um trecho por vez, com decodificação CTC gulosa.
+    """
+
+    name = "torchaudio"
+
+    def __init__(
+        self,
+        weights_path: Optional[str] = None,
+        bundle_name: str = "WAV2VEC2_ASR_BASE_960H",
+        **kwargs: Any,
+    ) -> None:
+        kwargs["max_workers"] = 1
+        super().__init__(**kwargs)
+
+        # Import aqui pra não obrigar torch/torchaudio nos outros backends
+        import torch
+        import torchaudio
+
+        self._torch = torch
+        self._resample = torchaudio.functional.resample
+
+        bundle = getattr(torchaudio.pipelines, bundle_name)
+        weights_path = weights_path or os.getenv("AUDIO_ASR_WEIGHTS")
+        if weights_path:
+            if not Path(weights_path).exists():
+                raise FileNotFoundError(f"Pesos do ASR local não encontrados: {weights_path}")
+            # mesma arquitetura do bundle, pesos do arquivo local
+            model = torchaudio.models.wav2vec2_model(**bundle._params)
+            model.load_state_dict(torch.load(weights_path, map_location="cpu"))
+        else:
+            cached = Path(torch.hub.get_dir()) / "checkpoints" / Path(bundle._path).name
+            if not cached.exists():
+                raise RuntimeError(
+                    f"Pesos do {bundle_name} não estão no cache ({cached}); "
+                    f"baixe-os antes ou informe weights_path."
+                )
+            model = bundle.get_model()
+
+        self._model = model.eval()
+        self._sample_rate = int(bundle.sample_rate)
+        self._labels = bundle.get_labels()
+
+    def recognize_one(self, piece: AudioSegment, language: str, index: int) -> str:
+        if not language.lower().startswith("en"):
+            raise ValueError(f"O ASR local ({self.name}) só suporta inglês (recebido: {language})")
+
+        torch = self._torch
+        wav = torch.from_numpy(segment_to_samples(piece))[None]
+        if piece.frame_rate != self._sample_rate:
+            wav = self._resample(wav, piece.frame_rate, self._sample_rate)
+
+        with torch.inference_mode():
+            emissions, _ = self._model(wav)
+
+        # CTC guloso: colapsa repetições e remove o "blank" (índice 0)
+        ids = torch.unique_consecutive(emissions[0].argmax(dim=-1)).tolist()
+        text = "".join(self._labels[i] for i in ids if i != 0)
+        return " ".join(text.replace("|", " ").split()).lower()
+
+
+class FakeASRBackend(ASRBackend):
+    """
+    Backend determinístico para testes e benchmarks (sem rede, sem modelo).
+
+    O i-ésimo trecho recebe texts[i % len(texts)] (ou "segment <i>"), após
+    latency_s de espera simulada. Com failure_rate > 0, a primeira tentativa
+    de uma fração (semeada) dos trechos falha, exercitando o retry.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        texts: Optional[Sequence[str]] = None,
+        latency_s: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.texts = list(texts or [])
+        self.latency_s = latency_s
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.calls = 0
+        self._failed: set = set()
+        self._lock = threading.Lock()
+
+    def recognize_one(self, piece: AudioSegment, language: str, index: int) -> str:
+        with self._lock:
+            self.calls += 1
+            fail = index not in self._failed and random.Random(self.seed * 1_000_003 + index).random() < self.failure_rate
+            if fail:
+                self._failed.add(index)
+
+        if self.latency_s > 0:
+            time.sleep(self.latency_s)
+        if fail:
+            raise TransientASRError(f"falha simulada no trecho {index}")
+
+        return self.texts[index % len(self.texts)] if self.texts else f"segment {index}"
+
+
+def get_asr_backend(backend: Union[str, ASRBackend] = "google", **kwargs: Any) -> ASRBackend:
+    """
+    Resolve o backend de ASR por nome ("google", "torchaudio", "fake") ou
+    devolve a instância recebida. kwargs vão para o construtor.
+    """
+    if isinstance(backend, ASRBackend):
+        return backend
+
+    classes: Dict[str, type] = {
+        "google": GoogleASRBackend,
+        "torchaudio": TorchaudioASRBackend,
+        "fake": FakeASRBackend,
+    }
+    if backend not in classes:
+        raise ValueError(f"Backend de ASR inválido: {backend} (opções: {', '.join(ASR_BACKENDS)})")
+    return classes[backend](**kwargs)
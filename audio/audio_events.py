@@ -10,4 +10,5 @@ class AudioEvent:
     event: str
     confidence: float
     timestamp: str
+    end_timestamp: Optional[str] = None  # fim do trecho de áudio, quando conhecido
     details: Optional[Dict[str, Any]] = None
@@ -1,10 +1,39 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
 
-import speech_recognition as sr
+import numpy as np
 from pydub import AudioSegment
+from pydub.utils import db_to_float, ratio_to_db
+
+from audio.asr_backends import ASRBackend, SpeechSpan, get_asr_backend
+from audio.pcm_stream import DEFAULT_CACHE_DIR, WavReader, extract_wav, extract_wav_cached
+from audio.vad import frame_features, segment_to_samples, speech_segments_from_features
+
+# frame do VAD (ms); os blocos lidos do WAV são múltiplos dele
+VAD_FRAME_MS = 30
+from telemetry import metrics
+
+
+def _merge_chunk_texts(chunk_texts: List[str], max_overlap_words: int = 6) -> str:
+    """
+    Junta as transcrições de chunks consecutivos. Como os chunks se sobrepõem,
+    o fim de um costuma repetir o começo do próximo: a maior sequência de
+    palavras (até max_overlap_words) que é sufixo do texto acumulado e prefixo
+    do chunk seguinte é mantida uma vez só.
+    """
+    merged: List[str] = []
+    for text in chunk_texts:
+        words = text.split()
+        limit = min(max_overlap_words, len(merged), len(words))
+        overlap = 0
+        for k in range(limit, 0, -1):
+            if [w.lower() for w in merged[-k:]] == [w.lower() for w in words[:k]]:
+                overlap = k
+                break
+        merged.extend(words[overlap:])
+    return " ".join(merged).strip()
 
 
 def extract_audio_features(
@@ -15,23 +44,53 @@ def extract_audio_features(
     chunk_ms: int = 4000,
     chunk_overlap_ms: int = 500,
     gain_db: int = 6,
+    max_workers: int = 1,
+    chunk_timeout_s: float = 10.0,
+    max_retries: int = 2,
+    retry_backoff_s: float = 0.5,
+    asr_backend: Union[str, ASRBackend] = "google",
+    debug_dump_dir: Optional[str] = None,
+    segmentation: str = "vad",
+    audio_cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+    block_s: float = 30.0,
 ) -> Dict[str, Any]:
     """
     Extrai e transcreve áudio para uso no pipeline multimodal.
 
     - Se audio_path for fornecido: usa diretamente esse WAV.
-    - Senão, se video_path for fornecido: extrai áudio do vídeo usando MoviePy para out_wav_path.
+    - Senão, se video_path for fornecido: extrai o áudio do vídeo via ffmpeg,
+      em blocos (ver audio/pcm_stream.py). Com audio_cache_dir o WAV fica num
+      cache indexado pelo hash do vídeo e não é extraído de novo; com
+      audio_cache_dir=None é escrito em out_wav_path.
 
     Depois:
     - normaliza + aplica ganho leve
-    - divide em chunks por tempo
-    - transcreve cada chunk via SpeechRecognition (Google Web Speech)
+    - segmenta (segmentation="vad": só trechos com fala, detectados por
+      energia/ZCR — ver audio/vad.py; "fixed": janelas de chunk_ms com
+      chunk_overlap_ms de sobreposição)
+    - transcreve cada trecho via SpeechRecognition (Google Web Speech)
+
+    asr_backend escolhe o reconhecedor (ver audio/asr_backends.py): "google"
+    (padrão, precisa de rede), "torchaudio" (offline, pesos locais), "fake"
+    (determinístico, para testes/benchmarks) ou uma instância de ASRBackend.
+    Quando passado por nome, o backend é criado com max_workers (trechos
+    transcritos em paralelo), chunk_timeout_s, max_retries e retry_backoff_s.
+    chunks_transcript continua em ordem cronológica, e no chunking fixo o
+    transcript junta os chunks removendo as palavras repetidas na sobreposição.
+
+    O WAV nunca é carregado inteiro: uma passada em blocos de block_s
+    segundos calcula o pico (normalização), a energia e as features do VAD,
+    e depois cada trecho é lido do arquivo só quando o seu lote vai para o
+    ASR. Os chunks não passam por disco (PCM do pydub entregue direto ao
+    backend); debug_dump_dir grava uma cópia de cada chunk em WAV para
+    depuração.
 
     Retorna um dict com:
       - wav_path
       - language
       - transcript
       - chunks_transcript
+      - segments (start_s, end_s, text de cada trecho com fala reconhecida)
       - num_chunks
       - audio_dbfs
     """
@@ -42,84 +101,131 @@ def extract_audio_features(
     if audio_path:
         wav_to_use = audio_path
     else:
-        # Extrair do vídeo para WAV
-        Path(out_wav_path).parent.mkdir(parents=True, exist_ok=True)
-
-        # Import aqui pra não obrigar MoviePy quando audio_path é usado
-        from moviepy.editor import VideoFileClip
-
-        clip = VideoFileClip(video_path)  # type: ignore[arg-type]
-        if clip.audio is None:
-            clip.close()
-            raise RuntimeError("O vídeo não possui faixa de áudio.")
-
-        clip.audio.write_audiofile(
-            out_wav_path,
-            fps=16000,
-            nbytes=2,
-            codec="pcm_s16le",
-            verbose=False,
-            logger=None,
-        )
-        clip.close()
-        wav_to_use = out_wav_path
+        # Extrair do vídeo para WAV (ffmpeg -> PCM em blocos, sem MoviePy)
+        with metrics.timer("audio.extract"):
+            if audio_cache_dir:
+                wav_to_use = extract_wav_cached(video_path, cache_dir=audio_cache_dir)  # type: ignore[arg-type]
+            else:
+                wav_to_use = extract_wav(video_path, out_wav_path)  # type: ignore[arg-type]
 
     wav_path_obj = Path(wav_to_use)
     if not wav_path_obj.exists():
         raise FileNotFoundError(f"WAV não encontrado: {wav_to_use}")
 
-    # 2) Carregar WAV e pré-processar (ajuda com fala baixa/ruído)
-    audio = AudioSegment.from_wav(str(wav_path_obj))
-    audio = audio.normalize()
-    if gain_db:
-        audio = audio + gain_db
-
-    # 3) Chunking por tempo fixo
-    recognizer = sr.Recognizer()
-
-    tmp_dir = Path("results/audio_outputs")
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-
-    chunk_texts: List[str] = []
-    num_chunks = 0
-
-    step = max(500, chunk_ms - chunk_overlap_ms)
-    for start in range(0, len(audio), step):
-        piece = audio[start:start + chunk_ms]
-        if len(piece) < 1200:
-            continue
-
-        # filtro simples: evita mandar “quase silêncio”
-        if piece.rms < 200:
-            continue
-
-        num_chunks += 1
-        chunk_path = tmp_dir / f"chunk_{num_chunks:03d}.wav"
-        piece.export(chunk_path, format="wav")
-
-        with sr.AudioFile(str(chunk_path)) as source:
-            # Ajusta ruído ambiente (pequeno trecho) e depois reconhece
-            recognizer.adjust_for_ambient_noise(source, duration=0.2)
-            audio_data = recognizer.record(source)
-
-        try:
-            text = recognizer.recognize_google(audio_data, language=language).strip()
-        except sr.UnknownValueError:
-            text = ""
-        except sr.RequestError as e:
-            raise RuntimeError(f"Erro SpeechRecognition/Google: {e}") from e
-
-        if text:
-            chunk_texts.append(text)
-
-    transcript = " ".join(chunk_texts).strip()
+    if segmentation not in ("vad", "fixed"):
+        raise ValueError(f"segmentation inválido: {segmentation} (opções: vad, fixed)")
+
+    backend = get_asr_backend(
+        asr_backend,
+        max_workers=max_workers,
+        timeout_s=chunk_timeout_s,
+        max_retries=max_retries,
+        retry_backoff_s=retry_backoff_s,
+    )
+
+    dump_dir: Optional[Path] = None
+    if debug_dump_dir:
+        dump_dir = Path(debug_dump_dir)
+        dump_dir.mkdir(parents=True, exist_ok=True)
+
+    with WavReader(str(wav_path_obj)) as reader:
+        # 2) Pré-processamento em blocos (só um bloco fica em memória): uma
+        # passada acha o pico para o normalize() do pydub (pico a -0.1 dBFS);
+        # a segunda aplica esse ganho + gain_db (ajuda com fala baixa/ruído)
+        # e mede a energia total e as features do VAD
+        with metrics.timer("audio.normalize"):
+            frame_len = max(1, int(reader.frame_rate * VAD_FRAME_MS / 1000))
+            block_frames = frame_len * max(1, int(reader.frame_rate * block_s) // frame_len)
+            peak = max((block.max for block in reader.iter_blocks(block_frames)), default=0)
+            max_amplitude = float(1 << (8 * reader.sample_width - 1))
+            gain_total_db = float(gain_db or 0)
+            if peak > 0:
+                gain_total_db += ratio_to_db(max_amplitude * db_to_float(-0.1) / peak)
+
+            sum_squares = 0.0
+            n_samples = 0
+            energy_blocks: List[np.ndarray] = []
+            zcr_blocks: List[np.ndarray] = []
+            for block in reader.iter_blocks(block_frames):
+                if gain_total_db:
+                    block = block.apply_gain(gain_total_db)
+                samples = np.asarray(block.get_array_of_samples(), dtype=np.float64)
+                sum_squares += float(np.dot(samples, samples))
+                n_samples += samples.size
+                if segmentation == "vad":
+                    energy_db, zcr = frame_features(segment_to_samples(block), reader.frame_rate, VAD_FRAME_MS)
+                    energy_blocks.append(energy_db)
+                    zcr_blocks.append(zcr)
+            rms = (sum_squares / n_samples) ** 0.5 if n_samples else 0.0
+            audio_dbfs = ratio_to_db(rms / max_amplitude) if rms > 0 else -float("inf")
+
+        def _load(start_ms: float, end_ms: float) -> AudioSegment:
+            piece = reader.segment(start_ms, end_ms)
+            return piece.apply_gain(gain_total_db) if gain_total_db else piece
+
+        # (start_ms, end_ms) de cada trecho a reconhecer
+        spans: List[Tuple[int, int]] = []
+
+        with metrics.timer("audio.segment"):
+            if segmentation == "vad":
+                # 3) Segmentos de fala (VAD por energia + ZCR, features dos blocos)
+                energy_db = np.concatenate(energy_blocks) if energy_blocks else np.zeros(0, np.float32)
+                zcr = np.concatenate(zcr_blocks) if zcr_blocks else np.zeros(0, np.float32)
+                duration_s = reader.n_frames / float(reader.frame_rate)
+                for start_s, end_s in speech_segments_from_features(energy_db, zcr, duration_s, VAD_FRAME_MS):
+                    spans.append((int(start_s * 1000), int(end_s * 1000)))
+            else:
+                # 3) Chunking por tempo fixo
+                step = max(500, chunk_ms - chunk_overlap_ms)
+                for start in range(0, len(reader), step):
+                    piece = _load(start, min(start + chunk_ms, len(reader)))
+                    if len(piece) < 1200:
+                        continue
+
+                    # filtro simples: evita mandar “quase silêncio”
+                    if piece.rms < 200:
+                        continue
+
+                    spans.append((start, start + len(piece)))
+
+        num_chunks = len(spans)
+
+        # 4) Transcrição pelo backend de ASR, em lotes: só os trechos do lote
+        # atual ficam em memória (textos em ordem cronológica)
+        transcripts: List[Tuple[str, float, float]] = []
+        batch = max(1, backend.max_workers) * 4
+        with metrics.timer("audio.asr"):
+            for first in range(0, num_chunks, batch):
+                chunks: List[SpeechSpan] = []
+                for i, (start_ms, end_ms) in enumerate(spans[first:first + batch], start=first + 1):
+                    piece = _load(start_ms, end_ms)
+
+                    # depuração: opcionalmente grava o chunk em disco
+                    if dump_dir is not None:
+                        piece.export(dump_dir / f"chunk_{i:03d}.wav", format="wav")
+
+                    chunks.append((start_ms / 1000.0, end_ms / 1000.0, piece))
+                transcripts.extend(backend.transcribe(chunks, language=language, first_index=first))
+        metrics.count("audio.chunks", num_chunks)
+
+    segments = [
+        {"start_s": start_s, "end_s": end_s, "text": text}
+        for text, start_s, end_s in transcripts
+        if text
+    ]
+    chunk_texts = [seg["text"] for seg in segments]
+
+    # Só o chunking fixo tem sobreposição entre trechos consecutivos
+    transcript = _merge_chunk_texts(chunk_texts) if segmentation == "fixed" else " ".join(chunk_texts).strip()
 
     return {
         "wav_path": str(wav_path_obj),
         "language": language,
+        "asr_backend": backend.name,
         "transcript": transcript,
         "chunks_transcript": chunk_texts,
+        "segments": segments,
         "num_chunks": num_chunks,
-        "audio_dbfs": float(audio.dBFS),
+        "audio_dbfs": float(audio_dbfs),
         "used_input": "audio_path" if audio_path else "video_path",
     }
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Iterator, List, Tuple, Union
+
+from pydub import AudioSegment
+
+from audio.asr_backends import ASRBackend, get_asr_backend
+from audio.audio_events import AudioEvent
+from audio.distress_matcher import get_distress_matcher
+from audio.patient_distress_detection import detect_patient_distress_from_text
+from audio.pcm_stream import WavReader
+from fusion.timestamps import format_ts
+
+
+def stream_audio_chunks(
+    wav_path: str,
+    chunk_ms: int = 2000,
+    realtime: bool = True,
+) -> Iterator[Tuple[float, float, float, AudioSegment]]:
+    """
+    Entrega o WAV em blocos consecutivos de chunk_ms, como um microfone.
+
+    Gera (capture_time, start_s, end_s, piece): com realtime=True cada bloco só
+    é entregue quando o seu último sample "chegaria" ao vivo, e capture_time é
+    esse instante (time.perf_counter()).
+    """
+    wav_file = Path(wav_path)
+    if not wav_file.exists():
+        raise FileNotFoundError(f"WAV não encontrado: {wav_path}")
+
+    # lido bloco a bloco do arquivo: uma gravação longa não fica inteira na memória
+    with WavReader(str(wav_file)) as reader:
+        start = time.perf_counter()
+
+        for start_ms in range(0, len(reader), chunk_ms):
+            piece = reader.segment(start_ms, min(start_ms + chunk_ms, len(reader)))
+            end_ms = start_ms + len(piece)
+
+            due = start + end_ms / 1000.0
+            if realtime:
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            capture_time = due if realtime else time.perf_counter()
+
+            yield capture_time, start_ms / 1000.0, end_ms / 1000.0, piece
+
+
+def stream_audio_events(
+    wav_path: str,
+    language: str = "en-US",
+    chunk_ms: int = 2000,
+    realtime: bool = True,
+    gain_db: int = 6,
+    asr_backend: Union[str, ASRBackend] = "google",
+) -> Iterator[Tuple[float, float, str, List[AudioEvent]]]:
+    """
+    Transcreve o áudio bloco a bloco e detecta distress em cada bloco.
+
+    Gera (capture_time, end_s, texto, eventos); os eventos levam o timestamp
+    de início do bloco. Falhas de rede no reconhecimento não interrompem o
+    stream: o bloco é tratado como sem fala.
+    """
+    # sem retry: no modo ao vivo é melhor perder um bloco do que atrasar os próximos
+    backend = get_asr_backend(asr_backend, max_retries=0)
+    # casamento incremental: cada bloco percorre só o texto novo (frases partidas entre blocos também casam)
+    distress_stream = get_distress_matcher().stream()
+
+    for capture_time, start_s, end_s, piece in stream_audio_chunks(wav_path, chunk_ms, realtime):
+        # filtro simples: evita mandar “quase silêncio”
+        if len(piece) < 300 or piece.rms < 200:
+            yield capture_time, end_s, "", []
+            continue
+
+        piece = piece.normalize()
+        if gain_db:
+            piece = piece + gain_db
+
+        try:
+            text = backend.transcribe([(start_s, end_s, piece)], language=language)[0][0]
+        except RuntimeError as e:
+            print(f"[audio] Erro no reconhecimento do bloco {format_ts(start_s)}: {e}")
+            text = ""
+
+        events = [
+            replace(e, timestamp=format_ts(start_s))
+            for e in detect_patient_distress_from_text(text, distress_stream)
+        ]
+        yield capture_time, end_s, text, events
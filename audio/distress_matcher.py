@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+# Vocabulário único dos detectores de distress (frases em qualquer idioma;
+# a normalização remove acentos, apóstrofos e caixa)
+DISTRESS_PATTERNS = [
+    # en
+    "i don't feel good",
+    "dont feel good",
+    "i feel dizzy",
+    "dizzy",
+    "lightheaded",
+    "faint",
+    "i feel sick",
+    "nauseous",
+    "hurts",
+    # pt
+    "estou tonta",
+    "estou tonto",
+    "tontura",
+    "me sinto mal",
+    "vou desmaiar",
+    "enjoada",
+]
+
+# Grafias alternativas / erros frequentes do ASR -> palavra canônica
+TOKEN_VARIANTS = {
+    "deezy": "dizzy",
+    "dizy": "dizzy",
+    "light-headed": "lightheaded",
+    "nautious": "nauseous",
+    "nauseus": "nauseous",
+}
+
+_TOKEN_CHARS = r"\w'’-"
+_TOKEN_RE = re.compile(f"[{_TOKEN_CHARS}]+")
+_TOKEN_CHAR_RE = re.compile(f"[{_TOKEN_CHARS}]")
+# até quantas últimas palavras distintas a busca usa str.find (uma varredura
+# em C por palavra); acima disso, uma única regex em trie
+_FIND_MAX_WORDS = 48
+
+
+class DistressHit(NamedTuple):
+    pattern: str  # frase do vocabulário, como cadastrada
+    start: int  # offset (caractere) do início da frase no texto
+    end: int  # offset logo após o fim da frase
+
+
+def normalize_token(token: str, variants: Mapping[str, str] = TOKEN_VARIANTS) -> str:
+    """Minúsculas, sem acentos e sem apóstrofos ("Don’t" -> "dont"), com variantes mapeadas."""
+    token = token.lower()
+    if not token.isascii():
+        token = unicodedata.normalize("NFKD", token)
+        token = "".join(c for c in token if not unicodedata.combining(c)).replace("’", "")
+    token = token.replace("'", "")
+    return variants.get(token, token)
+
+
+def tokenize(
+    text: str,
+    variants: Mapping[str, str] = TOKEN_VARIANTS,
+    cache: Optional[Dict[str, str]] = None,
+) -> List[Tuple[str, int, int]]:
+    """
+    Palavras normalizadas com seus offsets no texto original: [(palavra, start, end)].
+    cache (palavra crua -> normalizada) evita renormalizar palavras repetidas.
+    """
+    if cache is None:
+        cache = {}
+    out = []
+    for m in _TOKEN_RE.finditer(text or ""):
+        raw = m.group()
+        word = cache.get(raw)
+        if word is None:
+            word = cache[raw] = normalize_token(raw, variants)
+        out.append((word, m.start(), m.end()))
+    return out
+
+
+def _trie_alternation(words: Iterable[str]) -> str:
+    """Alternação das palavras com os prefixos comuns fatorados (uma trie em regex)."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for c in word:
+            node = node.setdefault(c, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        alts = [re.escape(c) + build(child) for c, child in sorted(node.items()) if c]
+        if "" in node:
+            alts.append("")
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return build(trie)
+
+
+def _is_token_char(text: str, i: int) -> bool:
+    return 0 <= i < len(text) and _TOKEN_CHAR_RE.match(text, i) is not None
+
+
+class DistressMatcher:
+    """
+    Casamento de frases por palavras normalizadas, indexado pela última
+    palavra de cada frase.
+
+    O texto passa para minúsculas e sem acentos (com os mesmos offsets do
+    original) e as palavras que podem fechar uma frase são procuradas em C:
+    str.find por palavra quando são poucas (o vocabulário padrão), uma regex
+    em trie quando são muitas. Palavras com apóstrofo ("don't" -> "dont")
+    também são candidatas. Só nesses pontos as palavras anteriores são
+    tokenizadas e comparadas, então o custo fica perto de uma busca de
+    substring, sem laço Python por palavra do texto.
+
+    Como o casamento é por palavra inteira, "faint" não casa dentro de
+    "painfully faintest"; frases que se sobrepõem são todas reportadas ("i
+    feel dizzy" e "dizzy"). Textos com caracteres cuja normalização muda o
+    comprimento (raros: ligaduras, acentos já decompostos) são percorridos
+    palavra a palavra, com o mesmo resultado.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[str] = DISTRESS_PATTERNS,
+        variants: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.variants = dict(TOKEN_VARIANTS if variants is None else variants)
+        self.patterns: List[str] = []
+        self._words: List[Tuple[str, ...]] = []
+        # última palavra -> índices das frases que terminam nela, da mais longa para a mais curta
+        self._by_last: Dict[str, List[int]] = {}
+        seen = set()
+        for pattern in patterns:
+            words = tuple(t for t, _, _ in tokenize(pattern, self.variants))
+            if not words or words in seen:
+                continue
+            seen.add(words)
+            self._by_last.setdefault(words[-1], []).append(len(self.patterns))
+            self.patterns.append(pattern)
+            self._words.append(words)
+        for idxs in self._by_last.values():
+            idxs.sort(key=lambda i: -len(self._words[i]))
+
+        self.max_words = max((len(w) for w in self._words), default=0)
+        self._norm_cache: Dict[str, str] = {}
+
+        # grafias (sem apóstrofo) que normalizam para uma última palavra: ela mesma ou uma variante
+        last_words = set(self._by_last)
+        last_words.update(raw for raw, word in self.variants.items() if word in last_words)
+        self._last_words = sorted(w for w in last_words if w)
+        self._last_re = (
+            re.compile(f"{_trie_alternation(self._last_words)}(?![{_TOKEN_CHARS}])")
+            if len(self._last_words) > _FIND_MAX_WORDS
+            else None
+        )
+
+    def _normalize(self, raw: str) -> str:
+        word = self._norm_cache.get(raw)
+        if word is None:
+            word = self._norm_cache[raw] = normalize_token(raw, self.variants)
+        return word
+
+    @staticmethod
+    def _search_text(text: str) -> Optional[str]:
+        """
+        Texto em minúsculas e sem acentos com os mesmos offsets do original,
+        ou None se algum caractere não tem um equivalente de 1 caractere.
+        """
+        # sigma final: lower() do texto inteiro e o da palavra podem diferir
+        if "Σ" in text:
+            return None
+        low = text.lower()
+        if len(low) != len(text):
+            return None
+        if low.isascii():
+            return low
+        table: Dict[int, str] = {}
+        for c in set(low):
+            if c.isascii() or c == "’":
+                continue
+            base = "".join(ch for ch in unicodedata.normalize("NFKD", c) if not unicodedata.combining(ch))
+            if len(base) != 1 or _is_token_char(c, 0) != _is_token_char(base, 0):
+                return None
+            if base != c:
+                table[ord(c)] = base
+        return low.translate(table) if table else low
+
+    def _candidates(self, text: str) -> List[Tuple[int, int]]:
+        """
+        (início, fim) das palavras de text que podem fechar uma frase, em
+        ordem; pode incluir palavras a mais (a confirmação é por normalize_token).
+        """
+        if not self._last_words:
+            return []
+        s = self._search_text(text)
+        if s is None:
+            return [(t.start(), t.end()) for t in _TOKEN_RE.finditer(text)]
+
+        spans = set()
+        if self._last_re is None:
+            for word in self._last_words:
+                i = s.find(word)
+                while i >= 0:
+                    j = i + len(word)
+                    if not _is_token_char(s, i - 1) and not _is_token_char(s, j):
+                        spans.add((i, j))
+                    i = s.find(word, i + 1)
+        else:
+            for m in self._last_re.finditer(s):
+                if not _is_token_char(s, m.start() - 1):
+                    spans.add(m.span())
+
+        # palavras com apóstrofo só normalizam para a última palavra sem ele
+        for apostrophe in ("'", "’"):
+            i = s.find(apostrophe)
+            while i >= 0:
+                start = i
+                while _is_token_char(s, start - 1):
+                    start -= 1
+                end = _TOKEN_RE.match(s, i).end()
+                spans.add((start, end))
+                i = s.find(apostrophe, end)
+        return sorted(spans)
+
+    def find_all(self, text: str) -> List[DistressHit]:
+        """Todas as ocorrências de frases do vocabulário em text, na ordem em que terminam."""
+        return self.stream().feed(text)
+
+    def find(self, text: str) -> List[str]:
+        """Frases encontradas em text, sem repetição, na ordem da primeira ocorrência."""
+        return unique_patterns(self.find_all(text))
+
+    def stream(self) -> "DistressStream":
+        return DistressStream(self)
+
+
+class DistressStream:
+    """
+    Casamento incremental sobre transcrições que chegam em blocos.
+
+    feed(texto) percorre só o texto novo e devolve as frases que terminam
+    nesse bloco — inclusive as que começaram no bloco anterior (as últimas
+    palavras de cada bloco ficam guardadas). Os offsets são relativos à
+    concatenação dos textos recebidos, separados por um espaço.
+    """
+
+    def __init__(self, matcher: DistressMatcher) -> None:
+        self.matcher = matcher
+        self._offset = 0
+        # (palavra, offset) das últimas max_words - 1 palavras já recebidas
+        self._tail: List[Tuple[str, int]] = []
+
+    def _preceding(self, text: str, pos: int, k: int) -> List[Tuple[str, int]]:
+        """(palavra normalizada, offset) das k palavras antes de pos, completadas com as dos blocos anteriores."""
+        if k <= 0:
+            return []
+        window = 16 * k
+        while True:
+            lo = max(0, pos - window)
+            spans = [(t.start(), t.end()) for t in _TOKEN_RE.finditer(text, lo, pos)]
+            if spans and spans[0][0] == lo > 0 and _TOKEN_RE.match(text, lo - 1):
+                spans.pop(0)  # palavra cortada pelo início da janela
+            if len(spans) >= k or lo == 0:
+                break
+            window *= 4
+        normalize = self.matcher._normalize
+        out = [(normalize(text[s:e]), self._offset + s) for s, e in spans[-k:]]
+        if len(out) < k:
+            out = self._tail[max(0, len(self._tail) - (k - len(out))):] + out
+        return out
+
+    def feed(self, text: str) -> List[DistressHit]:
+        m = self.matcher
+        text = text or ""
+        hits: List[DistressHit] = []
+        for start, end in m._candidates(text):
+            idxs = m._by_last.get(m._normalize(text[start:end]))
+            if not idxs:
+                continue
+            before = self._preceding(text, start, len(m._words[idxs[0]]) - 1)
+            for idx in idxs:
+                n = len(m._words[idx])
+                if n - 1 > len(before):
+                    continue
+                prev = before[len(before) - (n - 1):] if n > 1 else []
+                if any(word != expected for (word, _), expected in zip(prev, m._words[idx])):
+                    continue
+                hits.append(
+                    DistressHit(
+                        pattern=m.patterns[idx],
+                        start=prev[0][1] if prev else self._offset + start,
+                        end=self._offset + end,
+                    )
+                )
+
+        self._tail = self._preceding(text, len(text), m.max_words - 1)
+        self._offset += len(text) + 1
+        return hits
+
+
+def unique_patterns(hits: Sequence[DistressHit]) -> List[str]:
+    return list(dict.fromkeys(h.pattern for h in hits))
+
+
+_default_matcher: Optional[DistressMatcher] = None
+
+
+def get_distress_matcher() -> DistressMatcher:
+    """Matcher do vocabulário padrão, compilado uma vez por processo."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = DistressMatcher()
+    return _default_matcher
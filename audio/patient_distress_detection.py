@@ -1,21 +1,15 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from audio.audio_events import AudioEvent
+from audio.distress_matcher import DistressStream, get_distress_matcher, unique_patterns
 
-DISTRESS_PATTERNS = [
-    "i don't feel good",
-    "dont feel good",
-    "i feel dizzy",
-    "dizzy",
-    "deezy",
-    "lightheaded",
-    "faint",
-    "i feel sick",
-    "nauseous",
-]
-
-def detect_patient_distress_from_text(text: str) -> List[AudioEvent]:
-    text_l = (text or "").lower()
-    hits = [p for p in DISTRESS_PATTERNS if p in text_l]
+def detect_patient_distress_from_text(text: str, stream: Optional[DistressStream] = None) -> List[AudioEvent]:
+    """
+    Detecta distress em um texto. Com stream (get_distress_matcher().stream()),
+    o texto é tratado como continuação dos anteriores: só o texto novo é
+    percorrido e frases partidas entre dois blocos também casam.
+    """
+    found = stream.feed(text) if stream is not None else get_distress_matcher().find_all(text)
+    hits = unique_patterns(found)
 
     if not hits:
         return []
@@ -27,6 +21,10 @@ def detect_patient_distress_from_text(text: str) -> List[AudioEvent]:
             event="patient_distress_detected",
             confidence=confidence,
             timestamp="N/A",  # SpeechRecognition básico não dá timestamp
-            details={"hits": hits, "text": text},
+            details={
+                "hits": hits,
+                "hit_positions": [{"pattern": h.pattern, "start": h.start, "end": h.end} for h in found],
+                "text": text,
+            },
         )
     ]
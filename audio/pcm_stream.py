@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import subprocess
+import wave
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import numpy as np
+from pydub import AudioSegment
+
+SAMPLE_RATE = 16000
+DEFAULT_CACHE_DIR = "results/audio_cache"
+
+
+def _ffmpeg_exe() -> str:
+    # Prefere o ffmpeg do sistema; senão usa o binário que acompanha o imageio-ffmpeg (MoviePy)
+    exe = shutil.which("ffmpeg")
+    if exe:
+        return exe
+    try:
+        import imageio_ffmpeg
+
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError as e:
+        raise RuntimeError("ffmpeg não encontrado (instale ffmpeg ou imageio-ffmpeg).") from e
+
+
+def iter_pcm_blocks(
+    media_path: str,
+    sample_rate: int = SAMPLE_RATE,
+    block_s: float = 30.0,
+) -> Iterator[np.ndarray]:
+    """
+    Decodifica o áudio de um vídeo/arquivo de mídia via ffmpeg e entrega PCM
+    mono int16 em blocos de block_s segundos (só um bloco fica em memória).
+    """
+    if not Path(media_path).exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {media_path}")
+
+    cmd = [
+        _ffmpeg_exe(),
+        "-nostdin",
+        "-loglevel", "error",
+        "-i", str(media_path),
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-f", "s16le",
+        "-acodec", "pcm_s16le",
+        "pipe:1",
+    ]
+    block_bytes = max(2, int(sample_rate * block_s) * 2)
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert proc.stdout is not None and proc.stderr is not None
+    produced = False
+    try:
+        while True:
+            data = proc.stdout.read(block_bytes)
+            if not data:
+                break
+            # descarta um byte solto no fim (amostra incompleta)
+            data = data[: len(data) - (len(data) % 2)]
+            if data:
+                produced = True
+                yield np.frombuffer(data, dtype="<i2")
+    finally:
+        proc.stdout.close()
+        stderr = proc.stderr.read().decode("utf-8", errors="replace")
+        proc.stderr.close()
+        returncode = proc.wait()
+
+    no_audio = "does not contain any stream" in stderr or "matches no streams" in stderr
+    if not produced and (returncode == 0 or no_audio):
+        raise RuntimeError("O vídeo não possui faixa de áudio.")
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg falhou ao extrair áudio de {media_path}: {stderr.strip()}")
+
+
+def extract_wav(media_path: str, out_wav_path: str, sample_rate: int = SAMPLE_RATE) -> str:
+    """Extrai o áudio para um WAV PCM 16 bits mono, escrevendo bloco a bloco."""
+    out = Path(out_wav_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    # escreve em arquivo temporário e renomeia: leitores nunca veem WAV pela metade
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    try:
+        with wave.open(str(tmp), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            for block in iter_pcm_blocks(media_path, sample_rate):
+                wf.writeframes(block.tobytes())
+        os.replace(tmp, out)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    return str(out)
+
+
+class WavReader:
+    """
+    Leitura de um WAV PCM em janelas: segment(start_ms, end_ms) devolve só
+    aquele trecho como AudioSegment (mesmas amostras que
+    AudioSegment.from_wav(path)[start_ms:end_ms]), então arquivos longos não
+    precisam caber inteiros na memória.
+
+        with WavReader(wav_path) as reader:
+            for block in reader.iter_blocks(block_frames): ...
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._wf = wave.open(str(path), "rb")
+        self.channels = self._wf.getnchannels()
+        self.sample_width = self._wf.getsampwidth()
+        self.frame_rate = self._wf.getframerate()
+        self.n_frames = self._wf.getnframes()
+
+    def __len__(self) -> int:
+        """Duração em ms (como len() de um AudioSegment)."""
+        return round(1000 * self.n_frames / self.frame_rate)
+
+    def read_frames(self, start_frame: int, n_frames: int) -> AudioSegment:
+        start_frame = min(max(0, start_frame), self.n_frames)
+        n_frames = max(0, n_frames)
+        self._wf.setpos(start_frame)
+        data = self._wf.readframes(min(n_frames, self.n_frames - start_frame))
+        if self.sample_width == 1:
+            # WAV de 8 bits é sem sinal; o pydub converte para com sinal ao ler
+            data = (np.frombuffer(data, dtype=np.uint8).astype(np.int16) - 128).astype(np.int8).tobytes()
+        # como o fatiamento do pydub: completa com silêncio o que passa do fim
+        frame_width = self.channels * self.sample_width
+        data += bytes(n_frames * frame_width - len(data))
+        return AudioSegment(data=data, sample_width=self.sample_width, frame_rate=self.frame_rate, channels=self.channels)
+
+    def segment(self, start_ms: float, end_ms: float) -> AudioSegment:
+        """Como AudioSegment.from_wav(path)[start_ms:end_ms] (limites presos à duração em ms)."""
+        start_ms, end_ms = min(start_ms, len(self)), min(end_ms, len(self))
+        start = int(start_ms * self.frame_rate / 1000.0)
+        end = int(end_ms * self.frame_rate / 1000.0)
+        return self.read_frames(start, end - start)
+
+    def iter_blocks(self, block_frames: int) -> Iterator[AudioSegment]:
+        for start in range(0, self.n_frames, max(1, block_frames)):
+            yield self.read_frames(start, min(block_frames, self.n_frames - start))
+
+    def close(self) -> None:
+        self._wf.close()
+
+    def __enter__(self) -> "WavReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def file_content_hash(path: str, chunk_bytes: int = 4 * 1024 * 1024) -> str:
+    """SHA-256 do conteúdo do arquivo, lido em blocos."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stat_key(path: str) -> str:
+    """Chave barata do arquivo: caminho absoluto, tamanho e mtime (sem ler o conteúdo)."""
+    st = os.stat(path)
+    raw = f"{os.path.realpath(path)}:{st.st_size}:{st.st_mtime_ns}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def extract_wav_cached(
+    media_path: str,
+    cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+    sample_rate: int = SAMPLE_RATE,
+) -> str:
+    """
+    Como extract_wav, mas com cache indexado pelo hash do conteúdo do vídeo:
+    rodar de novo o pipeline sobre o mesmo procedimento reaproveita o WAV já
+    extraído (mesmo que o vídeo tenha sido renomeado/movido).
+
+    O hash exige ler o vídeo inteiro, então antes é consultado um índice por
+    (caminho, tamanho, mtime_ns) em <cache>/index/: se o arquivo não mudou
+    desde a última execução, o WAV é achado sem ler o vídeo. Só quando essa
+    chave falta ou ficou velha (arquivo novo, movido ou regravado) o conteúdo
+    é hasheado.
+    """
+    if not Path(media_path).exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {media_path}")
+
+    cache = Path(cache_dir or DEFAULT_CACHE_DIR)
+    index = cache / "index" / f"{_stat_key(media_path)}_{sample_rate}"
+    if index.exists():
+        cached = cache / index.read_text(encoding="utf-8").strip()
+        if cached.exists():
+            return str(cached)
+
+    cached = cache / f"{file_content_hash(media_path)}_{sample_rate}.wav"
+    if not cached.exists():
+        extract_wav(media_path, str(cached), sample_rate)
+
+    index.parent.mkdir(parents=True, exist_ok=True)
+    tmp = index.with_name(f".{index.name}.{os.getpid()}.tmp")
+    tmp.write_text(cached.name, encoding="utf-8")
+    os.replace(tmp, index)
+    return str(cached)
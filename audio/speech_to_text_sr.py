@@ -1,9 +1,16 @@
-import speech_recognition as sr
+from typing import Union
+
+from pydub import AudioSegment
+
+from audio.asr_backends import ASRBackend, get_asr_backend
 
-def transcribe_wav_google(wav_path: str, language: str = "en-US") -> str:
-    r = sr.Recognizer()
-    with sr.AudioFile(wav_path) as source:
-        audio = r.record(source)
 
+def transcribe_wav(wav_path: str, language: str = "en-US", backend: Union[str, ASRBackend] = "google") -> str:
+    audio = AudioSegment.from_wav(wav_path)
+    transcripts = get_asr_backend(backend).transcribe([(0.0, len(audio) / 1000.0, audio)], language=language)
+    return " ".join(text for text, _, _ in transcripts if text)
+
+
+def transcribe_wav_google(wav_path: str, language: str = "en-US") -> str:
     # Google Web Speech API (via SpeechRecognition)
-    return r.recognize_google(audio, language=language)
+    return transcribe_wav(wav_path, language=language, backend="google")
@@ -3,40 +3,69 @@ from __future__ import annotations
 from typing import Dict, Any, List
 
 from audio.audio_events import AudioEvent
-
-
-DISTRESS_PATTERNS = [
-    "i don't feel good",
-    "dont feel good",
-    "i feel dizzy",
-    "dizzy",
-    "hurts",
-]
+from audio.distress_matcher import get_distress_matcher, unique_patterns
+from fusion.timestamps import format_ts
 
 
 def detect_clinical_urgency(audio_features: Dict[str, Any]) -> List[AudioEvent]:
     """
     Mantém o nome 'detect_clinical_urgency' para compatibilidade com seu pipeline,
     mas na prática detecta distress/mal-estar relatado pela paciente via transcrição.
+
+    Um evento por trecho (com tempo) em que alguma frase termina, com
+    timestamp/end_timestamp do trecho: a fusão por janela precisa de cada
+    ocorrência, não só da primeira. Sem trechos com tempo, um único evento
+    com timestamp "N/A" cobre a transcrição inteira.
     """
-    transcript = (audio_features.get("transcript") or "").lower()
-    hits = [p for p in DISTRESS_PATTERNS if p in transcript]
+    matcher = get_distress_matcher()
+    wav_path = audio_features.get("wav_path", "")
+
+    # Trechos percorridos em sequência para que uma frase partida entre dois
+    # trechos também conte (no trecho em que termina)
+    events: List[AudioEvent] = []
+    stream = matcher.stream()
+    for seg in audio_features.get("segments") or []:
+        seg_hits = unique_patterns(stream.feed(seg.get("text") or ""))
+        if not seg_hits:
+            continue
+        events.append(
+            AudioEvent(
+                type="audio_event",
+                event="patient_distress_detected",
+                confidence=_confidence(seg_hits),
+                timestamp=format_ts(seg["start_s"]),
+                end_timestamp=format_ts(seg["end_s"]),
+                details={
+                    "hits": seg_hits,
+                    "start_s": seg["start_s"],
+                    "end_s": seg["end_s"],
+                    "text": seg.get("text") or "",
+                    "wav_path": wav_path,
+                },
+            )
+        )
+    if events:
+        return events
 
+    found = matcher.find_all(audio_features.get("transcript") or "")
+    hits = unique_patterns(found)
     if not hits:
         return []
-
-    confidence = min(1.0, 0.7 + 0.1 * len(hits))
-
     return [
         AudioEvent(
             type="audio_event",
             event="patient_distress_detected",
-            confidence=confidence,
-            timestamp="N/A",  # SpeechRecognition básico não fornece timestamps
+            confidence=_confidence(hits),
+            timestamp="N/A",
             details={
                 "hits": hits,
+                "hit_positions": [{"pattern": h.pattern, "start": h.start, "end": h.end} for h in found],
                 "transcript": audio_features.get("transcript", ""),
-                "wav_path": audio_features.get("wav_path", ""),
+                "wav_path": wav_path,
             },
         )
     ]
+
+
+def _confidence(hits: List[str]) -> float:
+    return min(1.0, 0.7 + 0.1 * len(hits))
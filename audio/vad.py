@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import Any, List, Tuple
+
+import numpy as np
+from pydub import AudioSegment
+
+Segment = Tuple[float, float]  # (start_s, end_s)
+
+
+def segment_to_samples(audio: AudioSegment) -> np.ndarray:
+    """PCM do pydub -> array float32 mono em [-1, 1]."""
+    audio = audio.set_channels(1)
+    samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
+    if audio.sample_width == 1:
+        # WAV de 8 bits é sem sinal
+        samples -= 128.0
+    return samples / float(1 << (8 * audio.sample_width - 1))
+
+
+def frame_features(samples: np.ndarray, sample_rate: int, frame_ms: int = 30) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Energia (dBFS) e taxa de cruzamento por zero de cada frame de frame_ms,
+    calculadas de uma vez sobre o sinal inteiro.
+    """
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+
+    frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    energy_db = 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+    return energy_db.astype(np.float32), zcr.astype(np.float32)
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Índices [início, fim) das sequências de True em mask."""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def detect_speech_segments(
+    samples: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = 30,
+    **kwargs: Any,
+) -> List[Segment]:
+    """
+    Detector de atividade de voz por energia + cruzamentos por zero sobre o
+    sinal inteiro em memória (ver speech_segments_from_features).
+
+    Retorna [(start_s, end_s), ...] em ordem cronológica.
+    """
+    energy_db, zcr = frame_features(samples, sample_rate, frame_ms)
+    return speech_segments_from_features(energy_db, zcr, len(samples) / float(sample_rate), frame_ms, **kwargs)
+
+
+def speech_segments_from_features(
+    energy_db: np.ndarray,
+    zcr: np.ndarray,
+    duration_s: float,
+    frame_ms: int = 30,
+    threshold_margin_db: float = 10.0,
+    min_threshold_db: float = -50.0,
+    zcr_speech: float = 0.25,
+    min_speech_ms: int = 250,
+    min_silence_ms: int = 300,
+    pad_ms: int = 150,
+    max_segment_ms: int = 15000,
+) -> List[Segment]:
+    """
+    Segmentos de fala a partir das features de frame_features (que podem vir
+    de blocos consecutivos do áudio, concatenadas):
+
+    - limiar adaptativo: piso de ruído (percentil 10 da energia) +
+      threshold_margin_db, nunca abaixo de min_threshold_db;
+    - frames acima do limiar são fala; frames até 6 dB abaixo também contam se
+      tiverem ZCR alta (consoantes surdas como "s", "f");
+    - pausas menores que min_silence_ms são preenchidas, trechos menores que
+      min_speech_ms descartados, cada segmento ganha pad_ms de margem e
+      segmentos maiores que max_segment_ms são divididos.
+
+    Retorna [(start_s, end_s), ...] em ordem cronológica.
+    """
+    if energy_db.size == 0:
+        return []
+
+    noise_floor = float(np.percentile(energy_db, 10))
+    threshold = max(min_threshold_db, noise_floor + threshold_margin_db)
+    speech = (energy_db > threshold) | ((energy_db > threshold - 6.0) & (zcr >= zcr_speech))
+
+    # preenche pausas curtas entre trechos de fala
+    starts, ends = _runs(~speech)
+    max_gap = max(1, min_silence_ms // frame_ms)
+    for s, e in zip(starts, ends):
+        if 0 < s and e < speech.size and e - s < max_gap:
+            speech[s:e] = True
+
+    starts, ends = _runs(speech)
+    keep = (ends - starts) >= max(1, min_speech_ms // frame_ms)
+    starts, ends = starts[keep], ends[keep]
+
+    frame_s = frame_ms / 1000.0
+    pad_s = pad_ms / 1000.0
+    max_len_s = max_segment_ms / 1000.0
+
+    segments: List[Segment] = []
+    for s, e in zip(starts.tolist(), ends.tolist()):
+        start_s = max(0.0, s * frame_s - pad_s)
+        end_s = min(duration_s, e * frame_s + pad_s)
+        # padding pode encostar no segmento anterior: junta
+        if segments and start_s <= segments[-1][1]:
+            start_s = segments.pop()[0]
+
+        while end_s - start_s > max_len_s:
+            segments.append((start_s, start_s + max_len_s))
+            start_s += max_len_s
+        segments.append((start_s, end_s))
+
+    return segments
@@ -1,12 +1,369 @@
+from __future__ import annotations
+
+import gzip
+import itertools
+import json
 import os
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
 
+from telemetry import metrics
 
-def send_alert_to_function(payload: dict) -> dict:
+# Erros que valem nova tentativa: rede/timeout e estas respostas HTTP
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# latências guardadas em stats["latencies_s"] (as mais recentes)
+LATENCY_SAMPLES = 10_000
+# arquivo da outbox reservado por um processo: <nome>.json.<pid>.inflight
+INFLIGHT_SUFFIX = ".inflight"
+
+
+class PermanentSendError(RuntimeError):
+    """Resposta 4xx (fora de RETRY_STATUS): reenviar o mesmo corpo não vai adiantar."""
+
+
+class FunctionClient:
+    """
+    Cliente da Azure Function de alertas.
+
+    - Uma requests.Session com pool de conexões (keep-alive) para todas as
+      chamadas, em vez de uma conexão nova por alerta.
+    - send() tenta de novo com backoff exponencial (com jitter) em erro de
+      rede, timeout, 429 e 5xx; se ainda assim falhar, o alerta vai para a
+      outbox em vez de se perder.
+    - enqueue() grava o alerta na outbox em disco (um arquivo por alerta,
+      escrito com fsync + rename) e volta na hora; uma thread envia a outbox
+      em segundo plano, juntando até batch_max alertas por requisição
+      ({"alerts": [...]}; com batch_max=1 o corpo é o próprio alerta, como a
+      Function espera hoje). Só apaga os arquivos depois da resposta 2xx, então
+      alertas pendentes sobrevivem a quedas do endpoint e a reinícios.
+    - gzip_min_bytes: corpos a partir desse tamanho vão com
+      Content-Encoding: gzip (None = nunca).
+    - Resposta 4xx definitiva a um lote: o lote é dividido ao meio e cada
+      metade reenviada, até isolar os alertas recusados; só esses vão para
+      <outbox>/dead.
+    - Vários processos podem enviar a mesma outbox: cada arquivo é reservado
+      com rename para <nome>.<pid>.inflight antes do envio (só um rename
+      vence). Reservas de processos que morreram voltam para a outbox.
+    - stats["latencies_s"] guarda só as LATENCY_SAMPLES latências mais recentes.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        outbox_dir: str = "results/azure_outbox",
+        timeout_s: float = 10.0,
+        connect_timeout_s: float = 3.05,
+        max_retries: int = 4,
+        backoff_s: float = 0.5,
+        max_backoff_s: float = 30.0,
+        batch_max: int = 1,
+        gzip_min_bytes: Optional[int] = None,
+        flush_interval_s: float = 0.5,
+        pool_size: int = 4,
+    ) -> None:
+        self.url = url
+        self.outbox = Path(outbox_dir)
+        self.dead = self.outbox / "dead"
+        self.outbox.mkdir(parents=True, exist_ok=True)
+        self.timeout = (connect_timeout_s, timeout_s)
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.batch_max = max(1, batch_max)
+        self.gzip_min_bytes = gzip_min_bytes
+        self.flush_interval_s = flush_interval_s
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._seq = itertools.count()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._sender: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Any] = {"sent": 0, "requests": 0, "retries": 0, "dead": 0, "latencies_s": deque(maxlen=LATENCY_SAMPLES)}
+        self._inflight = 0
+        self._release_stale()
+
+    # ---- envio síncrono ----
+
+    def _post(self, body: Any) -> Dict[str, Any]:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.gzip_min_bytes is not None and len(data) >= self.gzip_min_bytes:
+            data = gzip.compress(data, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+
+        resp = self.session.post(self.url, data=data, headers=headers, timeout=self.timeout)
+        with self._lock:
+            self.stats["requests"] += 1
+        if resp.status_code in RETRY_STATUS:
+            raise requests.HTTPError(f"HTTP {resp.status_code}", response=resp)
+        if resp.status_code >= 400:
+            raise PermanentSendError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+        try:
+            return resp.json()
+        except ValueError:
+            return {"status_code": resp.status_code, "text": resp.text}
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_backoff_s, self.backoff_s * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def _post_with_retry(self, body: Any, stop: Optional[threading.Event] = None) -> Dict[str, Any]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._post(body)
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError):
+                if attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                metrics.count("azure.retries")
+                delay = self._backoff(attempt)
+                if stop is not None:
+                    if stop.wait(delay):
+                        raise
+                else:
+                    time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Envia um alerta e devolve a resposta da Function. Se todas as tentativas
+        falharem, grava na outbox, liga o envio em segundo plano e devolve
+        {"queued": True, "outbox_id": ...}.
+        """
+        t0 = time.perf_counter()
+        try:
+            resp = self._post_with_retry(payload)
+        except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+            outbox_id = self.enqueue(payload)
+            metrics.count("azure.queued")
+            return {"queued": True, "outbox_id": outbox_id, "error": str(e)}
+        with self._lock:
+            self.stats["sent"] += 1
+            self.stats["latencies_s"].append(time.perf_counter() - t0)
+        return resp
+
+    # ---- outbox ----
+
+    def enqueue(self, payload: Dict[str, Any]) -> str:
+        """Grava o alerta na outbox (durável) e acorda o envio em segundo plano."""
+        name = f"{time.time_ns():020d}-{os.getpid()}-{next(self._seq):06d}.json"
+        tmp = self.outbox / (name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.outbox / name)
+
+        self.start()
+        self._wake.set()
+        return name
+
+    def pending(self) -> List[Path]:
+        return sorted(self.outbox.glob("*.json"))
+
+    def start(self) -> None:
+        """Liga a thread de envio (também envia o que ficou na outbox de execuções anteriores)."""
+        with self._lock:
+            if self._sender is None or not self._sender.is_alive():
+                self._stop.clear()
+                self._sender = threading.Thread(target=self._send_loop, name="azure-outbox", daemon=True)
+                self._sender.start()
+
+    def _claim(self, path: Path) -> Optional[Path]:
+        """Reserva o arquivo para este processo; None se outro já o reservou."""
+        claimed = path.with_name(f"{path.name}.{os.getpid()}{INFLIGHT_SUFFIX}")
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    @staticmethod
+    def _original_name(claimed: Path) -> str:
+        return claimed.name[: -len(INFLIGHT_SUFFIX)].rsplit(".", 1)[0]
+
+    def _release(self, claimed: Path) -> None:
+        """Devolve para a outbox um arquivo reservado e não enviado."""
+        try:
+            os.replace(claimed, claimed.with_name(self._original_name(claimed)))
+        except FileNotFoundError:
+            pass
+
+    def _release_stale(self) -> None:
+        """Devolve as reservas de processos que não existem mais."""
+        for claimed in self.outbox.glob(f"*{INFLIGHT_SUFFIX}"):
+            try:
+                pid = int(claimed.name[: -len(INFLIGHT_SUFFIX)].rsplit(".", 1)[1])
+            except (IndexError, ValueError):
+                continue
+            if pid == os.getpid():
+                continue
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                self._release(claimed)
+            except PermissionError:
+                pass  # processo vivo, de outro usuário
+
+    def _load_batch(self) -> List[Tuple[Path, Dict[str, Any]]]:
+        batch = []
+        for path in self.pending():
+            if len(batch) == self.batch_max:
+                break
+            claimed = self._claim(path)
+            if claimed is None:
+                continue
+            try:
+                with open(claimed, "r", encoding="utf-8") as f:
+                    batch.append((claimed, json.load(f)))
+            except (OSError, ValueError):
+                self._move_dead(claimed)
+        return batch
+
+    def _move_dead(self, claimed: Path) -> None:
+        self.dead.mkdir(exist_ok=True)
+        try:
+            os.replace(claimed, self.dead / self._original_name(claimed))
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self.stats["dead"] += 1
+
+    def _body(self, payloads: List[Dict[str, Any]]) -> Any:
+        return payloads[0] if self.batch_max == 1 else {"alerts": payloads}
+
+    def _send_batch(self, batch: List[Tuple[Path, Dict[str, Any]]]) -> None:
+        """
+        Envia o lote e apaga os arquivos entregues. Recusa 4xx de um lote com
+        mais de um alerta: divide ao meio e envia cada metade, até isolar os
+        alertas recusados, que vão para <outbox>/dead. Erros de rede/5xx
+        sobem (os arquivos ainda não enviados continuam reservados).
+        """
+        try:
+            self._post_with_retry(self._body([p for _, p in batch]), stop=self._stop)
+        except PermanentSendError as e:
+            if len(batch) == 1:
+                print(f"[azure] Alerta recusado pela Function ({e}); movido para {self.dead}")
+                self._move_dead(batch[0][0])
+                return
+            mid = len(batch) // 2
+            self._send_batch(batch[:mid])
+            self._send_batch(batch[mid:])
+            return
+
+        now_ns = time.time_ns()
+        for claimed, _ in batch:
+            claimed.unlink(missing_ok=True)
+        with self._lock:
+            self.stats["sent"] += len(batch)
+            self.stats["latencies_s"].extend(
+                (now_ns - int(claimed.name.split("-")[0])) / 1e9 for claimed, _ in batch
+            )
+
+    def _send_loop(self) -> None:
+        failures = 0
+        while not self._stop.is_set():
+            batch = self._load_batch()
+            if not batch:
+                self._release_stale()
+                self._wake.wait(self.flush_interval_s)
+                self._wake.clear()
+                continue
+
+            self._inflight = len(batch)
+            try:
+                self._send_batch(batch)
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                # endpoint fora: os arquivos voltam para a outbox; espera mais a cada rodada
+                failures += 1
+                if failures == 1:
+                    print(f"[azure] Function indisponível ({e}); alertas aguardando na outbox {self.outbox}")
+                self._stop.wait(self._backoff(min(failures, 10)))
+                continue
+            finally:
+                for claimed, _ in batch:
+                    if claimed.exists():
+                        self._release(claimed)
+                self._inflight = 0
+
+            if failures:
+                print(f"[azure] Function de volta; enviando a outbox ({len(self.pending())} pendente(s))")
+            failures = 0
+
+    def close(self, drain_timeout_s: float = 10.0) -> None:
+        """Espera a outbox esvaziar (até drain_timeout_s) e encerra a thread de envio."""
+        deadline = time.monotonic() + drain_timeout_s
+        while (
+            self._sender is not None
+            and self._sender.is_alive()
+            and (self.pending() or self._inflight)
+            and time.monotonic() < deadline
+        ):
+            self._wake.set()
+            time.sleep(0.05)
+        self._stop.set()
+        self._wake.set()
+        if self._sender is not None:
+            self._sender.join()
+        self.session.close()
+
+    def __enter__(self) -> "FunctionClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+_client: Optional[FunctionClient] = None
+_client_lock = threading.Lock()
+
+
+def get_function_client() -> FunctionClient:
+    """Cliente compartilhado, configurado pelas variáveis AZURE_*."""
+    global _client
     url = os.getenv("AZURE_FUNCTION_URL")
     if not url:
         raise RuntimeError("Defina AZURE_FUNCTION_URL com a URL completa da Function (incluindo ?code=...).")
 
-    resp = requests.post(url, json=payload, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    with _client_lock:
+        if _client is None or _client.url != url:
+            _client = FunctionClient(
+                url,
+                outbox_dir=os.getenv("AZURE_OUTBOX_DIR", "results/azure_outbox"),
+                timeout_s=float(os.getenv("AZURE_TIMEOUT_S", "10")),
+                max_retries=int(os.getenv("AZURE_MAX_RETRIES", "4")),
+                batch_max=int(os.getenv("AZURE_BATCH_MAX", "1")),
+                gzip_min_bytes=_optional_int("AZURE_GZIP_MIN_BYTES"),
+            )
+            if _client.pending():
+                # alertas que ficaram de uma execução anterior
+                _client.start()
+        return _client
+
+
+@metrics.timed("azure.send")
+def send_alert_to_function(payload: dict) -> dict:
+    """
+    Envia o alerta com retry; se a Function estiver fora, o alerta fica na
+    outbox (resposta {"queued": True, ...}) e é reenviado em segundo plano
+    ou na próxima execução.
+    """
+    return get_function_client().send(payload)
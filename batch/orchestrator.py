@@ -0,0 +1,386 @@
+"""
+Reprocessamento em lote de procedimentos gravados (PIPELINE_MODE=batch no
+main.py): cada procedimento vira um job de vídeo e um de áudio, distribuídos
+num pool de processos; a fusão roda no processo principal quando os dois
+terminam.
+
+- Entrada: um diretório (cada vídeo é um procedimento; o áudio é o .wav de
+  mesmo nome ao lado, se existir, ou é extraído do próprio vídeo) ou um
+  manifesto .jsonl/.json com {"id", "video", "audio"} por procedimento
+  (caminhos relativos ao manifesto).
+- Balanceamento: jobs em ordem decrescente de custo estimado (duração do
+  arquivo; áudio pesa AUDIO_COST_RATIO do vídeo), numa fila única — os
+  longos começam primeiro e os curtos preenchem o fim.
+- Cada worker carrega o YOLO uma vez (no primeiro job de vídeo) e usa
+  torch_threads threads; o padrão é workers x threads = núcleos da máquina.
+- checkpoint.jsonl registra cada job concluído (com tamanho/mtime da
+  entrada): rodar de novo depois de uma queda só executa o que falta.
+- summary.json consolida risco, regra e contagens de cada procedimento.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+import traceback
+import wave
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+
+from telemetry import metrics
+from video.worker_pool import capped_process_pool, default_workers, worker_model
+
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv", ".m4v")
+# custo relativo de 1 s de áudio (VAD + ASR) frente a 1 s de vídeo (YOLO)
+AUDIO_COST_RATIO = 0.25
+
+
+@dataclass
+class Procedure:
+    id: str
+    video: Optional[str]
+    audio: Optional[str]  # None = extrair do vídeo
+    duration_s: float
+
+
+@dataclass(frozen=True)
+class Job:
+    procedure_id: str
+    kind: str  # "video" | "audio"
+    video: Optional[str]
+    audio: Optional[str]
+    duration_s: float
+    fingerprint: str  # tamanho:mtime das entradas; muda -> o job roda de novo
+
+    @property
+    def key(self) -> str:
+        return f"{self.procedure_id}:{self.kind}"
+
+    @property
+    def cost(self) -> float:
+        return self.duration_s * (1.0 if self.kind == "video" else AUDIO_COST_RATIO)
+
+
+def media_duration_s(path: Optional[str]) -> float:
+    """Duração pelo cabeçalho (WAV) ou por frames/fps (vídeo); 0.0 se não der para ler."""
+    if not path:
+        return 0.0
+    if path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, "rb") as wf:
+                return wf.getnframes() / float(wf.getframerate())
+        except (OSError, wave.Error, EOFError):
+            return 0.0
+    cap = cv2.VideoCapture(path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+        return frames / fps if fps > 0 else 0.0
+    finally:
+        cap.release()
+
+
+def _fingerprint(*paths: Optional[str]) -> str:
+    parts = []
+    for p in paths:
+        if p:
+            st = os.stat(p)
+            parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+    return "|".join(parts)
+
+
+def load_procedures(source: str) -> List[Procedure]:
+    """Procedimentos de um diretório de vídeos ou de um manifesto .jsonl/.json."""
+    src = Path(source)
+    raw: List[Dict[str, Any]] = []
+    if src.is_dir():
+        for video in sorted(p for p in src.rglob("*") if p.suffix.lower() in VIDEO_EXTS):
+            wav = video.with_suffix(".wav")
+            raw.append({
+                "id": str(video.relative_to(src).with_suffix("")).replace(os.sep, "__"),
+                "video": str(video),
+                "audio": str(wav) if wav.exists() else None,
+            })
+    elif src.is_file():
+        with open(src, "r", encoding="utf-8") as f:
+            if src.suffix == ".jsonl":
+                entries = [json.loads(line) for line in f if line.strip()]
+            else:
+                entries = json.load(f)
+        for i, e in enumerate(entries):
+            if not e.get("video") and not e.get("audio"):
+                raise ValueError(f"Manifesto {src}: entrada {i} sem 'video' nem 'audio'")
+            resolve = lambda p: str((src.parent / p) if not Path(p).is_absolute() else Path(p)) if p else None  # noqa: E731
+            video, audio = resolve(e.get("video")), resolve(e.get("audio"))
+            raw.append({"id": str(e.get("id") or Path(video or audio).stem), "video": video, "audio": audio})
+    else:
+        raise FileNotFoundError(f"Entrada do lote não encontrada: {source}")
+
+    procedures: List[Procedure] = []
+    seen = set()
+    for e in raw:
+        if e["id"] in seen:
+            raise ValueError(f"Procedimento duplicado no lote: {e['id']}")
+        seen.add(e["id"])
+        for key in ("video", "audio"):
+            if e[key] and not Path(e[key]).exists():
+                raise FileNotFoundError(f"Procedimento {e['id']}: {key} não encontrado: {e[key]}")
+        duration = media_duration_s(e["video"]) or media_duration_s(e["audio"])
+        procedures.append(Procedure(e["id"], e["video"], e["audio"], duration))
+    return procedures
+
+
+def plan_jobs(procedures: List[Procedure]) -> List[Job]:
+    """Jobs de vídeo e áudio de cada procedimento, do mais caro para o mais barato."""
+    jobs = []
+    for p in procedures:
+        if p.video:
+            jobs.append(Job(p.id, "video", p.video, None, p.duration_s, _fingerprint(p.video)))
+        if p.audio or p.video:
+            jobs.append(Job(p.id, "audio", p.video, p.audio, p.duration_s, _fingerprint(p.audio or p.video)))
+    return sorted(jobs, key=lambda j: (-j.cost, j.key))
+
+
+class Checkpoint:
+    """Jobs concluídos, um JSON por linha (append + fsync); a última linha de cada job vale."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.done: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # linha truncada por uma queda
+                    if record.get("status") == "done":
+                        self.done[record["key"]] = record
+                    else:
+                        self.done.pop(record["key"], None)
+
+    def is_done(self, job: Job) -> bool:
+        record = self.done.get(job.key)
+        return (
+            record is not None
+            and record.get("fingerprint") == job.fingerprint
+            and Path(record.get("result_path", "")).exists()
+        )
+
+    def mark(self, record: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if record.get("status") == "done":
+            self.done[record["key"]] = record
+
+
+# ---- lado do worker ----
+
+
+def _write_json(path: Path, obj: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+
+
+def _video_job(job: Job, cfg: Dict[str, Any], out_dir: Path) -> Dict[str, Any]:
+    from video.episodes import aggregate_episodes
+    from video.inference_video import run_video_inference
+
+    model, device = worker_model(cfg["VIDEO_MODEL"], cfg["VIDEO_BACKEND"])
+
+    stats: Dict[str, Any] = {}
+    events = run_video_inference(
+        video_path=job.video,  # type: ignore[arg-type]
+        model_path=cfg["VIDEO_MODEL"],
+        model=model,
+        device=device,
+        backend=cfg["VIDEO_BACKEND"],
+        conf_threshold=cfg["VIDEO_CONF"],
+        output_dir=str(out_dir),
+        batch_size=cfg["VIDEO_BATCH_SIZE"],
+        pipeline=cfg["VIDEO_PIPELINE"],
+        color_gate_threshold=cfg["VIDEO_COLOR_GATE"],
+        detect_every=cfg["VIDEO_DETECT_EVERY"],
+        output_mode=cfg["VIDEO_OUTPUT_MODE"],
+        stats=stats,
+    )
+    stats["detections"] = len(events)
+    episodes = aggregate_episodes(events, max_gap_s=cfg["VIDEO_EPISODE_GAP_S"])
+    return {"episodes": [asdict(e) for e in episodes], "stats": stats}
+
+
+def _audio_job(job: Job, cfg: Dict[str, Any], out_dir: Path) -> Dict[str, Any]:
+    from audio.audio_features import extract_audio_features
+    from audio.urgency_detection import detect_clinical_urgency
+
+    features = extract_audio_features(
+        audio_path=job.audio,
+        video_path=job.video if not job.audio else None,
+        language=cfg["AUDIO_LANGUAGE"],
+        max_workers=cfg["AUDIO_SR_WORKERS"],
+        segmentation=cfg["AUDIO_SEGMENTATION"],
+        asr_backend=cfg["AUDIO_ASR_BACKEND"],
+    )
+    events = detect_clinical_urgency(features)
+    return {"features": features, "events": [asdict(e) for e in events]}
+
+
+def run_job(job: Job, cfg: Dict[str, Any], out_dir: str) -> Dict[str, Any]:
+    """Executa um job no worker e grava o resultado em <out_dir>/<procedimento>/<tipo>.json."""
+    proc_dir = Path(out_dir) / job.procedure_id
+    t0 = time.perf_counter()
+    with metrics.timer(f"batch.{job.kind}_job"):
+        result = (_video_job if job.kind == "video" else _audio_job)(job, cfg, proc_dir)
+    elapsed = time.perf_counter() - t0
+    result_path = proc_dir / f"{job.kind}.json"
+    _write_json(result_path, {"elapsed_s": elapsed, **result})
+    return {
+        "key": job.key,
+        "status": "done",
+        "fingerprint": job.fingerprint,
+        "result_path": str(result_path),
+        "elapsed_s": elapsed,
+        "pid": os.getpid(),
+        "metrics": metrics.drain(),
+    }
+
+
+# ---- lado do orquestrador ----
+
+def _fuse_procedure(proc: Procedure, out_dir: Path, rules: Any, window_s: float) -> Dict[str, Any]:
+    from fusion.rules_engine import fuse_events
+
+    video = audio = None
+    if (out_dir / proc.id / "video.json").exists():
+        with open(out_dir / proc.id / "video.json", "r", encoding="utf-8") as f:
+            video = json.load(f)
+    if (out_dir / proc.id / "audio.json").exists():
+        with open(out_dir / proc.id / "audio.json", "r", encoding="utf-8") as f:
+            audio = json.load(f)
+
+    fusion = fuse_events(
+        video_events=(video or {}).get("episodes", []),
+        audio_events=(audio or {}).get("events", []),
+        window_s=window_s,
+        rules=rules,
+    )
+    _write_json(out_dir / proc.id / "fusion.json", fusion)
+
+    stats = (video or {}).get("stats", {})
+    features = (audio or {}).get("features", {})
+    return {
+        "id": proc.id,
+        "video": proc.video,
+        "audio": proc.audio,
+        "duration_s": proc.duration_s,
+        "risk_level": fusion.get("risk_level"),
+        "rule": fusion.get("rule"),
+        "action": fusion.get("action"),
+        "matched_intervals": len(fusion.get("matched_intervals", [])),
+        "video_episodes": len((video or {}).get("episodes", [])),
+        "video_detections": stats.get("detections", 0),
+        "frames_total": stats.get("frames_total", 0),
+        "audio_chunks": features.get("num_chunks", 0),
+        "audio_events": len((audio or {}).get("events", [])),
+        "video_elapsed_s": (video or {}).get("elapsed_s"),
+        "audio_elapsed_s": (audio or {}).get("elapsed_s"),
+    }
+
+
+def run_batch(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Processa todos os procedimentos de cfg["BATCH_INPUT"] e grava
+    <BATCH_OUTPUT_DIR>/summary.json. Jobs que falham ficam fora do checkpoint
+    (rodam de novo na próxima execução) e aparecem em summary["failed"].
+    """
+    from alerts.alert_manager import save_alert_log
+    from fusion.rules_engine import load_rules
+
+    out_dir = Path(cfg["BATCH_OUTPUT_DIR"])
+    out_dir.mkdir(parents=True, exist_ok=True)
+    torch_threads = max(1, cfg["BATCH_TORCH_THREADS"])
+    workers = cfg["BATCH_WORKERS"] or default_workers(torch_threads)
+
+    procedures = load_procedures(cfg["BATCH_INPUT"])
+    jobs = plan_jobs(procedures)
+    checkpoint = Checkpoint(out_dir / "checkpoint.jsonl")
+    pending = [j for j in jobs if not checkpoint.is_done(j)]
+    print(
+        f"Lote: {len(procedures)} procedimentos, {len(jobs)} jobs "
+        f"({len(jobs) - len(pending)} já concluídos no checkpoint) | "
+        f"{workers} workers x {torch_threads} thread(s)"
+    )
+
+    t0 = time.perf_counter()
+    failed: List[Dict[str, Any]] = []
+    finished_now = set()
+    if pending:
+        with capped_process_pool(min(workers, len(pending)), torch_threads, cfg["METRICS_ENABLED"]) as pool:
+            # a fila do pool é FIFO: submeter em ordem de custo = escalonamento LPT
+            futures: Dict[Future, Job] = {pool.submit(run_job, job, cfg, str(out_dir)): job for job in pending}
+            remaining = set(futures)
+            while remaining:
+                done, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    job = futures[fut]
+                    try:
+                        record = fut.result()
+                    except BrokenProcessPool as e:
+                        # um worker morreu (OOM, sinal): o checkpoint guarda o que já terminou
+                        raise RuntimeError(
+                            f"Worker do lote encerrado abruptamente ({e}); rode de novo para retomar do checkpoint."
+                        ) from e
+                    except Exception as e:  # noqa: BLE001 - um procedimento ruim não derruba o lote
+                        failed.append({"key": job.key, "error": f"{type(e).__name__}: {e}"})
+                        checkpoint.mark({"key": job.key, "status": "failed", "error": traceback.format_exception_only(e)[-1].strip()})
+                        print(f"  ✗ {job.key}: {e}")
+                        continue
+                    metrics.merge(record.pop("metrics", None))
+                    checkpoint.mark(record)
+                    finished_now.add(job.procedure_id)
+                    n_done = len(futures) - len(remaining)
+                    print(f"  ✓ {job.key} ({record['elapsed_s']:.1f}s) [{n_done}/{len(futures)}]")
+
+    rules = load_rules(cfg["FUSION_RULES"] or None)
+    failed_procs = {f["key"].split(":")[0] for f in failed}
+    rows = []
+    for proc in procedures:
+        if proc.id in failed_procs:
+            continue
+        row = _fuse_procedure(proc, out_dir, rules, cfg["FUSION_WINDOW_S"])
+        rows.append(row)
+        if proc.id in finished_now and cfg["BATCH_SAVE_ALERTS"]:
+            save_alert_log({"procedure_id": proc.id, **row}, output_dir=cfg["OUTPUT_DIR"])
+
+    wall_s = time.perf_counter() - t0
+    processed_s = sum(p.duration_s for p in procedures if p.id in finished_now)
+    summary = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "input": cfg["BATCH_INPUT"],
+        "workers": workers,
+        "torch_threads": torch_threads,
+        "wall_s": wall_s,
+        "procedures_total": len(procedures),
+        "procedures_processed_now": len(finished_now),
+        "media_s_processed_now": processed_s,
+        "realtime_factor": processed_s / wall_s if wall_s > 0 else 0.0,
+        "risk_counts": {
+            level: sum(1 for r in rows if r["risk_level"] == level)
+            for level in sorted({str(r["risk_level"]) for r in rows})
+        },
+        "failed": failed,
+        "procedures": rows,
+    }
+    _write_json(out_dir / "summary.json", summary)
+    return summary
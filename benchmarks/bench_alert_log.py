@@ -0,0 +1,66 @@
+"""
+Throughput do log de alertas (alerts/alert_manager.AlertLog): N alertas
+gravados por T threads, com fsync em lote, rotação e compressão, e
+conferência de que todos voltam em query().
+
+Uso:
+    python -m benchmarks.bench_alert_log
+    BENCH_ALERTS=200000 BENCH_THREADS=8 BENCH_FLUSH_EVERY=1024 python -m benchmarks.bench_alert_log
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+
+from alerts.alert_manager import AlertLog
+
+ALERT = {
+    "risk_level": "high",
+    "reasons": ["bleeding", "patient_distress"],
+    "action": "notify_medical_team",
+    "rule": "bleeding_with_distress",
+    "matched_intervals": [{"start_s": 120.0, "end_s": 130.0}],
+}
+
+
+def main() -> None:
+    n_alerts = int(os.getenv("BENCH_ALERTS", "50000"))
+    n_threads = int(os.getenv("BENCH_THREADS", "4"))
+    flush_every = int(os.getenv("BENCH_FLUSH_EVERY", "256"))
+    per_thread = n_alerts // n_threads
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        log = AlertLog(log_dir, flush_every=flush_every, max_segment_bytes=4 * 1024 * 1024)
+
+        def _writer(k: int) -> None:
+            for i in range(per_thread):
+                log.append({**ALERT, "writer": k, "i": i})
+
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=_writer, args=(k,)) for k in range(n_threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        log.close()
+        elapsed = time.perf_counter() - t0
+
+        reader = AlertLog(log_dir)
+        t0 = time.perf_counter()
+        n_read = sum(1 for _ in reader.query())
+        t_read = time.perf_counter() - t0
+        reader.close()
+
+        segments = [f for f in os.listdir(log_dir) if f.startswith("alerts-")]
+        print(
+            f"{per_thread * n_threads} alertas, {n_threads} threads, fsync a cada {flush_every}: "
+            f"{per_thread * n_threads / elapsed:,.0f} alertas/s | {len(segments)} segmentos"
+        )
+        print(f"leitura: {n_read} alertas em {t_read:.2f}s")
+        assert n_read == per_thread * n_threads, "alertas perdidos"
+
+
+if __name__ == "__main__":
+    main()
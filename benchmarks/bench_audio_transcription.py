@@ -0,0 +1,63 @@
+"""
+Throughput da transcrição por trechos: laço serial x thread pool, usando o
+backend de ASR simulado (FakeASRBackend, sem rede) com latência fixa por
+chamada, e opcionalmente o backend real configurado em BENCH_ASR_BACKEND.
+
+Sem AUDIO_INPUT (e sem o WAV de data/), usa o WAV sintético de
+benchmarks/fixtures.py.
+
+Uso:
+    python -m benchmarks.bench_audio_transcription
+    BENCH_SR_LATENCY_S=1.0 BENCH_WORKERS="1,4,8" python -m benchmarks.bench_audio_transcription
+    BENCH_ASR_BACKEND=torchaudio python -m benchmarks.bench_audio_transcription
+"""
+from __future__ import annotations
+
+import os
+import time
+
+from benchmarks import fixtures
+from audio.asr_backends import FakeASRBackend, get_asr_backend
+from audio.audio_features import extract_audio_features
+
+
+def main() -> None:
+    audio_path = fixtures.audio_input()
+    latency = float(os.getenv("BENCH_SR_LATENCY_S", "0.8"))
+    failure_rate = float(os.getenv("BENCH_SR_FAILURE_RATE", "0.0"))
+    workers = [int(n) for n in os.getenv("BENCH_WORKERS", "1,4,8").split(",")]
+    segmentation = os.getenv("AUDIO_SEGMENTATION", "fixed")
+
+    baseline = None
+    for n in workers:
+        fake = FakeASRBackend(
+            latency_s=latency,
+            failure_rate=failure_rate,
+            max_workers=n,
+            retry_backoff_s=0.05,
+        )
+        t0 = time.perf_counter()
+        features = extract_audio_features(audio_path=audio_path, asr_backend=fake, segmentation=segmentation)
+        elapsed = time.perf_counter() - t0
+        if baseline is None:
+            baseline = elapsed
+        print(
+            f"fake max_workers={n:>2} | {elapsed:.2f}s | trechos={features['num_chunks']} | "
+            f"chamadas={fake.calls} | {features['num_chunks'] / elapsed:.2f} trechos/s | "
+            f"speedup {baseline / elapsed:.1f}x"
+        )
+
+    real = os.getenv("BENCH_ASR_BACKEND")
+    if real:
+        backend = get_asr_backend(real, max_workers=max(workers))
+        t0 = time.perf_counter()
+        features = extract_audio_features(audio_path=audio_path, asr_backend=backend, segmentation=segmentation)
+        elapsed = time.perf_counter() - t0
+        print(
+            f"{real} | {elapsed:.2f}s | trechos={features['num_chunks']} | "
+            f"{features['num_chunks'] / elapsed:.2f} trechos/s | transcript={features['transcript'][:80]!r}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Envio de alertas para a Azure Function contra o substituto local
+(benchmarks/fake_function_server.py), com latência e falhas injetadas:
+
+- naive: requests.post por alerta (conexão nova, sem retry) — o código antigo;
+- pooled: FunctionClient.send (sessão com keep-alive + retry com backoff);
+- outbox: FunctionClient.enqueue + envio em segundo plano em lotes de
+  BENCH_BATCH (a latência é do enqueue até a confirmação da Function).
+
+Mostra vazão, latência p50/p95/p99 e quantos alertas chegaram.
+
+Uso:
+    python -m benchmarks.bench_azure_client
+    BENCH_ALERTS=500 BENCH_LATENCY_MS=20 BENCH_FAILURE_RATE=0.1 BENCH_BATCH=50 BENCH_GZIP=1 python -m benchmarks.bench_azure_client
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+import requests
+
+from azure_integration.function_client import FunctionClient
+from benchmarks.fake_function_server import FakeFunctionServer
+
+ALERT = {
+    "risk_level": "high",
+    "reasons": ["bleeding", "patient_distress"],
+    "action": "notify_medical_team",
+    "matched_intervals": [{"start_s": 120.0, "end_s": 130.0, "events": {"anomalous_bleeding": 42, "patient_distress": 3}}],
+    "video_summary": {"count_events": 1200, "count_episodes": 4},
+    "transcript": "it hurts so much, I feel dizzy, please help " * 8,
+}
+
+
+def _report(name: str, n_alerts: int, delivered: int, elapsed: float, latencies: List[float], server: FakeFunctionServer) -> None:
+    lat = np.asarray(latencies) * 1000 if latencies else np.zeros(1)
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    print(
+        f"{name:<7} {n_alerts / elapsed:8.1f} alertas/s | p50 {p50:7.1f} ms | p95 {p95:7.1f} ms | "
+        f"p99 {p99:7.1f} ms | entregues {delivered}/{n_alerts} | {server.requests} req | {server.bytes_in / 1024:.0f} KiB"
+    )
+
+
+def main() -> None:
+    n_alerts = int(os.getenv("BENCH_ALERTS", "200"))
+    latency_s = float(os.getenv("BENCH_LATENCY_MS", "20")) / 1000
+    failure_rate = float(os.getenv("BENCH_FAILURE_RATE", "0.1"))
+    batch = int(os.getenv("BENCH_BATCH", "50"))
+    gzip_min = 1024 if os.getenv("BENCH_GZIP", "0") == "1" else None
+
+    print(f"{n_alerts} alertas, latência ~{latency_s * 1000:.0f} ms, {failure_rate:.0%} de falhas (503)")
+
+    # naive: como o cliente antigo, uma conexão por alerta e nenhum retry
+    with FakeFunctionServer(latency_s=latency_s, failure_rate=failure_rate) as server:
+        latencies = []
+        t0 = time.perf_counter()
+        for _ in range(n_alerts):
+            t = time.perf_counter()
+            try:
+                requests.post(server.url, json=ALERT, timeout=30).raise_for_status()
+                latencies.append(time.perf_counter() - t)
+            except requests.RequestException:
+                pass  # alerta perdido
+        _report("naive", n_alerts, len(server.received), time.perf_counter() - t0, latencies, server)
+
+    with FakeFunctionServer(latency_s=latency_s, failure_rate=failure_rate) as server, tempfile.TemporaryDirectory() as tmp:
+        client = FunctionClient(server.url, outbox_dir=tmp, backoff_s=0.05, gzip_min_bytes=gzip_min)
+        t0 = time.perf_counter()
+        for _ in range(n_alerts):
+            client.send(ALERT)
+        client.close(drain_timeout_s=60)
+        _report("pooled", n_alerts, len(server.received), time.perf_counter() - t0, client.stats["latencies_s"], server)
+
+    with FakeFunctionServer(latency_s=latency_s, failure_rate=failure_rate) as server, tempfile.TemporaryDirectory() as tmp:
+        client = FunctionClient(server.url, outbox_dir=tmp, backoff_s=0.05, batch_max=batch, gzip_min_bytes=gzip_min)
+        t0 = time.perf_counter()
+        for _ in range(n_alerts):
+            client.enqueue(ALERT)
+        enqueue_s = time.perf_counter() - t0
+        client.close(drain_timeout_s=60)
+        _report("outbox", n_alerts, len(server.received), time.perf_counter() - t0, client.stats["latencies_s"], server)
+        print(f"        enqueue: {enqueue_s / n_alerts * 1e6:.0f} µs/alerta (fsync incluso); retries: {client.stats['retries']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Microbenchmark do casamento de frases de distress: DistressMatcher (todas as
+ocorrências, por palavra inteira) x `[p for p in patterns if p in text]`
+(implementação antiga: só presença, para na primeira ocorrência e casa
+dentro de palavras), com vocabulários crescentes de frases sintéticas.
+
+Uso:
+    python -m benchmarks.bench_distress_matcher
+    BENCH_VOCAB_SIZES="10,100,1000" BENCH_TEXT_WORDS=20000 python -m benchmarks.bench_distress_matcher
+"""
+from __future__ import annotations
+
+import os
+import random
+import time
+from typing import List
+
+from audio.distress_matcher import DISTRESS_PATTERNS, DistressMatcher
+
+FILLER = "the patient is resting the procedure continues as planned and vitals are stable".split()
+
+
+def _vocab(n: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    extra = [f"symptom{i} {rng.choice(FILLER)} level{i % 7}" for i in range(max(0, n - len(DISTRESS_PATTERNS)))]
+    return DISTRESS_PATTERNS + extra
+
+
+def _transcript(n_words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = [rng.choice(FILLER) for _ in range(n_words)]
+    for i in range(0, n_words, 500):
+        words[i] = "i feel dizzy"
+    return " ".join(words)
+
+
+def main() -> None:
+    sizes = [int(n) for n in os.getenv("BENCH_VOCAB_SIZES", "10,100,1000").split(",")]
+    n_words = int(os.getenv("BENCH_TEXT_WORDS", "20000"))
+    text = _transcript(n_words)
+    text_l = text.lower()
+
+    for n in sizes:
+        patterns = _vocab(n)
+
+        t0 = time.perf_counter()
+        matcher = DistressMatcher(patterns)
+        t_build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        _ = [p for p in patterns if p in text_l]
+        t_scan = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        found = matcher.find_all(text)
+        t_match = time.perf_counter() - t0
+
+        print(
+            f"frases={len(patterns):>5} | substring {t_scan * 1e3:8.1f} ms | "
+            f"matcher {t_match * 1e3:8.1f} ms (compilação {t_build * 1e3:.1f} ms, {len(found)} ocorrências)"
+        )
+
+
+if __name__ == "__main__":
+    main()
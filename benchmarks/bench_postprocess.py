@@ -0,0 +1,91 @@
+"""
+Microbenchmark do pós-processamento das detecções: filtro vetorizado
+(_filter_boxes) x laço box a box com .item()/.tolist() (implementação antiga).
+
+Uso:
+    python -m benchmarks.bench_postprocess
+    BENCH_BOX_COUNTS="10,100,300,1000" python -m benchmarks.bench_postprocess
+"""
+from __future__ import annotations
+
+import os
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import torch
+
+from video.inference_video import Detection, _filter_boxes
+
+W, H = 1280, 720
+NAMES = {0: "bleeding", 1: "instrument"}
+
+
+class _FakeBoxes(SimpleNamespace):
+    def __len__(self) -> int:
+        return int(self.xyxy.shape[0])
+
+
+def _fake_result(n: int, seed: int = 0) -> SimpleNamespace:
+    g = torch.Generator().manual_seed(seed)
+    xy = torch.rand(n, 2, generator=g) * torch.tensor([W * 0.8, H * 0.8])
+    wh = torch.rand(n, 2, generator=g) * torch.tensor([W * 0.3, H * 0.3])
+    boxes = _FakeBoxes(
+        xyxy=torch.cat([xy, xy + wh], dim=1),
+        conf=torch.rand(n, generator=g),
+        cls=torch.randint(0, len(NAMES), (n,), generator=g).float(),
+    )
+    return SimpleNamespace(boxes=boxes)
+
+
+def _filter_boxes_loop(
+    r0,
+    names: Optional[Dict[int, str]],
+    w: int,
+    h: int,
+    min_conf: float,
+    min_bbox_area_ratio: float,
+) -> List[Detection]:
+    kept: List[Detection] = []
+    boxes = r0.boxes
+    for i in range(len(boxes)):
+        conf = float(boxes.conf[i].item())
+        cls_id = int(boxes.cls[i].item())
+        xyxy = boxes.xyxy[i].tolist()
+        label_name = names.get(cls_id) if isinstance(names, dict) else None
+        if label_name is not None and label_name != "bleeding":
+            continue
+        if conf < min_conf:
+            continue
+        x1, y1, x2, y2 = map(float, xyxy)
+        if (max(0.0, x2 - x1) * max(0.0, y2 - y1)) / float(w * h) < min_bbox_area_ratio:
+            continue
+        kept.append(((x1, y1, x2, y2), conf, label_name))
+    return kept
+
+
+def _time_per_call(fn, r0, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(r0, NAMES, W, H, 0.60, 0.015)
+    return (time.perf_counter() - t0) / repeat
+
+
+def main() -> None:
+    counts = [int(n) for n in os.getenv("BENCH_BOX_COUNTS", "10,100,300,1000").split(",")]
+    repeat = int(os.getenv("BENCH_REPEAT", "200"))
+
+    for n in counts:
+        r0 = _fake_result(n)
+        assert _filter_boxes(r0, NAMES, W, H, 0.60, 0.015) == _filter_boxes_loop(r0, NAMES, W, H, 0.60, 0.015)
+
+        t_loop = _time_per_call(_filter_boxes_loop, r0, repeat)
+        t_vec = _time_per_call(_filter_boxes, r0, repeat)
+        print(
+            f"boxes={n:>5} | laço {t_loop * 1e6:9.1f} µs | vetorizado {t_vec * 1e6:9.1f} µs | "
+            f"{t_loop / t_vec if t_vec else 0:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
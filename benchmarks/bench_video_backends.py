@@ -0,0 +1,58 @@
+"""
+Compara backends de inferência (torch x artefatos exportados) em latência,
+throughput e paridade das detecções com o .pt original.
+
+Sem VIDEO_INPUT (e sem o clipe de data/), usa o clipe sintético de
+benchmarks/fixtures.py; sem VIDEO_MODEL, o YOLO minúsculo de pesos aleatórios.
+
+Uso:
+    python -m video.export_model          # gera os artefatos
+    BENCH_BACKENDS="torch,onnx,openvino,openvino_int8" python -m benchmarks.bench_video_backends
+"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict
+
+from benchmarks import fixtures
+from benchmarks.bench_video_tracking import match_events
+from video.inference_video import run_video_inference
+
+
+def main() -> None:
+    base: Dict[str, Any] = {
+        "video_path": fixtures.video_input(),
+        "model_path": fixtures.video_model(),
+        "conf_threshold": float(os.getenv("VIDEO_CONF", "0.35")),
+        "output_dir": os.getenv("BENCH_OUTPUT_DIR", "results/bench"),
+        "batch_size": int(os.getenv("BENCH_BATCH_SIZE", "1")),
+    }
+    backends = os.getenv("BENCH_BACKENDS", "torch,onnx,openvino").split(",")
+
+    reference = None
+    for backend in backends:
+        stats: Dict[str, Any] = {}
+        try:
+            t0 = time.perf_counter()
+            events = run_video_inference(backend=backend, stats=stats, **base)
+            elapsed = time.perf_counter() - t0
+        except FileNotFoundError as e:
+            print(f"{backend:<14} | pulado: {e}")
+            continue
+
+        n_frames = stats["frames_total"]
+        fps = n_frames / elapsed if elapsed > 0 else 0.0
+        latency_ms = 1000.0 * elapsed / n_frames if n_frames else 0.0
+
+        if reference is None:
+            reference = events
+        m = match_events(reference, events)
+        print(
+            f"{backend:<14} | {elapsed:.2f}s | {fps:.1f} fps | {latency_ms:.1f} ms/frame | "
+            f"eventos={len(events)} | paridade P={m['precision']:.3f} R={m['recall']:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
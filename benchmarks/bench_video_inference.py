@@ -0,0 +1,85 @@
+"""
+Compara o throughput (frames/s) de run_video_inference em diferentes modos.
+
+Sem VIDEO_INPUT (e sem o clipe de data/), usa o clipe sintético de
+benchmarks/fixtures.py; sem VIDEO_MODEL, o YOLO minúsculo de pesos aleatórios.
+
+Uso:
+    python -m benchmarks.bench_video_inference
+    BENCH_BATCH_SIZES="1,8,16" python -m benchmarks.bench_video_inference
+
+Cada batch_size roda no modo serial e no modo pipeline (decode/infer/encode
+em estágios paralelos). Com BENCH_COLOR_GATE (ex.: "0.005") roda também o
+maior batch_size com o pré-filtro de cor HSV ativado.
+"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, List
+
+import cv2
+
+from benchmarks import fixtures
+from video.inference_video import run_video_inference
+
+
+def _count_frames(video_path: str) -> int:
+    cap = cv2.VideoCapture(video_path)
+    n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    cap.release()
+    return n
+
+
+def _run(video_path: str, model_path: str, conf: float, output_dir: str, **kwargs: Any) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {}
+    t0 = time.perf_counter()
+    events = run_video_inference(
+        video_path=video_path,
+        model_path=model_path,
+        conf_threshold=conf,
+        output_dir=output_dir,
+        stats=stats,
+        **kwargs,
+    )
+    elapsed = time.perf_counter() - t0
+    return {"elapsed_s": elapsed, "num_events": len(events), **stats}
+
+
+def main() -> None:
+    video_path = fixtures.video_input()
+    model_path = fixtures.video_model()
+    conf = float(os.getenv("VIDEO_CONF", "0.35"))
+    output_dir = os.getenv("BENCH_OUTPUT_DIR", "results/bench")
+    batch_sizes: List[int] = [int(b) for b in os.getenv("BENCH_BATCH_SIZES", "1,4,16").split(",")]
+
+    n_frames = _count_frames(video_path)
+    print(f"Vídeo: {video_path} ({n_frames} frames) | modelo: {model_path}")
+
+    baseline_events = None
+    for bs in batch_sizes:
+        for pipeline in (False, True):
+            stats = _run(video_path, model_path, conf, output_dir, batch_size=bs, pipeline=pipeline)
+            fps = n_frames / stats["elapsed_s"] if stats["elapsed_s"] > 0 else 0.0
+            if baseline_events is None:
+                baseline_events = stats["num_events"]
+            same = "ok" if stats["num_events"] == baseline_events else "DIVERGE"
+            mode = "pipeline" if pipeline else "serial"
+            print(
+                f"batch_size={bs:>3} {mode:<8} | {stats['elapsed_s']:.2f}s | {fps:.1f} fps | "
+                f"eventos={stats['num_events']} ({same})"
+            )
+
+    color_gate = os.getenv("BENCH_COLOR_GATE")
+    if color_gate:
+        bs = max(batch_sizes)
+        stats = _run(video_path, model_path, conf, output_dir, batch_size=bs, color_gate_threshold=float(color_gate))
+        fps = n_frames / stats["elapsed_s"] if stats["elapsed_s"] > 0 else 0.0
+        print(
+            f"batch_size={bs:>3} gate={color_gate} | {stats['elapsed_s']:.2f}s | {fps:.1f} fps | "
+            f"eventos={stats['num_events']} | pulados={stats['frames_skipped_color_gate']}/{stats['frames_total']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
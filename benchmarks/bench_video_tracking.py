@@ -0,0 +1,97 @@
+"""
+Relatório precisão x velocidade do modo de rastreamento (detect_every > 1)
+contra a detecção completa frame a frame (referência).
+
+Sem VIDEO_INPUT (e sem o clipe de data/), usa o clipe sintético de
+benchmarks/fixtures.py; sem VIDEO_MODEL, o YOLO minúsculo de pesos aleatórios.
+
+Uso:
+    python -m benchmarks.bench_video_tracking
+    BENCH_DETECT_EVERY="3,5,10" python -m benchmarks.bench_video_tracking
+"""
+from __future__ import annotations
+
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from benchmarks import fixtures
+from video.inference_video import run_video_inference
+from video.tracking import iou
+from video.video_events import VideoEvent
+
+
+def _by_frame(events: List[VideoEvent]) -> Dict[str, List[Tuple[float, float, float, float]]]:
+    frames: Dict[str, List[Tuple[float, float, float, float]]] = defaultdict(list)
+    for e in events:
+        if e.bbox is not None:
+            frames[e.timestamp].append(e.bbox)
+    return frames
+
+
+def match_events(
+    reference: List[VideoEvent],
+    candidate: List[VideoEvent],
+    iou_threshold: float = 0.5,
+) -> Dict[str, float]:
+    """Precisão/recall por box, casando (gulosamente) boxes do mesmo frame com IoU >= limiar."""
+    ref = _by_frame(reference)
+    cand = _by_frame(candidate)
+
+    tp = 0
+    for ts, ref_boxes in ref.items():
+        remaining = list(cand.get(ts, []))
+        for rb in ref_boxes:
+            best_j, best_iou = -1, iou_threshold
+            for j, cb in enumerate(remaining):
+                score = iou(rb, cb)
+                if score >= best_iou:
+                    best_j, best_iou = j, score
+            if best_j >= 0:
+                remaining.pop(best_j)
+                tp += 1
+
+    n_ref = sum(len(b) for b in ref.values())
+    n_cand = sum(len(b) for b in cand.values())
+    precision = tp / n_cand if n_cand else 1.0
+    recall = tp / n_ref if n_ref else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def _run(**kwargs: Any) -> Tuple[List[VideoEvent], float, Dict[str, Any]]:
+    stats: Dict[str, Any] = {}
+    t0 = time.perf_counter()
+    events = run_video_inference(stats=stats, **kwargs)
+    return events, time.perf_counter() - t0, stats
+
+
+def main() -> None:
+    base = {
+        "video_path": fixtures.video_input(),
+        "model_path": fixtures.video_model(),
+        "conf_threshold": float(os.getenv("VIDEO_CONF", "0.35")),
+        "output_dir": os.getenv("BENCH_OUTPUT_DIR", "results/bench"),
+    }
+    detect_every = [int(n) for n in os.getenv("BENCH_DETECT_EVERY", "3,5,10").split(",")]
+
+    ref_events, ref_elapsed, ref_stats = _run(**base)
+    n_frames = ref_stats["frames_total"]
+    ref_fps = n_frames / ref_elapsed if ref_elapsed > 0 else 0.0
+    print(f"referência (todo frame) | {ref_elapsed:.2f}s | {ref_fps:.1f} fps | eventos={len(ref_events)}")
+
+    for n in detect_every:
+        events, elapsed, stats = _run(detect_every=n, **base)
+        fps = n_frames / elapsed if elapsed > 0 else 0.0
+        m = match_events(ref_events, events)
+        n_tracks = len({e.track_id for e in events if e.track_id is not None})
+        print(
+            f"detect_every={n:>3} | {elapsed:.2f}s | {fps:.1f} fps ({fps / ref_fps if ref_fps else 0:.1f}x) | "
+            f"keyframes={stats['keyframes']} | tracks={n_tracks} | "
+            f"P={m['precision']:.3f} R={m['recall']:.3f} F1={m['f1']:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
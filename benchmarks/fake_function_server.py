@@ -0,0 +1,128 @@
+"""
+Substituto local da Azure Function de alertas, para testar o cliente
+(azure_integration/function_client.py) sem rede: aceita POST JSON (com ou
+sem gzip, alerta único ou {"alerts": [...]}), com latência e falhas (503)
+injetadas. reject(alerta) -> True faz a requisição inteira que traz esse
+alerta ser recusada com 400, como a validação da Function.
+
+Uso:
+    python -m benchmarks.fake_function_server
+    FAKE_PORT=7071 FAKE_LATENCY_MS=80 FAKE_FAILURE_RATE=0.2 python -m benchmarks.fake_function_server
+    # depois: AZURE_FUNCTION_URL=http://127.0.0.1:7071/api/ingest_alert python main.py
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, List, Optional
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como o front-end da Function
+    disable_nagle_algorithm = True  # cabeçalho e corpo saem em writes separados
+
+    def do_POST(self) -> None:  # noqa: N802
+        server: FakeFunctionServer = self.server.owner  # type: ignore[attr-defined]
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+
+        time.sleep(max(0.0, random.gauss(server.latency_s, server.latency_s * server.jitter)))
+        if random.random() < server.failure_rate:
+            self._reply(503, {"error": "injected failure"})
+            return
+
+        payload = json.loads(body)
+        alerts = payload["alerts"] if isinstance(payload, dict) and "alerts" in payload else [payload]
+        if server.reject is not None and any(server.reject(a) for a in alerts):
+            with server.lock:
+                server.requests += 1
+            self._reply(400, {"error": "invalid alert"})
+            return
+        with server.lock:
+            server.received.extend(alerts)
+            server.requests += 1
+            server.bytes_in += len(body)
+        self._reply(200, {"status": "ok", "received": len(alerts)})
+
+    def _reply(self, status: int, obj: Any) -> None:
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+class FakeFunctionServer:
+    """ThreadingHTTPServer em 127.0.0.1; port=0 escolhe uma porta livre."""
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency_s: float = 0.05,
+        jitter: float = 0.3,
+        failure_rate: float = 0.0,
+        reject: Optional[Callable[[Any], bool]] = None,
+    ) -> None:
+        self.latency_s = latency_s
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.reject = reject
+        self.lock = threading.Lock()
+        self.received: List[Any] = []
+        self.requests = 0
+        self.bytes_in = 0
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.owner = self  # type: ignore[attr-defined]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-function", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/api/ingest_alert"
+
+    def start(self) -> "FakeFunctionServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeFunctionServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    server = FakeFunctionServer(
+        port=int(os.getenv("FAKE_PORT", "7071")),
+        latency_s=float(os.getenv("FAKE_LATENCY_MS", "50")) / 1000,
+        failure_rate=float(os.getenv("FAKE_FAILURE_RATE", "0")),
+    )
+    print(f"Function falsa em {server.url} (Ctrl+C para sair)")
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"{len(server.received)} alertas em {server.requests} requisições")
+
+
+if __name__ == "__main__":
+    main()
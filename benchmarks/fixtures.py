@@ -0,0 +1,244 @@
+"""
+Entradas sintéticas e determinísticas para os benchmarks (tudo gerado
+localmente, sem rede):
+
+- synthetic_video: clipe desenhado com OpenCV, fundo texturizado e uma
+  mancha vermelha cuja fração da área segue red_ratios (por frame);
+- synthetic_wav: WAV mono com "sílabas" (tom harmônico com envelope) em
+  rajadas separadas por pausas com ruído baixo, para o VAD achar trechos;
+- synthetic_transcript_features: transcript/segments como os de
+  extract_audio_features, com frases de distress espalhadas;
+- synthetic_fusion_events: listas grandes de eventos de vídeo e áudio;
+- tiny_yolo: YOLOv8 minúsculo (1 classe "bleeding"), pesos aleatórios com
+  semente fixa — mede o custo do pipeline, não a qualidade das detecções.
+
+Os arquivos ficam em BENCH_FIXTURES_DIR (padrão results/bench/fixtures) e
+são reaproveitados quando já existem com os mesmos parâmetros.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from audio.distress_matcher import DISTRESS_PATTERNS
+from fusion.timestamps import format_ts
+
+FIXTURES_DIR = Path(os.getenv("BENCH_FIXTURES_DIR", "results/bench/fixtures"))
+
+FILLER = "the patient is resting the procedure continues as planned and vitals are stable".split()
+
+
+def _fixture_path(kind: str, suffix: str, params: Dict[str, Any]) -> Path:
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    return FIXTURES_DIR / f"{kind}-{digest}{suffix}"
+
+
+def default_red_ratios(n_frames: int) -> List[float]:
+    """Sem vermelho no primeiro terço, mancha crescendo até 8% do frame no segundo, estável no último."""
+    third = max(1, n_frames // 3)
+    return [
+        0.0 if i < third else min(0.08, 0.08 * (i - third + 1) / third)
+        for i in range(n_frames)
+    ]
+
+
+def synthetic_video(
+    n_frames: int = 150,
+    size: Tuple[int, int] = (640, 360),
+    fps: float = 30.0,
+    red_ratios: Optional[Sequence[float]] = None,
+    seed: int = 0,
+) -> str:
+    """Gera (ou reaproveita) o clipe e devolve o caminho do .mp4."""
+    red_ratios = list(red_ratios) if red_ratios is not None else default_red_ratios(n_frames)
+    if len(red_ratios) != n_frames:
+        raise ValueError(f"red_ratios deve ter n_frames={n_frames} valores (recebido: {len(red_ratios)})")
+    params = {"n_frames": n_frames, "size": list(size), "fps": fps, "red_ratios": red_ratios, "seed": seed}
+    path = _fixture_path("video", ".mp4", params)
+    if path.exists():
+        return str(path)
+
+    w, h = size
+    rng = np.random.default_rng(seed)
+    # fundo: tons de pele/tecido com textura fixa; cada frame só desloca um pouco
+    base = np.empty((h, w, 3), dtype=np.uint8)
+    base[:] = (140, 160, 190)  # BGR
+    base = cv2.add(base, rng.integers(0, 30, size=(h, w, 3), dtype=np.uint8))
+    base = cv2.GaussianBlur(base, (7, 7), 0)
+
+    tmp = path.with_name(path.stem + ".tmp.mp4")
+    writer = cv2.VideoWriter(str(tmp), cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+    if not writer.isOpened():
+        raise RuntimeError(f"Não consegui criar o vídeo sintético: {tmp}")
+    try:
+        cx, cy = w // 2, h // 2
+        for i, ratio in enumerate(red_ratios):
+            frame = np.roll(base, shift=(i % 7, i % 5), axis=(0, 1)).copy()
+            if ratio > 0:
+                # elipse com eixos 4:3 e área = ratio * w * h
+                area = ratio * w * h
+                ax = int(np.sqrt(area / np.pi * 4 / 3))
+                ay = int(np.sqrt(area / np.pi * 3 / 4))
+                cv2.ellipse(frame, (cx + (i % 11) - 5, cy), (ax, ay), 0, 0, 360, (20, 20, 170), -1)
+            writer.write(frame)
+    finally:
+        writer.release()
+    os.replace(tmp, path)
+    return str(path)
+
+
+def synthetic_wav(
+    duration_s: float = 30.0,
+    sample_rate: int = 16000,
+    burst_s: Tuple[float, float] = (0.8, 2.5),
+    pause_s: Tuple[float, float] = (0.3, 1.5),
+    seed: int = 0,
+) -> str:
+    """Gera (ou reaproveita) o WAV (PCM 16 bits, mono) e devolve o caminho."""
+    params = {"duration_s": duration_s, "sample_rate": sample_rate, "burst_s": list(burst_s), "pause_s": list(pause_s), "seed": seed}
+    path = _fixture_path("audio", ".wav", params)
+    if path.exists():
+        return str(path)
+
+    rng = np.random.default_rng(seed)
+    n = int(duration_s * sample_rate)
+    signal = rng.normal(0.0, 0.003, n)  # ruído de fundo
+
+    t = 0.0
+    while t < duration_s:
+        t += rng.uniform(*pause_s)
+        length = rng.uniform(*burst_s)
+        start, end = int(t * sample_rate), min(n, int((t + length) * sample_rate))
+        if start >= end:
+            break
+        tt = np.arange(end - start) / sample_rate
+        f0 = rng.uniform(120, 220)
+        voiced = sum(np.sin(2 * np.pi * f0 * k * tt) / k for k in range(1, 6))
+        syllables = 0.5 * (1 - np.cos(2 * np.pi * rng.uniform(3, 5) * tt))  # ~4 sílabas/s
+        signal[start:end] += 0.25 * voiced * syllables
+        t += length
+
+    pcm = (np.clip(signal, -1.0, 1.0) * 32767).astype(np.int16)
+    tmp = path.with_name(path.stem + ".tmp.wav")
+    with wave.open(str(tmp), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm.tobytes())
+    os.replace(tmp, path)
+    return str(path)
+
+
+def synthetic_transcript_features(
+    n_words: int = 20_000,
+    distress_every: int = 500,
+    words_per_segment: int = 12,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Saída no formato de extract_audio_features, com uma frase de distress a cada ~distress_every palavras."""
+    rnd = random.Random(seed)
+    words: List[str] = []
+    while len(words) < n_words:
+        words.extend(rnd.choice(FILLER) for _ in range(distress_every))
+        words.extend(rnd.choice(DISTRESS_PATTERNS).split())
+
+    segments = []
+    for k, i in enumerate(range(0, len(words), words_per_segment)):
+        segments.append({"start_s": 3.0 * k, "end_s": 3.0 * k + 2.5, "text": " ".join(words[i:i + words_per_segment])})
+    return {
+        "wav_path": "",
+        "transcript": " ".join(words),
+        "chunks_transcript": [s["text"] for s in segments],
+        "segments": segments,
+        "num_chunks": len(segments),
+    }
+
+
+def synthetic_fusion_events(
+    n_video: int = 100_000,
+    n_audio: int = 2_000,
+    duration_s: float = 4 * 3600.0,
+    seed: int = 0,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Episódios de vídeo (com end_timestamp) e eventos de áudio espalhados por duration_s."""
+    rnd = random.Random(seed)
+    video = []
+    for _ in range(n_video):
+        start = rnd.uniform(0, duration_s)
+        video.append({
+            "type": "video_episode",
+            "event": "anomalous_bleeding",
+            "confidence": rnd.uniform(0.3, 1.0),
+            "timestamp": format_ts(start),
+            "end_timestamp": format_ts(start + rnd.uniform(0.0, 5.0)),
+        })
+    audio = [
+        {
+            "type": "audio_event",
+            "event": "patient_distress_detected",
+            "confidence": rnd.uniform(0.5, 1.0),
+            "timestamp": format_ts(rnd.uniform(0, duration_s)),
+        }
+        for _ in range(n_audio)
+    ]
+    return video, audio
+
+
+def tiny_yolo(seed: int = 0, width: float = 0.125, depth: float = 0.33):
+    """
+    YOLOv8 de 1 classe ("bleeding") com largura reduzida (width=0.125 é 1/2
+    do yolov8n) e pesos aleatórios com semente fixa. Devolve um
+    ultralytics.YOLO pronto para run_video_inference(model=...).
+    """
+    import torch
+    from ultralytics import YOLO
+    from ultralytics.nn.tasks import DetectionModel, yaml_model_load
+
+    torch.manual_seed(seed)
+    cfg = yaml_model_load("yolov8n.yaml")
+    cfg["scales"] = {"t": [depth, width, 1024]}
+    cfg["scale"] = "t"
+    cfg["nc"] = 1
+
+    yolo = YOLO("yolov8n.yaml", task="detect")
+    yolo.model = DetectionModel(cfg, nc=1, verbose=False).eval()
+    yolo.model.names = {0: "bleeding"}
+    return yolo
+
+
+def tiny_yolo_path(seed: int = 0) -> str:
+    """tiny_yolo salvo como .pt (para quem só aceita model_path, ex.: o servidor de modelo)."""
+    path = _fixture_path("tiny_yolo", ".pt", {"seed": seed})
+    if not path.exists():
+        tiny_yolo(seed).save(str(path))
+    return str(path)
+
+
+def video_input() -> str:
+    """VIDEO_INPUT, o clipe de data/ se existir, ou o clipe sintético."""
+    path = os.getenv("VIDEO_INPUT", "data/videos/pph_simulation_clip.mp4")
+    if Path(path).exists() or "VIDEO_INPUT" in os.environ:
+        return path
+    return synthetic_video()
+
+
+def audio_input() -> str:
+    """AUDIO_INPUT, o WAV de data/ se existir, ou o WAV sintético."""
+    path = os.getenv("AUDIO_INPUT", "data/audios/patient_distress_audio.wav")
+    if Path(path).exists() or "AUDIO_INPUT" in os.environ:
+        return path
+    return synthetic_wav()
+
+
+def video_model() -> str:
+    """VIDEO_MODEL, ou o YOLO minúsculo sintético (roda offline, em CPU)."""
+    return os.getenv("VIDEO_MODEL") or tiny_yolo_path()
@@ -0,0 +1,202 @@
+"""
+Medição comum dos benchmarks: repetições com aquecimento, percentis de
+latência, vazão, pico de RSS (psutil) e latência por etapa (telemetry/metrics),
+e comparação com uma baseline salva em JSON.
+"""
+from __future__ import annotations
+
+import json
+import platform
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import psutil
+
+from telemetry import metrics
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(np.asarray(values, dtype=np.float64), [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+class PeakRSS:
+    """Pico de RSS do processo dentro do bloco, amostrado a cada interval_s numa thread."""
+
+    def __init__(self, interval_s: float = 0.005) -> None:
+        self.interval_s = interval_s
+        self.peak_bytes = 0
+        self._proc = psutil.Process()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        rss = self._proc.memory_info().rss
+        if rss > self.peak_bytes:
+            self.peak_bytes = rss
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    def __enter__(self) -> "PeakRSS":
+        self._sample()
+        self._thread = threading.Thread(target=self._loop, name="bench-rss", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        assert self._thread is not None
+        self._thread.join()
+        self._sample()
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak_bytes / (1024 * 1024)
+
+
+@dataclass
+class CaseResult:
+    name: str
+    repeats: int
+    unit: str  # o que é contado na vazão (frames, trechos, eventos...)
+    units_per_run: float
+    wall_s: Dict[str, float]  # p50/p95/p99 das repetições
+    throughput: float  # unidades/s na mediana
+    peak_rss_mb: float
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)  # etapa -> p50_s/p95_s/p99_s/count
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def run_case(
+    name: str,
+    fn: Callable[[], Any],
+    units_per_run: float,
+    unit: str,
+    repeats: int = 5,
+    warmup: int = 1,
+) -> CaseResult:
+    """
+    Roda fn() warmup vezes sem medir e depois repeats vezes medindo. As
+    etapas instrumentadas com telemetry.metrics entram em stages (o registro
+    global é ligado só durante o caso). Se fn devolver um dict, ele vai em extra.
+    """
+    for _ in range(warmup):
+        fn()
+
+    was_enabled = metrics.REGISTRY.enabled
+    metrics.drain()
+    metrics.configure(enabled=True)
+    walls: List[float] = []
+    extra: Any = None
+    try:
+        with PeakRSS() as rss:
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                extra = fn()
+                walls.append(time.perf_counter() - t0)
+        report = metrics.report()
+    finally:
+        metrics.configure(enabled=was_enabled)
+        metrics.drain()
+
+    wall = percentiles(walls)
+    stages = {
+        stage: {k: s[k] for k in ("count", "p50_s", "p95_s", "p99_s") if k in s}
+        for stage, s in report["stages"].items()
+    }
+    return CaseResult(
+        name=name,
+        repeats=repeats,
+        unit=unit,
+        units_per_run=units_per_run,
+        wall_s=wall,
+        throughput=units_per_run / wall["p50"] if wall["p50"] > 0 else 0.0,
+        peak_rss_mb=rss.peak_mb,
+        stages=stages,
+        extra=extra if isinstance(extra, dict) else {},
+    )
+
+
+def format_result(r: CaseResult) -> str:
+    lines = [
+        f"{r.name:<10} | {r.throughput:10.1f} {r.unit}/s | p50 {r.wall_s['p50'] * 1000:9.1f} ms | "
+        f"p95 {r.wall_s['p95'] * 1000:9.1f} ms | p99 {r.wall_s['p99'] * 1000:9.1f} ms | pico RSS {r.peak_rss_mb:7.1f} MiB"
+    ]
+    for stage, s in r.stages.items():
+        if "p50_s" in s:
+            lines.append(
+                f"{'':<10}   {stage:<24} n={int(s['count']):<7} p50 {s['p50_s'] * 1000:8.3f} ms | "
+                f"p95 {s['p95_s'] * 1000:8.3f} ms | p99 {s['p99_s'] * 1000:8.3f} ms"
+            )
+    return "\n".join(lines)
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu": _cpu_model(),
+        "cpu_count": psutil.cpu_count(logical=True),
+        "memory_gb": round(psutil.virtual_memory().total / 1024 ** 3, 1),
+    }
+
+
+def save_results(path: str, results: List[CaseResult], **meta: Any) -> str:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    payload = {"machine": machine_info(), **meta, "cases": {r.name: asdict(r) for r in results}}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def compare_to_baseline(
+    results: List[CaseResult],
+    baseline_path: str,
+    tolerance: float = 0.2,
+    rss_tolerance: float = 0.25,
+) -> List[str]:
+    """
+    Regressões em relação à baseline: p50 do caso mais de tolerance acima
+    (ou vazão abaixo), ou pico de RSS mais de rss_tolerance acima. Casos
+    ausentes da baseline são ignorados.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f).get("cases", {})
+
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if base is None:
+            continue
+        base_p50 = base["wall_s"]["p50"]
+        if base_p50 > 0 and r.wall_s["p50"] > base_p50 * (1 + tolerance):
+            regressions.append(
+                f"{r.name}: p50 {r.wall_s['p50'] * 1000:.1f} ms vs baseline {base_p50 * 1000:.1f} ms "
+                f"(+{(r.wall_s['p50'] / base_p50 - 1):.0%})"
+            )
+        base_rss = base.get("peak_rss_mb", 0.0)
+        if base_rss > 0 and r.peak_rss_mb > base_rss * (1 + rss_tolerance):
+            regressions.append(
+                f"{r.name}: pico RSS {r.peak_rss_mb:.1f} MiB vs baseline {base_rss:.1f} MiB "
+                f"(+{(r.peak_rss_mb / base_rss - 1):.0%})"
+            )
+    return regressions
@@ -0,0 +1,201 @@
+"""
+Suíte reprodutível de benchmarks, offline e em CPU, sobre entradas
+sintéticas (benchmarks/fixtures.py):
+
+- video:   run_video_inference (YOLO minúsculo, clipe sintético) — frames/s e
+           latência de decode/infer/postprocess/encode por frame;
+- audio:   extract_audio_features (WAV sintético, VAD, FakeASRBackend);
+- urgency: detect_clinical_urgency sobre um transcript longo;
+- fusion:  fuse_events com dezenas de milhares de eventos.
+
+Cada caso reporta p50/p95/p99 das repetições, vazão, pico de RSS e os
+percentis das etapas instrumentadas. BENCH_SAVE_BASELINE=1 grava a
+execução como baseline; nas próximas, a suíte compara com ela e sai com
+código 1 se algum caso regrediu além da tolerância. A baseline guarda a
+máquina e os tamanhos das entradas (BENCH_*); com tamanhos diferentes dos
+atuais a comparação não é feita.
+
+benchmarks/baselines/ci.json é a referência versionada, gerada com os
+tamanhos padrão; regrave-a (e faça commit) ao trocar de máquina de CI.
+
+Uso:
+    python -m benchmarks.suite
+    BENCH_CASES="audio,urgency,fusion" BENCH_REPEAT=10 python -m benchmarks.suite
+    BENCH_SAVE_BASELINE=1 python -m benchmarks.suite
+    BENCH_BASELINE=benchmarks/baselines/ci.json BENCH_TOLERANCE=0.15 python -m benchmarks.suite
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks import fixtures
+from benchmarks.harness import CaseResult, compare_to_baseline, format_result, run_case, save_results
+
+CaseSetup = Tuple[Callable[[], Any], float, str]  # (fn, unidades por execução, unidade)
+
+
+WORKLOAD_ENV = {
+    "BENCH_VIDEO_FRAMES": "150",
+    "BENCH_BATCH_SIZE": "4",
+    "BENCH_AUDIO_S": "60",
+    "BENCH_SR_LATENCY_S": "0.0",
+    "BENCH_TRANSCRIPT_WORDS": "50000",
+    "BENCH_FUSION_VIDEO": "100000",
+    "BENCH_FUSION_AUDIO": "2000",
+}
+
+
+def _param(name: str) -> str:
+    return os.getenv(name, WORKLOAD_ENV[name])
+
+
+def workload() -> Dict[str, str]:
+    """Tamanhos das entradas sintéticas desta execução (gravados com a baseline)."""
+    return {k: _param(k) for k in WORKLOAD_ENV}
+
+
+def _video_case() -> CaseSetup:
+    from video.inference_video import run_video_inference
+
+    n_frames = int(_param("BENCH_VIDEO_FRAMES"))
+    video_path = fixtures.synthetic_video(n_frames=n_frames)
+    model = fixtures.tiny_yolo()
+    output_dir = os.getenv("BENCH_OUTPUT_DIR", "results/bench")
+
+    def run() -> Dict[str, Any]:
+        stats: Dict[str, Any] = {}
+        events = run_video_inference(
+            video_path=video_path,
+            model_path="",  # ignorado: o modelo já vai carregado em model
+            model=model,
+            device="cpu",
+            conf_threshold=0.01,  # pesos aleatórios: confiança baixa para haver boxes a pós-processar
+            output_dir=output_dir,
+            batch_size=int(_param("BENCH_BATCH_SIZE")),
+            pipeline=True,
+            output_mode="none",
+            stats=stats,
+        )
+        return {"detections": len(events), "frames_inferred": stats["frames_inferred"]}
+
+    return run, n_frames, "frames"
+
+
+def _audio_case() -> CaseSetup:
+    from audio.asr_backends import FakeASRBackend
+    from audio.audio_features import extract_audio_features
+
+    wav = fixtures.synthetic_wav(duration_s=float(_param("BENCH_AUDIO_S")))
+    latency = float(_param("BENCH_SR_LATENCY_S"))
+
+    def run() -> Dict[str, Any]:
+        backend = FakeASRBackend(texts=["it hurts", "i feel dizzy", "please help"], latency_s=latency, max_workers=4)
+        features = extract_audio_features(audio_path=wav, asr_backend=backend, segmentation="vad")
+        return {"chunks": features["num_chunks"]}
+
+    return run, float(_param("BENCH_AUDIO_S")), "s de áudio"
+
+
+def _urgency_case() -> CaseSetup:
+    from audio.urgency_detection import detect_clinical_urgency
+
+    n_words = int(_param("BENCH_TRANSCRIPT_WORDS"))
+    features = fixtures.synthetic_transcript_features(n_words=n_words)
+
+    def run() -> Dict[str, Any]:
+        events = detect_clinical_urgency(features)
+        return {"distress_events": len(events)}
+
+    return run, n_words, "palavras"
+
+
+def _fusion_case() -> CaseSetup:
+    from fusion.rules_engine import fuse_events
+
+    n_video = int(_param("BENCH_FUSION_VIDEO"))
+    n_audio = int(_param("BENCH_FUSION_AUDIO"))
+    video, audio = fixtures.synthetic_fusion_events(n_video, n_audio)
+
+    def run() -> Dict[str, Any]:
+        result = fuse_events(video, audio)
+        return {"rule": result["rule"], "matched_intervals": len(result["matched_intervals"])}
+
+    return run, n_video + n_audio, "eventos"
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return out.stdout.strip() if out.returncode == 0 else ""
+
+
+CASES: Dict[str, Callable[[], CaseSetup]] = {
+    "video": _video_case,
+    "audio": _audio_case,
+    "urgency": _urgency_case,
+    "fusion": _fusion_case,
+}
+
+
+def main() -> int:
+    names = [n.strip() for n in os.getenv("BENCH_CASES", ",".join(CASES)).split(",") if n.strip()]
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        raise ValueError(f"Caso(s) desconhecido(s): {', '.join(unknown)} (opções: {', '.join(CASES)})")
+    repeats = int(os.getenv("BENCH_REPEAT", "5"))
+    warmup = int(os.getenv("BENCH_WARMUP", "1"))
+    baseline = os.getenv("BENCH_BASELINE", "benchmarks/baselines/local.json")
+
+    results: List[CaseResult] = []
+    for name in names:
+        try:
+            fn, units, unit = CASES[name]()
+        except ImportError as e:
+            print(f"{name:<10} | pulado: dependência ausente ({e})")
+            continue
+        result = run_case(name, fn, units, unit, repeats=repeats, warmup=warmup)
+        results.append(result)
+        print(format_result(result))
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    meta = {"created_at": stamp, "repeats": repeats, "warmup": warmup, "commit": _git_commit(), "workload": workload()}
+    report = save_results(os.path.join(os.getenv("BENCH_OUTPUT_DIR", "results/bench"), f"suite-{stamp}.json"), results, **meta)
+    print(f"\nRelatório: {report}")
+
+    if os.getenv("BENCH_SAVE_BASELINE", "0") == "1":
+        print(f"Baseline gravada em {save_results(baseline, results, **meta)}")
+        return 0
+    if not os.path.exists(baseline):
+        print(f"Sem baseline em {baseline} (grave uma com BENCH_SAVE_BASELINE=1)")
+        return 0
+    with open(baseline, "r", encoding="utf-8") as f:
+        base_workload = json.load(f).get("workload")
+    if base_workload is not None and base_workload != meta["workload"]:
+        diff = ", ".join(f"{k}={meta['workload'].get(k)} (baseline {v})" for k, v in base_workload.items() if meta["workload"].get(k) != v)
+        print(f"\nEntradas diferentes das da baseline {baseline}: {diff}; comparação não feita")
+        return 0
+
+    regressions = compare_to_baseline(
+        results,
+        baseline,
+        tolerance=float(os.getenv("BENCH_TOLERANCE", "0.2")),
+        rss_tolerance=float(os.getenv("BENCH_RSS_TOLERANCE", "0.25")),
+    )
+    if regressions:
+        print("\nRegressões em relação à baseline:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\nSem regressões em relação a {baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import asdict
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+from fusion.rules_engine import RuleSet
+from fusion.temporal_fusion import TemporalFusion
+
+LATENCY_BUCKETS_S = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+# latências recentes guardadas para os percentis
+LATENCY_SAMPLES = 10_000
+
+
+def latency_histogram(latencies: Sequence[float], buckets: Sequence[float] = LATENCY_BUCKETS_S) -> Dict[str, int]:
+    """Contagem de latências por faixa ("<=0.1s", ..., ">5.0s")."""
+    hist = {f"<={b}s": 0 for b in buckets}
+    hist[f">{buckets[-1]}s"] = 0
+    for v in latencies:
+        for b in buckets:
+            if v <= b:
+                hist[f"<={b}s"] += 1
+                break
+        else:
+            hist[f">{buckets[-1]}s"] += 1
+    return hist
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class LatencyStats:
+    """
+    Latências de uma execução de duração indefinida em memória constante:
+    histograma por faixa, total, máximo e quantas passaram de budget_s são
+    contados a cada valor; os percentis saem das LATENCY_SAMPLES mais recentes.
+    """
+
+    def __init__(self, budget_s: float, buckets: Sequence[float] = LATENCY_BUCKETS_S, samples: int = LATENCY_SAMPLES) -> None:
+        self.budget_s = budget_s
+        self.buckets = tuple(buckets)
+        self.histogram = latency_histogram([], self.buckets)
+        self.count = 0
+        self.max = 0.0
+        self.over_budget = 0
+        self.recent: Deque[float] = deque(maxlen=samples)
+
+    def add(self, value: float) -> None:
+        for b in self.buckets:
+            if value <= b:
+                self.histogram[f"<={b}s"] += 1
+                break
+        else:
+            self.histogram[f">{self.buckets[-1]}s"] += 1
+        self.count += 1
+        self.max = max(self.max, value)
+        if value > self.budget_s:
+            self.over_budget += 1
+        self.recent.append(value)
+
+    def percentile(self, q: float) -> float:
+        return _percentile(self.recent, q)
+
+
+class SlidingWindowFusion:
+    """
+    Reavalia a fusão só com os eventos dos últimos window_s segundos de mídia
+    (o "agora" é o maior tempo de mídia já visto em qualquer modalidade).
+    Os eventos ficam num TemporalFusion incremental: cada observação só
+    indexa os eventos novos e descarta os que saíram da janela.
+    """
+
+    def __init__(self, window_s: float = 10.0, rules: Optional[RuleSet] = None) -> None:
+        self.window_s = window_s
+        self.now_s = 0.0
+        self._fusion = TemporalFusion(window_s, rules)
+
+    def add(self, modality: str, media_time_s: float, events: Sequence[Dict[str, Any]]) -> None:
+        # eventos sem timestamp ficam no tempo de mídia da observação
+        self._fusion.add(events, default_time_s=media_time_s)
+        self.now_s = max(self.now_s, media_time_s)
+
+    def evaluate(self) -> Dict[str, Any]:
+        cutoff = self.now_s - self.window_s
+        self._fusion.index.prune(cutoff)
+
+        result = self._fusion.evaluate(start_s=cutoff)
+        result["window"] = {"start_s": max(0.0, cutoff), "end_s": self.now_s}
+        return result
+
+
+class LiveMonitor:
+    """
+    Modo streaming: vídeo (frames ao vivo) e áudio (blocos) alimentam uma
+    SlidingWindowFusion, reavaliada a cada observação. Quando o risco atinge
+    "high", on_alert(resultado) é chamado — no máximo uma vez a cada
+    alert_cooldown_s segundos de mídia.
+
+    Latências medidas (time.perf_counter), acumuladas em LatencyStats:
+      - eval: da captura do frame/bloco até o fim da reavaliação da fusão
+      - alert: da captura da observação que disparou o alerta até on_alert
+    """
+
+    def __init__(
+        self,
+        on_alert: Callable[[Dict[str, Any]], None],
+        window_s: float = 10.0,
+        latency_budget_s: float = 2.0,
+        alert_cooldown_s: float = 30.0,
+        rules: Optional[RuleSet] = None,
+    ) -> None:
+        self.on_alert = on_alert
+        self.latency_budget_s = latency_budget_s
+        self.alert_cooldown_s = alert_cooldown_s
+        self._fusion = SlidingWindowFusion(window_s, rules)
+        self._lock = threading.Lock()
+        self._last_alert_s: Optional[float] = None
+        self.eval_latencies = LatencyStats(latency_budget_s)
+        self.alert_latencies = LatencyStats(latency_budget_s)
+        self.alerts: List[Dict[str, Any]] = []
+
+    def observe(
+        self,
+        modality: str,
+        media_time_s: float,
+        capture_time: Optional[float],
+        events: Sequence[Any],
+    ) -> None:
+        dict_events = [e if isinstance(e, dict) else asdict(e) for e in events]
+
+        with self._lock:
+            self._fusion.add(modality, media_time_s, dict_events)
+            result = self._fusion.evaluate()
+            now = time.perf_counter()
+            if capture_time is not None:
+                self.eval_latencies.add(now - capture_time)
+
+            if result.get("risk_level") != "high":
+                return
+            if self._last_alert_s is not None and media_time_s - self._last_alert_s < self.alert_cooldown_s:
+                return
+            self._last_alert_s = media_time_s
+
+            if capture_time is not None:
+                latency = time.perf_counter() - capture_time
+                result["latency_s"] = latency
+                self.alert_latencies.add(latency)
+            result["trigger"] = modality
+            self.alerts.append(result)
+
+        self.on_alert(result)
+
+    def run(
+        self,
+        video_source: str,
+        audio_path: Optional[str],
+        video_kwargs: Dict[str, Any],
+        language: str = "en-US",
+        audio_chunk_ms: int = 2000,
+        asr_backend: Any = "google",
+    ) -> Dict[str, Any]:
+        """
+        Roda vídeo e áudio em threads até as duas fontes terminarem e devolve
+        o relatório de latência. video_kwargs vai para run_video_inference.
+        """
+        # Imports aqui: o motor de fusão não deve exigir torch/SpeechRecognition
+        from audio.audio_stream import stream_audio_events
+        from video.inference_video import run_video_inference
+
+        errors: List[BaseException] = []
+
+        def _video() -> None:
+            def _on_frame(frame_idx: int, ts_seconds: float, capture_time: Optional[float], events: List[Any]) -> None:
+                self.observe("video", ts_seconds, capture_time, events)
+
+            try:
+                run_video_inference(
+                    video_path=video_source,
+                    realtime=True,
+                    max_frame_lag_s=self.latency_budget_s / 2,
+                    on_frame=_on_frame,
+                    collect_events=False,
+                    **video_kwargs,
+                )
+            except BaseException as e:  # noqa: BLE001 - re-levantado após o join
+                errors.append(e)
+
+        def _audio() -> None:
+            try:
+                for capture_time, end_s, _, events in stream_audio_events(
+                    audio_path,  # type: ignore[arg-type]
+                    language=language,
+                    chunk_ms=audio_chunk_ms,
+                    asr_backend=asr_backend,
+                ):
+                    self.observe("audio", end_s, capture_time, events)
+            except BaseException as e:  # noqa: BLE001 - re-levantado após o join
+                errors.append(e)
+
+        threads = [threading.Thread(target=_video, name="live-video", daemon=True)]
+        if audio_path:
+            threads.append(threading.Thread(target=_audio, name="live-audio", daemon=True))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        if errors:
+            raise errors[0]
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "alerts": len(self.alerts),
+            "latency_budget_s": self.latency_budget_s,
+            "alerts_over_budget": self.alert_latencies.over_budget,
+            "alert_latency_histogram": dict(self.alert_latencies.histogram),
+            "eval_latency_histogram": dict(self.eval_latencies.histogram),
+            "eval_latency_p50_s": self.eval_latencies.percentile(0.50),
+            "eval_latency_p95_s": self.eval_latencies.percentile(0.95),
+            "eval_latency_max_s": self.eval_latencies.max,
+        }
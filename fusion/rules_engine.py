@@ -1,39 +1,242 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import copy
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
 
+import yaml
 
-def fuse_events(video_events: List[Dict[str, Any]], audio_events: List[Dict[str, Any]]) -> Dict[str, Any]:
+from fusion.temporal_fusion import (
+    DEFAULT_WINDOW_S,
+    EventIndex,
+    Interval,
+    Spans,
+    burst_intervals,
+    burst_times,
+    clip_spans,
+    cooccurrence_intervals,
+    extend_intervals,
+)
+from telemetry import metrics
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("rules.yaml")
+
+_CONDITION_KEYS = {"event", "min_confidence", "min_count", "max_count", "min_span_s", "min_area_growth"}
+_RULE_KEYS = {"name", "priority", "within_s", "when", "then"}
+
+
+@dataclass(frozen=True)
+class Condition:
+    event: str
+    min_confidence: float = 0.0
+    min_count: int = 1
+    max_count: Optional[int] = None
+    min_span_s: Optional[float] = None
+    min_area_growth: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    priority: int
+    conditions: tuple
+    then: Dict[str, Any]
+    within_s: Union[float, str, None] = None  # segundos, "window" ou None (sem restrição de tempo)
+
+
+def _parse_condition(rule_name: str, raw: Dict[str, Any]) -> Condition:
+    unknown = set(raw) - _CONDITION_KEYS
+    if unknown:
+        raise ValueError(f"Regra '{rule_name}': chave(s) de condição desconhecida(s): {', '.join(sorted(unknown))}")
+    if "event" not in raw:
+        raise ValueError(f"Regra '{rule_name}': condição sem 'event'")
+    return Condition(
+        event=str(raw["event"]),
+        min_confidence=float(raw.get("min_confidence", 0.0)),
+        min_count=int(raw.get("min_count", 1)),
+        max_count=None if raw.get("max_count") is None else int(raw["max_count"]),
+        min_span_s=None if raw.get("min_span_s") is None else float(raw["min_span_s"]),
+        min_area_growth=None if raw.get("min_area_growth") is None else float(raw["min_area_growth"]),
+    )
+
+
+def _parse_rule(raw: Dict[str, Any]) -> Rule:
+    name = str(raw.get("name", "?"))
+    unknown = set(raw) - _RULE_KEYS
+    if unknown:
+        raise ValueError(f"Regra '{name}': chave(s) desconhecida(s): {', '.join(sorted(unknown))}")
+    if not raw.get("when") or not isinstance(raw.get("then"), dict):
+        raise ValueError(f"Regra '{name}': 'when' (lista de condições) e 'then' são obrigatórios")
+
+    within_s = raw.get("within_s")
+    if within_s is not None and within_s != "window":
+        within_s = float(within_s)
+
+    return Rule(
+        name=name,
+        priority=int(raw.get("priority", 0)),
+        conditions=tuple(_parse_condition(name, c) for c in raw["when"]),
+        then=dict(raw["then"]),
+        within_s=within_s,
+    )
+
+
+class RuleSet:
+    """
+    Conjunto de regras compilado uma vez: ordena por prioridade e levanta as
+    chaves (evento, confiança mínima) usadas pelas condições.
+
+    Os eventos são lidos uma única vez, para dentro de um EventIndex só com
+    essas chaves; cada condição vira consultas O(log n) (contagem, primeiro e
+    último tempo, crescimento de área) e as regras com within_s, uma busca
+    binária vetorizada de coocorrência — nenhuma regra percorre as listas de
+    eventos de novo.
+    """
+
+    def __init__(self, spec: Dict[str, Any]) -> None:
+        rules = [_parse_rule(r) for r in spec.get("rules") or []]
+        # sort estável: em empate de prioridade, vale a ordem do arquivo
+        self.rules: List[Rule] = sorted(rules, key=lambda r: -r.priority)
+        self.window_s = float(spec.get("window_s", DEFAULT_WINDOW_S))
+        self.default: Dict[str, Any] = dict(spec.get("default") or {"risk_level": "low", "reasons": [], "action": "no_action"})
+
+        keys: Dict[str, set] = {}
+        area_events = set()
+        for rule in self.rules:
+            for c in rule.conditions:
+                keys.setdefault(c.event, set()).add(c.min_confidence)
+                if c.min_area_growth is not None:
+                    area_events.add(c.event)
+        self._keys = {name: sorted(thresholds) for name, thresholds in keys.items()}
+        self._area_events = area_events
+
+    def new_index(self) -> EventIndex:
+        return EventIndex(self._keys, self._area_events)
+
+    def _condition_holds(self, index: EventIndex, c: Condition, start_s: Optional[float], end_s: Optional[float]) -> bool:
+        n = index.count(c.event, start_s, end_s, c.min_confidence) + index.untimed(c.event, c.min_confidence)
+        if n < c.min_count or (c.max_count is not None and n > c.max_count):
+            return False
+        if c.min_span_s is not None:
+            span = index.span(c.event, start_s, end_s, c.min_confidence)
+            if span is None or span[1] - span[0] < c.min_span_s:
+                return False
+        if c.min_area_growth is not None:
+            growth = index.area_growth(c.event, start_s, end_s, c.min_confidence)
+            if growth is None or growth < c.min_area_growth:
+                return False
+        return True
+
+    def _intervals(
+        self,
+        index: EventIndex,
+        rule: Rule,
+        window_s: float,
+        start_s: Optional[float],
+        end_s: Optional[float],
+    ) -> List[Interval]:
+        # condições só com eventos sem tempo não podem ser localizadas: valem em qualquer ponto
+        timed: list = []
+        for c in rule.conditions:
+            if c.min_count < 1 or index.untimed(c.event, c.min_confidence):
+                continue
+            timed.append((clip_spans(index.spans(c.event, c.min_confidence), start_s, end_s), c.min_count))
+
+        if not timed:
+            return [(None, None)]
+        if len(timed) == 1:
+            return burst_intervals(timed[0][0], timed[0][1], window_s)
+
+        # com várias condições, cada uma entra pelos instantes em que está
+        # satisfeita (com min_count > 1: onde a rajada se completa)
+        timed = [spans if n <= 1 else Spans.points(burst_times(spans.start, n, window_s)) for spans, n in timed]
+
+        intervals = cooccurrence_intervals(timed[0], timed[1], window_s)
+        for times in timed[2:]:
+            if not intervals:
+                break
+            intervals = extend_intervals(intervals, times, window_s)
+        return intervals
+
+    def evaluate_index(
+        self,
+        index: EventIndex,
+        start_s: Optional[float] = None,
+        end_s: Optional[float] = None,
+        window_s: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Resultado da primeira regra satisfeita pelos eventos de index em [start_s, end_s]."""
+        window_s = self.window_s if window_s is None else window_s
+
+        for rule in self.rules:
+            if not all(self._condition_holds(index, c, start_s, end_s) for c in rule.conditions):
+                continue
+
+            matched: List[Dict[str, Any]] = []
+            if rule.within_s is not None:
+                within = window_s if rule.within_s == "window" else float(rule.within_s)
+                intervals = self._intervals(index, rule, within, start_s, end_s)
+                if not intervals:
+                    continue
+                matched = [
+                    {
+                        "start_s": s,
+                        "end_s": e,
+                        "events": {c.event: index.count(c.event, s, e, c.min_confidence) for c in rule.conditions},
+                    }
+                    for s, e in intervals
+                ]
+
+            result = copy.deepcopy(rule.then)
+            result["rule"] = rule.name
+            result["window_s"] = window_s
+            result["matched_intervals"] = matched
+            return result
+
+        result = copy.deepcopy(self.default)
+        result["rule"] = None
+        result["window_s"] = window_s
+        result["matched_intervals"] = []
+        return result
+
+    def evaluate(self, events: Iterable[Dict[str, Any]], window_s: Optional[float] = None) -> Dict[str, Any]:
+        index = self.new_index()
+        index.add(events)
+        return self.evaluate_index(index, window_s=window_s)
+
+
+def compile_rules(spec: Dict[str, Any]) -> RuleSet:
+    return RuleSet(spec)
+
+
+@lru_cache(maxsize=None)
+def _load_rules_cached(path: str) -> RuleSet:
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_rules(yaml.safe_load(f) or {})
+
+
+def load_rules(path: Optional[Union[str, Path]] = None) -> RuleSet:
+    """Lê e compila um arquivo de regras YAML (uma vez por caminho). Padrão: fusion/rules.yaml."""
+    return _load_rules_cached(str(Path(path or DEFAULT_RULES_PATH).resolve()))
+
+
+@metrics.timed("fusion.fuse")
+def fuse_events(
+    video_events: Sequence[Dict[str, Any]],
+    audio_events: Sequence[Dict[str, Any]],
+    window_s: Optional[float] = None,
+    rules: Optional[RuleSet] = None,
+) -> Dict[str, Any]:
     """
-    Motor simples de regras multimodais.
-    Se houver evento de sangramento + evento de dor vocal, risco HIGH.
+    Motor de regras multimodais (fusion/rules.yaml por padrão).
+    Ex.: sangramento + dor vocal a no máximo window_s segundos um do outro ->
+    risco HIGH; o resultado traz a regra aplicada e os intervalos em que as
+    condições coincidiram (matched_intervals).
     """
-    has_bleeding = any(e.get("event") == "anomalous_bleeding" for e in video_events)
-    has_distress = any(e.get("event") == "patient_distress_detected" for e in audio_events)
-
-    if has_bleeding and has_distress:
-        return {
-            "risk_level": "high",
-            "reasons": ["bleeding", "patient_distress"],
-            "action": "notify_medical_team",
-        }
-
-    if has_bleeding:
-        return {
-            "risk_level": "medium",
-            "reasons": ["bleeding"],
-            "action": "review_procedure",
-        }
-
-    if has_distress:
-        return {
-            "risk_level": "medium",
-            "reasons": ["patient_distress_detected"],
-            "action": "check_patient_comfort",
-        }
-
-    return {
-        "risk_level": "low",
-        "reasons": [],
-        "action": "no_action",
-    }
+    rules = rules if rules is not None else load_rules()
+    index = rules.new_index()
+    index.add(video_events)
+    index.add(audio_events)
+    return rules.evaluate_index(index, window_s=window_s)
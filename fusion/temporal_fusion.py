@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fusion.timestamps import parse_ts
+
+if TYPE_CHECKING:
+    from fusion.rules_engine import RuleSet
+
+# Janela padrão de coocorrência entre modalidades (segundos de mídia)
+DEFAULT_WINDOW_S = 30.0
+
+Interval = Tuple[Optional[float], Optional[float]]  # (start_s, end_s); None = sem tempo
+
+
+class Spans(NamedTuple):
+    """Inícios ordenados e, alinhado, o maior fim até cada posição (ver _Series)."""
+
+    start: np.ndarray
+    reach: np.ndarray
+
+    @classmethod
+    def points(cls, times: np.ndarray) -> "Spans":
+        return cls(times, times)
+
+    @property
+    def size(self) -> int:
+        return int(self.start.size)
+
+
+def _bbox_area(bbox: Any) -> float:
+    if not bbox:
+        return 0.0
+    x1, y1, x2, y2 = bbox
+    return max(0.0, x2 - x1) * max(0.0, y2 - y1)
+
+
+class _Series:
+    """
+    Eventos de uma chave do índice, ordenados pelo início. Eventos pontuais
+    têm fim = início; episódios (com "end_timestamp") cobrem um intervalo.
+    reach[i] é o maior fim entre os eventos 0..i — não decrescente, então
+    "quais eventos ainda não terminaram em t" também é uma busca binária.
+
+    Eventos em ordem entram por append O(1); se algum chega fora de ordem, a
+    série é reordenada (timsort, quase linear em dados quase ordenados) uma
+    vez só, na próxima consulta, em vez de a cada inserção.
+    """
+
+    __slots__ = ("times", "ends", "reach", "areas", "untimed", "_sorted", "_arrays")
+
+    def __init__(self, with_area: bool) -> None:
+        self.times: List[float] = []
+        self.ends: List[float] = []
+        self.reach: List[float] = []
+        self.areas: Optional[List[float]] = [] if with_area else None
+        self.untimed = 0
+        self._sorted = True
+        self._arrays: Optional[Spans] = None
+
+    def add(self, t: float, end: float, area: float) -> None:
+        times = self.times
+        if self._sorted and times and t < times[-1]:
+            self._sorted = False
+        times.append(t)
+        self.ends.append(end)
+        if self.areas is not None:
+            self.areas.append(area)
+        if self._sorted:
+            reach = self.reach
+            reach.append(max(end, reach[-1]) if reach else end)
+        self._arrays = None
+
+    def _ensure_sorted(self) -> None:
+        if self._sorted:
+            return
+        order = sorted(range(len(self.times)), key=self.times.__getitem__)  # estável
+        self.times = [self.times[i] for i in order]
+        self.ends = [self.ends[i] for i in order]
+        if self.areas is not None:
+            self.areas = [self.areas[i] for i in order]
+        self.reach = list(accumulate(self.ends, max))
+        self._sorted = True
+
+    def prune(self, before_s: float) -> None:
+        # tudo antes de cut já terminou antes de before_s
+        self._ensure_sorted()
+        cut = bisect_left(self.reach, before_s)
+        if cut:
+            del self.times[:cut]
+            del self.ends[:cut]
+            del self.reach[:cut]
+            if self.areas is not None:
+                del self.areas[:cut]
+            self._arrays = None
+
+    def bounds(self, start_s: Optional[float], end_s: Optional[float]) -> Tuple[int, int]:
+        """Fatia de eventos que tocam [start_s, end_s]."""
+        self._ensure_sorted()
+        lo = 0 if start_s is None else bisect_left(self.reach, start_s)
+        hi = len(self.times) if end_s is None else bisect_right(self.times, end_s)
+        return lo, max(lo, hi)
+
+    def arrays(self) -> Spans:
+        if self._arrays is None:
+            self._ensure_sorted()
+            self._arrays = Spans(np.asarray(self.times, dtype=np.float64), np.asarray(self.reach, dtype=np.float64))
+        return self._arrays
+
+
+class EventIndex:
+    """
+    Tempos (segundos de mídia) dos eventos em listas ordenadas, uma por chave
+    (tipo de evento, confiança mínima).
+
+    Cada evento é lido uma única vez em add() e entra em todas as chaves do
+    seu tipo cuja confiança mínima ele atinge. Todo evento entra por append
+    O(1); se algum chegou fora de ordem, a série é reordenada (sort estável)
+    uma única vez na próxima consulta. Consultas por intervalo usam bisect;
+    operações em lote, um np.ndarray materializado sob demanda. Eventos sem
+    tempo (timestamp "N/A") só são contados.
+
+    keys=None indexa qualquer tipo de evento com confiança mínima 0.
+    """
+
+    def __init__(
+        self,
+        keys: Optional[Dict[str, Sequence[float]]] = None,
+        area_events: Iterable[str] = (),
+    ) -> None:
+        self._dynamic = keys is None
+        self._area_events = set(area_events)
+        self._series: Dict[Tuple[str, float], _Series] = {}
+        # tipo de evento -> [(confiança mínima, série)] em ordem crescente de confiança
+        self._slots: Dict[str, List[Tuple[float, _Series]]] = {}
+        for name, thresholds in (keys or {}).items():
+            self._slots[name] = [self._new_series(name, thr) for thr in sorted(set(thresholds))]
+
+    def _new_series(self, name: str, thr: float) -> Tuple[float, _Series]:
+        series = self._series[(name, thr)] = _Series(name in self._area_events)
+        return thr, series
+
+    def _get(self, name: str, min_conf: float) -> Optional[_Series]:
+        return self._series.get((name, min_conf))
+
+    def add(self, events: Iterable[Dict[str, Any]], default_time_s: Optional[float] = None) -> None:
+        """
+        Indexa eventos (dicts com "event", "timestamp" e, nos episódios,
+        "end_timestamp"); default_time_s vale para os sem tempo.
+        """
+        slots_by_name = self._slots
+        for e in events:
+            name = e.get("event")
+            slots = slots_by_name.get(name)
+            if slots is None:
+                if not self._dynamic:
+                    continue
+                slots = slots_by_name[name] = [self._new_series(name, 0.0)]
+
+            t = parse_ts(e.get("timestamp"))
+            if t is None:
+                t = default_time_s
+            end = parse_ts(e.get("end_timestamp")) if t is not None else None
+            if end is None or end < t:
+                end = t
+            conf = float(e.get("confidence") or 0.0)
+            area = _bbox_area(e.get("bbox")) if name in self._area_events else 0.0
+
+            for thr, series in slots:
+                if conf < thr:
+                    break  # slots em ordem crescente de confiança
+                if t is None:
+                    series.untimed += 1
+                else:
+                    series.add(t, end, area)
+
+    def prune(self, before_s: float) -> None:
+        """Descarta eventos que terminaram antes de before_s (janela deslizante)."""
+        for series in self._series.values():
+            series.prune(before_s)
+
+    def spans(self, name: str, min_conf: float = 0.0) -> Spans:
+        series = self._get(name, min_conf)
+        if series is None:
+            empty = np.zeros(0, dtype=np.float64)
+            return Spans(empty, empty)
+        return series.arrays()
+
+    def times(self, name: str, min_conf: float = 0.0) -> np.ndarray:
+        """Inícios ordenados dos eventos de name."""
+        return self.spans(name, min_conf).start
+
+    def count(
+        self,
+        name: str,
+        start_s: Optional[float] = None,
+        end_s: Optional[float] = None,
+        min_conf: float = 0.0,
+    ) -> int:
+        """Eventos de name que tocam [start_s, end_s] (limites None = sem limite)."""
+        series = self._get(name, min_conf)
+        if series is None:
+            return 0
+        lo, hi = series.bounds(start_s, end_s)
+        return hi - lo
+
+    def untimed(self, name: str, min_conf: float = 0.0) -> int:
+        series = self._get(name, min_conf)
+        return series.untimed if series is not None else 0
+
+    def span(
+        self,
+        name: str,
+        start_s: Optional[float] = None,
+        end_s: Optional[float] = None,
+        min_conf: float = 0.0,
+    ) -> Optional[Tuple[float, float]]:
+        """(primeiro início, último fim) dos eventos de name que tocam [start_s, end_s]."""
+        series = self._get(name, min_conf)
+        if series is None:
+            return None
+        lo, hi = series.bounds(start_s, end_s)
+        return (series.times[lo], series.reach[hi - 1]) if hi > lo else None
+
+    def area_growth(
+        self,
+        name: str,
+        start_s: Optional[float] = None,
+        end_s: Optional[float] = None,
+        min_conf: float = 0.0,
+    ) -> Optional[float]:
+        """Área da bbox do último evento / área do primeiro, em [start_s, end_s]."""
+        series = self._get(name, min_conf)
+        if series is None or series.areas is None:
+            return None
+        lo, hi = series.bounds(start_s, end_s)
+        if hi - lo < 2 or series.areas[lo] <= 0:
+            return None
+        return series.areas[hi - 1] / series.areas[lo]
+
+
+def clip_spans(spans: Spans, start_s: Optional[float], end_s: Optional[float]) -> Spans:
+    lo = 0 if start_s is None else int(np.searchsorted(spans.reach, start_s, side="left"))
+    hi = spans.size if end_s is None else int(np.searchsorted(spans.start, end_s, side="right"))
+    return Spans(spans.start[lo:hi], spans.reach[lo:hi])
+
+
+def burst_times(times: np.ndarray, min_count: int, window_s: float) -> np.ndarray:
+    """Instantes em que já houve min_count eventos nos últimos window_s segundos."""
+    if min_count <= 1:
+        return times
+    if times.size < min_count:
+        return times[:0]
+    ends = times[min_count - 1:]
+    return ends[ends - times[: times.size - min_count + 1] <= window_s]
+
+
+def merge_intervals(starts: np.ndarray, ends: np.ndarray) -> List[Interval]:
+    """Une intervalos que se sobrepõem (sweep-line sobre os inícios ordenados)."""
+    if starts.size == 0:
+        return []
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    # novo intervalo onde o início passa de tudo o que já foi coberto
+    breaks = np.flatnonzero(starts[1:] > reach[:-1]) + 1
+    first = np.concatenate(([0], breaks))
+    last = np.concatenate((breaks - 1, [len(starts) - 1]))
+    return list(zip(starts[first].tolist(), reach[last].tolist()))
+
+
+def burst_intervals(spans: Spans, min_count: int, window_s: float) -> List[Interval]:
+    """
+    Intervalos com pelo menos min_count eventos a no máximo window_s segundos
+    entre o 1º e o último (com min_count > 1, contados pelos inícios).
+    """
+    k = max(1, min_count)
+    if spans.size < k:
+        return []
+    if k == 1:
+        return cooccurrence_intervals(spans, spans, window_s)
+    times = spans.start
+    starts, ends = times[: times.size - k + 1], times[k - 1:]
+    ok = ends - starts <= window_s
+    return merge_intervals(starts[ok], ends[ok])
+
+
+def cooccurrence_intervals(a: Spans, b: Spans, window_s: float) -> List[Interval]:
+    """
+    Intervalos em que eventos de a e b acontecem a no máximo window_s
+    segundos um do outro (para episódios, a distância entre os intervalos).
+    Cada evento de a com algum b por perto gera [menor início, maior fim]
+    do grupo e os intervalos que se sobrepõem são unidos (sweep-line).
+    O resultado é simétrico, então a busca binária é feita com a lista
+    menor sobre a maior: O(min(n, m) log max(n, m)).
+    """
+    if a.size == 0 or b.size == 0:
+        return []
+    if a.size > b.size:
+        a, b = b, a
+
+    # b[lo:hi]: começam até window_s depois do fim de a e terminam até window_s antes do início
+    lo = np.searchsorted(b.reach, a.start - window_s, side="left")
+    hi = np.searchsorted(b.start, a.reach + window_s, side="right")
+    hit = hi > lo
+    if not hit.any():
+        return []
+
+    lo, hi = lo[hit], hi[hit]
+    return merge_intervals(np.minimum(a.start[hit], b.start[lo]), np.maximum(a.reach[hit], b.reach[hi - 1]))
+
+
+def extend_intervals(intervals: List[Interval], spans: Spans, window_s: float) -> List[Interval]:
+    """
+    Mantém só os intervalos com algum evento de spans a até window_s segundos
+    deles, estendidos para cobrir esses eventos (coocorrência de 3+ condições).
+    """
+    out: List[Interval] = []
+    for s, e in intervals:
+        lo = int(np.searchsorted(spans.reach, s - window_s, side="left"))
+        hi = int(np.searchsorted(spans.start, e + window_s, side="right"))
+        if hi > lo:
+            out.append((min(s, float(spans.start[lo])), max(e, float(spans.reach[hi - 1]))))
+    return out
+
+
+class TemporalFusion:
+    """
+    Fusão incremental: os eventos podem ser adicionados aos poucos (add) e
+    evaluate() aplica o conjunto de regras (fusion/rules.yaml por padrão)
+    a um intervalo de mídia, sem reprocessar o histórico inteiro. window_s
+    substitui o within_s padrão das regras.
+    """
+
+    def __init__(self, window_s: Optional[float] = None, rules: Optional["RuleSet"] = None) -> None:
+        from fusion.rules_engine import load_rules
+
+        self.rules = rules if rules is not None else load_rules()
+        self.window_s = window_s
+        self.index = self.rules.new_index()
+
+    def add(self, events: Iterable[Dict[str, Any]], default_time_s: Optional[float] = None) -> None:
+        self.index.add(events, default_time_s)
+
+    def evaluate(self, start_s: Optional[float] = None, end_s: Optional[float] = None) -> Dict[str, Any]:
+        return self.rules.evaluate_index(self.index, start_s, end_s, window_s=self.window_s)
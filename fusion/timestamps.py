@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+
+def format_ts(seconds: float) -> str:
+    """Segundos -> "MM:SS.mmm" (formato dos timestamps de eventos)."""
+    m = int(seconds // 60)
+    s = seconds - (m * 60)
+    return f"{m:02d}:{s:06.3f}"
+
+
+def parse_ts(ts: Any) -> Optional[float]:
+    """
+    Timestamp de evento -> segundos. Aceita números, "MM:SS.mmm" e
+    "HH:MM:SS.mmm"; devolve None para valores sem tempo (ex.: "N/A").
+    """
+    if ts is None:
+        return None
+    if isinstance(ts, (int, float)):
+        return float(ts)
+
+    parts = str(ts).strip().split(":")
+    try:
+        values = [float(p) for p in parts]
+    except ValueError:
+        return None
+    if not 1 <= len(values) <= 3:
+        return None
+
+    seconds = 0.0
+    for v in values:
+        seconds = seconds * 60 + v
+    return seconds
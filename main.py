@@ -1,21 +1,34 @@
 from __future__ import annotations
 
 import json
+import multiprocessing
 import os
+import pickle
+import queue
+import signal
+import time
 from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 # Modulos do projeto
 from video.inference_video import run_video_inference
-from fusion.rules_engine import fuse_events
+from video.long_video import run_video_ranges
+from video.model_client import ModelClient
+from video.episodes import VideoEpisode, aggregate_episodes
+from video.video_events import VideoEventTable
+from fusion.live_monitor import LiveMonitor
+from fusion.rules_engine import fuse_events, load_rules
 from alerts.alert_manager import save_alert_log
+from batch.orchestrator import run_batch
 
+from audio.audio_events import AudioEvent
 from audio.audio_features import extract_audio_features
 from audio.urgency_detection import detect_clinical_urgency
 
-from azure_integration.function_client import send_alert_to_function
+from azure_integration.function_client import get_function_client, send_alert_to_function
+from telemetry import metrics
 
 def _now_iso() -> str:
     return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
@@ -27,55 +40,371 @@ def _ensure_dirs() -> None:
     Path("results/audio_outputs").mkdir(parents=True, exist_ok=True)
 
 
+def _optional_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
 def _load_config() -> Dict[str, Any]:
     return {
         "VIDEO_INPUT": os.getenv("VIDEO_INPUT", "data/videos/pph_simulation_clip.mp4"),
         "FULL_VIDEO_INPUT": os.getenv("FULL_VIDEO_INPUT", "data/videos/full_pph_video.mp4"),
         "VIDEO_MODEL": os.getenv("VIDEO_MODEL", "yolov8n.pt"),
         "VIDEO_CONF": float(os.getenv("VIDEO_CONF", "0.35")),
+        # torch | torchscript | onnx | onnx_int8 | openvino | openvino_int8
+        "VIDEO_BACKEND": os.getenv("VIDEO_BACKEND", "torch"),
+        "VIDEO_BATCH_SIZE": int(os.getenv("VIDEO_BATCH_SIZE", "1")),
+        "VIDEO_PIPELINE": os.getenv("VIDEO_PIPELINE", "0") == "1",
+        # ex.: "0.005" -> só roda YOLO em frames com >= 0.5% de pixels vermelhos
+        "VIDEO_COLOR_GATE": _optional_float("VIDEO_COLOR_GATE"),
+        # > 1 ativa o modo de rastreamento (YOLO só a cada N frames)
+        "VIDEO_DETECT_EVERY": int(os.getenv("VIDEO_DETECT_EVERY", "1")),
+        # full | events_only | none
+        "VIDEO_OUTPUT_MODE": os.getenv("VIDEO_OUTPUT_MODE", "full"),
+        # detecções a até N s uma da outra formam um único episódio
+        "VIDEO_EPISODE_GAP_S": float(os.getenv("VIDEO_EPISODE_GAP_S", "1.0")),
+        # host:port de um video/model_server.py já rodando (modelo carregado uma vez)
+        "VIDEO_SERVER": os.getenv("VIDEO_SERVER", ""),
+        # diretório de checkpoints: uma execução interrompida retoma de onde parou (vazio = desligado)
+        "VIDEO_CHECKPOINT_DIR": os.getenv("VIDEO_CHECKPOINT_DIR", ""),
+        "VIDEO_CHECKPOINT_EVERY_S": float(os.getenv("VIDEO_CHECKPOINT_EVERY_S", "30")),
+        # > 1 divide o vídeo em N trechos processados em paralelo (ver video/long_video.py)
+        "VIDEO_PARTS": int(os.getenv("VIDEO_PARTS", "1")),
+        # 0 = núcleos / VIDEO_PARTS_THREADS
+        "VIDEO_PARTS_WORKERS": int(os.getenv("VIDEO_PARTS_WORKERS", "0")),
+        "VIDEO_PARTS_THREADS": int(os.getenv("VIDEO_PARTS_THREADS", "1")),
+        "AUDIO_INPUT": os.getenv("AUDIO_INPUT", "data/audios/patient_distress_audio.wav"),
+        "AUDIO_LANGUAGE": os.getenv("AUDIO_LANGUAGE", "en-US"),
+        # chunks transcritos em paralelo (chamadas ao Google Web Speech)
+        "AUDIO_SR_WORKERS": int(os.getenv("AUDIO_SR_WORKERS", "4")),
+        # google (rede) | torchaudio (offline, pesos em AUDIO_ASR_WEIGHTS) | fake
+        "AUDIO_ASR_BACKEND": os.getenv("AUDIO_ASR_BACKEND", "google"),
+        # vad (só trechos com fala) | fixed (janelas de 4 s)
+        "AUDIO_SEGMENTATION": os.getenv("AUDIO_SEGMENTATION", "vad"),
+        # "1" grava os chunks de áudio em results/audio_outputs (depuração)
+        "AUDIO_DUMP_CHUNKS": os.getenv("AUDIO_DUMP_CHUNKS", "0") == "1",
+        # "0" roda vídeo e áudio em sequência (útil para depurar)
+        "PARALLEL_BRANCHES": os.getenv("PARALLEL_BRANCHES", "1") == "1",
         "OUTPUT_DIR": os.getenv("OUTPUT_DIR", "results"),
+        # sangramento e distress só elevam o risco a "high" se ocorrerem a no máximo N s um do outro
+        "FUSION_WINDOW_S": float(os.getenv("FUSION_WINDOW_S", "30")),
+        # arquivo YAML de regras de fusão (vazio = fusion/rules.yaml)
+        "FUSION_RULES": os.getenv("FUSION_RULES", ""),
+        # segundos esperando a outbox da Azure Function esvaziar antes de sair
+        "AZURE_DRAIN_S": float(os.getenv("AZURE_DRAIN_S", "10")),
+        # "1" mede cada etapa e grava results/metrics/run-*.json e pipeline.prom
+        "METRICS_ENABLED": os.getenv("METRICS_ENABLED", "0") == "1",
+        # etapa (ex.: "video.infer") perfilada com cProfile -> results/metrics/<etapa>.prof
+        "METRICS_PROFILE_STAGE": os.getenv("METRICS_PROFILE_STAGE", ""),
+        # offline (arquivo inteiro) | stream (janela deslizante, alerta ao vivo)
+        # | batch (todos os procedimentos de BATCH_INPUT, em vários processos)
+        "PIPELINE_MODE": os.getenv("PIPELINE_MODE", "offline"),
+        # diretório de vídeos ou manifesto .jsonl/.json (ver batch/orchestrator.py)
+        "BATCH_INPUT": os.getenv("BATCH_INPUT", "data/procedures"),
+        "BATCH_OUTPUT_DIR": os.getenv("BATCH_OUTPUT_DIR", "results/batch"),
+        # 0 = núcleos / BATCH_TORCH_THREADS
+        "BATCH_WORKERS": int(os.getenv("BATCH_WORKERS", "0")),
+        "BATCH_TORCH_THREADS": int(os.getenv("BATCH_TORCH_THREADS", "1")),
+        # grava um alerta por procedimento processado no log de alertas
+        "BATCH_SAVE_ALERTS": os.getenv("BATCH_SAVE_ALERTS", "1") == "1",
+        "STREAM_VIDEO_SOURCE": os.getenv("STREAM_VIDEO_SOURCE", ""),  # vazio = VIDEO_INPUT
+        "STREAM_AUDIO_INPUT": os.getenv("STREAM_AUDIO_INPUT", "data/audios/patient_distress_audio.wav"),
+        "STREAM_WINDOW_S": float(os.getenv("STREAM_WINDOW_S", "10")),
+        "STREAM_LATENCY_BUDGET_S": float(os.getenv("STREAM_LATENCY_BUDGET_S", "2")),
+    }
+
+
+def _run_video(cfg: Dict[str, Any], stats: Dict[str, Any]) -> VideoEventTable:
+    kwargs: Dict[str, Any] = {
+        "video_path": cfg["VIDEO_INPUT"],
+        "conf_threshold": cfg["VIDEO_CONF"],
+        "output_dir": cfg["OUTPUT_DIR"],
+        "batch_size": cfg["VIDEO_BATCH_SIZE"],
+        "pipeline": cfg["VIDEO_PIPELINE"],
+        "color_gate_threshold": cfg["VIDEO_COLOR_GATE"],
+        "detect_every": cfg["VIDEO_DETECT_EVERY"],
+        "output_mode": cfg["VIDEO_OUTPUT_MODE"],
+        "stats": stats,
     }
+    if cfg["VIDEO_CHECKPOINT_DIR"]:
+        kwargs["checkpoint_every_s"] = cfg["VIDEO_CHECKPOINT_EVERY_S"]
+
+    # Vídeo longo: trechos em paralelo, cada um com seu checkpoint
+    if cfg["VIDEO_PARTS"] > 1:
+        video_path = kwargs.pop("video_path")
+        conf_threshold = kwargs.pop("conf_threshold")
+        return run_video_ranges(
+            video_path,
+            cfg["VIDEO_MODEL"],
+            conf_threshold,
+            parts=cfg["VIDEO_PARTS"],
+            workers=cfg["VIDEO_PARTS_WORKERS"],
+            torch_threads=cfg["VIDEO_PARTS_THREADS"],
+            checkpoint_dir=cfg["VIDEO_CHECKPOINT_DIR"] or os.path.join(cfg["OUTPUT_DIR"], "video_checkpoints"),
+            backend=cfg["VIDEO_BACKEND"],
+            **kwargs,
+        )
+    if cfg["VIDEO_CHECKPOINT_DIR"]:
+        kwargs["checkpoint_path"] = os.path.join(cfg["VIDEO_CHECKPOINT_DIR"], f"{Path(cfg['VIDEO_INPUT']).stem}.ckpt.json")
+
+    # Servidor de inferência persistente: evita recarregar o YOLO a cada vídeo
+    if cfg["VIDEO_SERVER"]:
+        with ModelClient(cfg["VIDEO_SERVER"]) as client:
+            return client.run_video_inference(**kwargs)
+
+    return run_video_inference(
+        model_path=cfg["VIDEO_MODEL"],
+        backend=cfg["VIDEO_BACKEND"],
+        **kwargs,
+    )
+
+
+def _video_branch(cfg: Dict[str, Any]) -> Tuple[List[VideoEpisode], Dict[str, Any], float]:
+    """
+    Roda o vídeo e já agrupa as detecções em episódios: só os episódios saem
+    do ramo (e do processo, no modo paralelo), não uma entrada por box por frame.
+    """
+    t0 = time.perf_counter()
+    stats: Dict[str, Any] = {}
+    events = _run_video(cfg, stats)
+    stats["detections"] = len(events)
+    with metrics.timer("video.episodes"):
+        episodes = aggregate_episodes(events, max_gap_s=cfg["VIDEO_EPISODE_GAP_S"])
+    return episodes, stats, time.perf_counter() - t0
+
+
+def _audio_branch(cfg: Dict[str, Any]) -> Tuple[Dict[str, Any], List[AudioEvent], float]:
+    t0 = time.perf_counter()
+    features = extract_audio_features(
+        audio_path=cfg["AUDIO_INPUT"],
+        language=cfg["AUDIO_LANGUAGE"],
+        max_workers=cfg["AUDIO_SR_WORKERS"],
+        segmentation=cfg["AUDIO_SEGMENTATION"],
+        asr_backend=cfg["AUDIO_ASR_BACKEND"],
+        debug_dump_dir=str(Path(cfg["OUTPUT_DIR"]) / "audio_outputs") if cfg["AUDIO_DUMP_CHUNKS"] else None,
+    )
+    events = detect_clinical_urgency(features)
+    return features, events, time.perf_counter() - t0
+
+
+def _configure_metrics(cfg: Dict[str, Any]) -> None:
+    metrics.configure(enabled=cfg["METRICS_ENABLED"], profile_stage=cfg["METRICS_PROFILE_STAGE"])
+
+
+def _branch_in_child(branch: Any, cfg: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    """Roda o ramo num processo filho e devolve também as métricas medidas lá."""
+    _configure_metrics(cfg)
+    result = branch(cfg)
+    if cfg["METRICS_PROFILE_STAGE"]:
+        stage = cfg["METRICS_PROFILE_STAGE"]
+        metrics.write_profile(str(Path(cfg["OUTPUT_DIR"]) / "metrics" / f"{stage}-{branch.__name__.strip('_')}.prof"))
+    return result, metrics.drain()
+
+
+def _write_metrics(cfg: Dict[str, Any], **extra: Any) -> None:
+    if not cfg["METRICS_ENABLED"]:
+        return
+    out_dir = Path(cfg["OUTPUT_DIR"]) / "metrics"
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    report_path = metrics.write_report(str(out_dir / f"run-{stamp}.json"), **extra)
+    prom_path = metrics.write_prometheus(str(out_dir / "pipeline.prom"))
+    print(f"Métricas: {report_path} | {prom_path}")
+    if cfg["METRICS_PROFILE_STAGE"]:
+        prof = metrics.write_profile(str(out_dir / f"{cfg['METRICS_PROFILE_STAGE']}.prof"))
+        if prof:
+            print(f"Perfil de {cfg['METRICS_PROFILE_STAGE']}: {prof}")
+
+
+def _branch_process(name: str, branch: Any, cfg: Dict[str, Any], results: Any) -> None:
+    """
+    Alvo do processo de cada ramo. O processo abre o próprio grupo, que os
+    workers aninhados (ex.: VIDEO_PARTS) herdam; assim _kill_branch encerra
+    a árvore inteira com um único os.killpg.
+    """
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    try:
+        results.put((name, _branch_in_child(branch, cfg), None))
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(f"{type(e).__name__}: {e}")
+        results.put((name, None, e))
+
+
+def _kill_branch(proc: multiprocessing.Process) -> None:
+    if proc.is_alive():
+        try:
+            os.killpg(proc.pid, signal.SIGTERM)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            # sem killpg (Windows) ou o filho ainda não criou o grupo
+            proc.terminate()
+    proc.join()
+
+
+def _run_branches_parallel(cfg: Dict[str, Any]) -> Tuple[Any, Any]:
+    """
+    Roda os ramos de vídeo (torch, CPU-bound) e áudio (rede/IO) em processos
+    separados. Se um ramo falha, o outro é encerrado junto com os processos
+    que ele abriu e a exceção é re-levantada aqui sem esperar ele terminar.
+    """
+    results = multiprocessing.Queue()
+    procs = {
+        name: multiprocessing.Process(target=_branch_process, args=(name, branch, cfg, results))
+        for name, branch in (("vídeo", _video_branch), ("áudio", _audio_branch))
+    }
+    for proc in procs.values():
+        proc.start()
+    try:
+        outs: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        while len(outs) < len(procs):
+            try:
+                name, out, error = results.get(timeout=0.5)
+            except queue.Empty:
+                # um filho que sai normalmente já entregou o resultado (o put é drenado antes da saída)
+                for name, proc in procs.items():
+                    if name not in outs and proc.exitcode not in (None, 0):
+                        raise RuntimeError(f"Processo do ramo de {name} encerrado abruptamente (exitcode {proc.exitcode}).")
+                continue
+            if error is not None:
+                print(f"Falha no ramo de {name}.")
+                raise error
+            outs[name] = out
+        (video_out, video_metrics), (audio_out, audio_metrics) = outs["vídeo"], outs["áudio"]
+        metrics.merge(video_metrics)
+        metrics.merge(audio_metrics)
+        return video_out, audio_out
+    except BaseException:
+        # inclui Ctrl+C: os filhos estão em outro grupo e não recebem o SIGINT do terminal
+        for proc in procs.values():
+            _kill_branch(proc)
+        raise
+    finally:
+        for proc in procs.values():
+            proc.join()
+
+
+def main_live(cfg: Dict[str, Any]) -> None:
+    """
+    Modo streaming: vídeo ao vivo (câmera/RTSP, ou arquivo reproduzido em
+    tempo real) + áudio em blocos, com fusão reavaliada numa janela
+    deslizante e alerta disparado assim que sangramento e distress coincidem.
+    """
+    azure = get_function_client() if os.getenv("AZURE_FUNCTION_URL") else None
+
+    def _on_alert(result: Dict[str, Any]) -> None:
+        alert_path = save_alert_log(result, output_dir=cfg["OUTPUT_DIR"])
+        if azure is not None:
+            # grava na outbox e volta na hora; o envio é em segundo plano
+            azure.enqueue(result)
+        print(
+            f"[{_now_iso()}] 🚨 ALERTA {result.get('risk_level')} "
+            f"(latência {result.get('latency_s', 0.0):.3f}s) -> {alert_path}"
+        )
+
+    monitor = LiveMonitor(
+        on_alert=_on_alert,
+        window_s=cfg["STREAM_WINDOW_S"],
+        latency_budget_s=cfg["STREAM_LATENCY_BUDGET_S"],
+        rules=load_rules(cfg["FUSION_RULES"] or None),
+    )
+    report = monitor.run(
+        video_source=cfg["STREAM_VIDEO_SOURCE"] or cfg["VIDEO_INPUT"],
+        audio_path=cfg["STREAM_AUDIO_INPUT"] or None,
+        language=cfg["AUDIO_LANGUAGE"],
+        asr_backend=cfg["AUDIO_ASR_BACKEND"],
+        video_kwargs={
+            "model_path": cfg["VIDEO_MODEL"],
+            "conf_threshold": cfg["VIDEO_CONF"],
+            "output_dir": cfg["OUTPUT_DIR"],
+            "backend": cfg["VIDEO_BACKEND"],
+            "color_gate_threshold": cfg["VIDEO_COLOR_GATE"],
+            "detect_every": cfg["VIDEO_DETECT_EVERY"],
+            "output_mode": cfg["VIDEO_OUTPUT_MODE"],
+            "pipeline": True,
+        },
+    )
+    print(f"Relatório de latência: {json.dumps(report, ensure_ascii=False, indent=2)}")
+    if azure is not None:
+        azure.close(drain_timeout_s=cfg["AZURE_DRAIN_S"])
+    _write_metrics(cfg, mode="stream", latency=report)
+
+
+def main_batch(cfg: Dict[str, Any]) -> None:
+    """
+    Reanálise em lote de procedimentos gravados: jobs de vídeo e áudio num
+    pool de processos, com checkpoint (uma nova execução retoma de onde
+    parou) e resumo consolidado em BATCH_OUTPUT_DIR/summary.json.
+    """
+    summary = run_batch(cfg)
+    print(
+        f"\nLote concluído em {summary['wall_s']:.1f}s | "
+        f"{summary['procedures_processed_now']}/{summary['procedures_total']} procedimentos processados agora | "
+        f"{summary['realtime_factor']:.1f}x tempo real | riscos: {summary['risk_counts']}"
+    )
+    for f in summary["failed"]:
+        print(f"  falhou: {f['key']}: {f['error']}")
+    print(f"Resumo: {Path(cfg['BATCH_OUTPUT_DIR']) / 'summary.json'}")
+    _write_metrics(cfg, mode="batch", workers=summary["workers"], torch_threads=summary["torch_threads"])
 
 
 def main() -> None:
     _ensure_dirs()
     cfg = _load_config()
+    _configure_metrics(cfg)
 
     print("=== Tech Challenge Fase 4 | Pipeline Multimodal ===")
     print(f"[{_now_iso()}] Config: {json.dumps(cfg, ensure_ascii=False)}")
 
-    # 1) Vídeo -> eventos visuais
-    print("\n[1/4] Rodando análise de VÍDEO...")
-    video_events = run_video_inference(
-        video_path=cfg["VIDEO_INPUT"],
-        model_path=cfg["VIDEO_MODEL"],
-        conf_threshold=cfg["VIDEO_CONF"],
-        output_dir=cfg["OUTPUT_DIR"],
-    )
-    print(f"Eventos de vídeo: {len(video_events)}")
+    if cfg["PIPELINE_MODE"] == "stream":
+        main_live(cfg)
+        return
+    if cfg["PIPELINE_MODE"] == "batch":
+        main_batch(cfg)
+        return
 
-    # 2) Áudio -> eventos vocais
-    print("\n[2/4] Rodando análise de ÁUDIO...")
-    audio_features = extract_audio_features(
-        audio_path="data/audios/patient_distress_audio.wav",
-        language="en-US",
+    # 1+2) Vídeo e áudio são independentes até a fusão -> rodam em paralelo
+    mode = "em paralelo" if cfg["PARALLEL_BRANCHES"] else "em sequência"
+    print(f"\n[1-2/4] Rodando análise de VÍDEO e ÁUDIO ({mode})...")
+    t0 = time.perf_counter()
+    if cfg["PARALLEL_BRANCHES"]:
+        video_out, audio_out = _run_branches_parallel(cfg)
+    else:
+        video_out, audio_out = _video_branch(cfg), _audio_branch(cfg)
+    branches_elapsed = time.perf_counter() - t0
+
+    video_episodes, video_stats, video_elapsed = video_out
+    audio_features, audio_events, audio_elapsed = audio_out
+    metrics.observe("branch.video", video_elapsed)
+    metrics.observe("branch.audio", audio_elapsed)
+    metrics.observe("branch.both", branches_elapsed)
+
+    print(f"Eventos de vídeo: {video_stats.get('detections', 0)} detecções em {len(video_episodes)} episódios")
+    print(
+        f"Frames: {video_stats.get('frames_total', 0)} "
+        f"(YOLO em {video_stats.get('frames_inferred', 0)}, "
+        f"pulados pelo filtro de cor: {video_stats.get('frames_skipped_color_gate', 0)})"
     )
-    audio_events = detect_clinical_urgency(audio_features)
 
     print("Transcrição:", audio_features.get("transcript", "")[:300])
     print("Audio dBFS:", audio_features.get("audio_dbfs"))
     print("Chunks:", audio_features.get("num_chunks"))
     print("Chunks transcript:", audio_features.get("chunks_transcript", [])[:3])
-
-
-    audio_events = detect_clinical_urgency(audio_features)
     print(f"Eventos de áudio: {len(audio_events)}")
 
+    print(
+        f"Tempo: vídeo {video_elapsed:.2f}s | áudio {audio_elapsed:.2f}s | "
+        f"total das análises {branches_elapsed:.2f}s"
+    )
+
     # 3) Fusão multimodal -> alerta
     print("\n[3/4] Fundindo eventos e avaliando risco...")
     fusion_result = fuse_events(
-        video_events=[asdict(e) for e in video_events],
+        video_events=[asdict(e) for e in video_episodes],
         audio_events=[asdict(e) for e in audio_events],
+        window_s=cfg["FUSION_WINDOW_S"],
+        rules=load_rules(cfg["FUSION_RULES"] or None),
     )
 
     print(f"Resultado de fusão: {json.dumps(fusion_result, ensure_ascii=False, indent=2)}")
@@ -92,13 +421,41 @@ def main() -> None:
         "risk_level": fusion_result.get("risk_level"),
         "reasons": fusion_result.get("reasons", []),
         "action": fusion_result.get("action"),
-        "video_summary": {"count_events": len(video_events)},
+        "matched_intervals": fusion_result.get("matched_intervals", []),
+        "video_summary": {
+            "count_events": video_stats.get("detections", 0),
+            "count_episodes": len(video_episodes),
+            "episodes": [
+                {
+                    "start_s": round(e.start_s, 3),
+                    "end_s": round(e.end_s, 3),
+                    "peak_confidence": round(e.confidence, 3),
+                    "mean_confidence": round(e.mean_confidence, 3),
+                    "max_area_ratio": round(e.max_area_ratio, 4),
+                }
+                for e in video_episodes
+            ],
+        },
         "audio_summary": {"count_events": len(audio_events)},
         "transcript": audio_features.get("transcript", "")[:500],
     }
 
     azure_resp = send_alert_to_function(azure_payload)
-    print("Azure response:", azure_resp)
+    if azure_resp.get("queued"):
+        print(f"Azure Function indisponível ({azure_resp['error']}); alerta na outbox: {azure_resp['outbox_id']}")
+    else:
+        print("Azure response:", azure_resp)
+    # dá uma chance aos alertas pendentes (desta ou de execuções anteriores)
+    get_function_client().close(drain_timeout_s=cfg["AZURE_DRAIN_S"])
+
+    _write_metrics(
+        cfg,
+        mode="offline",
+        video_input=cfg["VIDEO_INPUT"],
+        video_stats={k: v for k, v in video_stats.items() if k != "output_paths"},
+        audio_chunks=audio_features.get("num_chunks"),
+        risk_level=fusion_result.get("risk_level"),
+    )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,313 @@
+"""
+Instrumentação leve do pipeline: timers e contadores por etapa, relatório
+JSON da execução e arquivo no formato texto do Prometheus.
+
+    from telemetry import metrics
+
+    with metrics.timer("video.infer"):
+        ...
+    metrics.count("video.frames_inferred", len(batch))
+
+    @metrics.timed("fusion.fuse")
+    def fuse_events(...): ...
+
+Desligado por padrão (METRICS_ENABLED=1 ou metrics.configure(enabled=True)):
+desligado, timer() devolve sempre o mesmo contexto vazio e count() retorna
+na primeira linha, então o custo nos laços por frame é de uma chamada de
+função.
+
+Perfil de uma etapa: configure(profile_stage="video.infer") (ou
+METRICS_PROFILE_STAGE) liga o cProfile só dentro desse timer, na thread que o
+executa, e write_profile() grava o .prof acumulado (abra com snakeviz ou
+pstats). Para o py-spy, as etapas já rodam em threads nomeadas
+(video-decode, video-encode, asr-*); `py-spy record --pid <pid>` ou
+`py-spy dump` mostram onde cada uma está.
+
+Processos filhos (ramos paralelos do main.py) têm seu próprio registro:
+drain() lá e merge() aqui juntam as medições.
+"""
+from __future__ import annotations
+
+import bisect
+import cProfile
+import functools
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import numpy as np
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# limites (s) dos buckets do histograma no Prometheus
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# durações guardadas por etapa para os percentis (amostragem reservoir além disso)
+MAX_SAMPLES = 50_000
+
+
+class _Stage:
+    __slots__ = ("count", "total", "max", "buckets", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # último = +Inf
+        self.samples = array("d")
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            j = random.randrange(self.count)
+            if j < MAX_SAMPLES:
+                self.samples[j] = seconds
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        self.count += other["count"]
+        self.total += other["total"]
+        self.max = max(self.max, other["max"])
+        self.buckets = [a + b for a, b in zip(self.buckets, other["buckets"])]
+        room = MAX_SAMPLES - len(self.samples)
+        self.samples.extend(other["samples"][:room])
+
+    def summary(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"count": self.count, "total_s": self.total, "max_s": self.max}
+        if self.count:
+            out["mean_s"] = self.total / self.count
+            p50, p95, p99 = np.percentile(np.frombuffer(self.samples, dtype=np.float64), [50, 95, 99])
+            out.update(p50_s=float(p50), p95_s=float(p95), p99_s=float(p99))
+        return out
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "t0", "profiler")
+
+    def __init__(self, registry: "Registry", name: str) -> None:
+        self.registry = registry
+        self.name = name
+        self.profiler: Optional[cProfile.Profile] = None
+
+    def __enter__(self) -> "_Timer":
+        if self.name == self.registry.profile_stage:
+            profiler = self.registry._profiler_for_thread()
+            try:
+                profiler.enable()
+                self.profiler = profiler
+            except ValueError:
+                # Python >= 3.12: um profiler por vez no processo; esta chamada fica sem perfil
+                pass
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self.t0
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.registry.observe(self.name, elapsed)
+
+
+class Registry:
+    """Timers (histograma + percentis) e contadores de uma execução; thread-safe."""
+
+    def __init__(self, enabled: bool = False, profile_stage: Optional[str] = None) -> None:
+        self.enabled = enabled
+        self.profile_stage = profile_stage
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _Stage] = {}
+        self._counters: Dict[str, float] = {}
+        self._profilers: Dict[int, cProfile.Profile] = {}
+        self._started = time.time()
+
+    def configure(self, enabled: Optional[bool] = None, profile_stage: Optional[str] = None) -> None:
+        if enabled is not None:
+            self.enabled = enabled
+        if profile_stage is not None:
+            self.profile_stage = profile_stage or None
+
+    # ---- coleta ----
+
+    def timer(self, name: str):
+        """Context manager que mede o bloco como uma observação da etapa name."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """Decorator: cada chamada da função vira uma observação da etapa name."""
+        def decorator(fn: F) -> F:
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Timer(self, name):
+                    return fn(*args, **kwargs)
+            return wrapper  # type: ignore[return-value]
+        return decorator
+
+    def observe(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = _Stage()
+            stage.observe(seconds)
+
+    def count(self, name: str, n: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def _profiler_for_thread(self) -> cProfile.Profile:
+        ident = threading.get_ident()
+        with self._lock:
+            profiler = self._profilers.get(ident)
+            if profiler is None:
+                profiler = self._profilers[ident] = cProfile.Profile()
+        return profiler
+
+    # ---- entre processos ----
+
+    def drain(self) -> Dict[str, Any]:
+        """Estado atual (picklável) e zera o registro; o outro lado chama merge()."""
+        with self._lock:
+            state = {
+                "stages": {
+                    name: {
+                        "count": s.count,
+                        "total": s.total,
+                        "max": s.max,
+                        "buckets": list(s.buckets),
+                        "samples": s.samples.tolist(),
+                    }
+                    for name, s in self._stages.items()
+                },
+                "counters": dict(self._counters),
+            }
+            self._stages.clear()
+            self._counters.clear()
+        return state
+
+    def merge(self, state: Optional[Dict[str, Any]]) -> None:
+        if not state:
+            return
+        with self._lock:
+            for name, other in state["stages"].items():
+                self._stages.setdefault(name, _Stage()).merge(other)
+            for name, n in state["counters"].items():
+                self._counters[name] = self._counters.get(name, 0) + n
+
+    # ---- exportação ----
+
+    def report(self, **extra: Any) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: s.summary() for name, s in sorted(self._stages.items())}
+            counters = dict(sorted(self._counters.items()))
+        return {
+            "started_at": self._started,
+            "wall_s": time.time() - self._started,
+            "stages": stages,
+            "counters": counters,
+            **extra,
+        }
+
+    def write_report(self, path: str, **extra: Any) -> str:
+        """Relatório JSON: por etapa count/total/mean/max/p50/p95/p99 (s), contadores e extra."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(**extra), f, ensure_ascii=False, indent=2, default=str)
+        return path
+
+    def prometheus_text(self, prefix: str = "pipeline") -> str:
+        lines = [
+            f"# HELP {prefix}_stage_duration_seconds Duração de cada etapa do pipeline.",
+            f"# TYPE {prefix}_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            for name, s in sorted(self._stages.items()):
+                cumulative = 0
+                for le, n in zip(BUCKETS + (math.inf,), s.buckets):
+                    cumulative += n
+                    le_s = "+Inf" if le == math.inf else repr(le)
+                    lines.append(f'{prefix}_stage_duration_seconds_bucket{{stage="{name}",le="{le_s}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_duration_seconds_sum{{stage="{name}"}} {s.total!r}')
+                lines.append(f'{prefix}_stage_duration_seconds_count{{stage="{name}"}} {s.count}')
+            for name, n in sorted(self._counters.items()):
+                metric = f"{prefix}_{_metric_name(name).removesuffix('_total')}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {n!r}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "pipeline") -> str:
+        """Formato texto do Prometheus (ex.: para o textfile collector do node_exporter)."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text(prefix))
+        os.replace(tmp, path)  # o coletor nunca lê um arquivo pela metade
+        return path
+
+    def write_profile(self, path: str) -> Optional[str]:
+        """Grava o cProfile acumulado da etapa profile_stage (todas as threads); None se não houve."""
+        with self._lock:
+            profilers = list(self._profilers.values())
+        if not profilers:
+            return None
+        import pstats
+
+        stats = pstats.Stats(profilers[0])
+        for p in profilers[1:]:
+            stats.add(p)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(path)
+        return path
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+# registro global do processo
+REGISTRY = Registry(
+    enabled=os.getenv("METRICS_ENABLED", "0") == "1",
+    profile_stage=os.getenv("METRICS_PROFILE_STAGE") or None,
+)
+
+configure = REGISTRY.configure
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+observe = REGISTRY.observe
+count = REGISTRY.count
+drain = REGISTRY.drain
+merge = REGISTRY.merge
+report = REGISTRY.report
+write_report = REGISTRY.write_report
+write_prometheus = REGISTRY.write_prometheus
+write_profile = REGISTRY.write_profile
@@ -0,0 +1,61 @@
+"""
+Casamento de frases de distress (audio/distress_matcher.py): palavra
+inteira, normalização, sobreposições e blocos em sequência.
+
+Uso:
+    python -m pytest tests
+"""
+from __future__ import annotations
+
+from audio.distress_matcher import DistressMatcher, get_distress_matcher
+
+
+def _found(text: str, matcher: DistressMatcher = None):
+    matcher = matcher or get_distress_matcher()
+    return [(h.pattern, text[h.start:h.end]) for h in matcher.find_all(text)]
+
+
+def test_overlapping_phrases_are_all_reported():
+    assert _found("now I feel dizzy again") == [("i feel dizzy", "I feel dizzy"), ("dizzy", "dizzy")]
+
+
+def test_whole_words_only():
+    assert _found("painfully faintest, seasick and abnormal") == []
+    assert _found("x-dizzy dizzy-ish") == []
+
+
+def test_apostrophes_case_and_variants():
+    assert _found("I DON’T feel good") == [
+        ("i don't feel good", "I DON’T feel good"),
+        ("dont feel good", "DON’T feel good"),
+    ]
+    assert _found("so deezy, light-headed") == [("dizzy", "deezy"), ("lightheaded", "light-headed")]
+    assert _found("'hurts'") == [("hurts", "'hurts'")]
+
+
+def test_accents_keep_offsets():
+    assert _found("Ela disse: estou tônta, tontúra!") == [("estou tonta", "estou tônta"), ("tontura", "tontúra")]
+
+
+def test_length_changing_normalization_falls_back_to_same_result():
+    # "ﬁ" (ligadura) muda de comprimento na normalização: caminho palavra a palavra
+    assert _found("ﬁne but i feel dizzy") == [("i feel dizzy", "i feel dizzy"), ("dizzy", "dizzy")]
+
+
+def test_stream_matches_phrase_split_across_blocks():
+    stream = get_distress_matcher().stream()
+    assert stream.feed("the patient said i feel") == []
+    hits = stream.feed("dizzy now")
+    assert [h.pattern for h in hits] == ["i feel dizzy", "dizzy"]
+    joined = "the patient said i feel" + " " + "dizzy now"
+    assert joined[hits[0].start:hits[0].end] == "i feel dizzy"
+
+
+def test_large_vocabulary_uses_same_semantics():
+    extra = [f"symptom{i} level{i}" for i in range(200)]
+    matcher = DistressMatcher(["i feel dizzy", "dizzy", *extra])
+    assert _found("symptom7 level7 then i feel dizzy; symptom7 level8", matcher) == [
+        ("symptom7 level7", "symptom7 level7"),
+        ("i feel dizzy", "i feel dizzy"),
+        ("dizzy", "dizzy"),
+    ]
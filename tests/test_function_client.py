@@ -0,0 +1,65 @@
+"""
+Outbox do cliente da Azure Function (azure_integration/function_client.py)
+contra o substituto local (benchmarks/fake_function_server.py).
+
+Uso:
+    python -m pytest tests
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing
+import time
+from pathlib import Path
+
+from azure_integration.function_client import LATENCY_SAMPLES, FunctionClient
+from benchmarks.fake_function_server import FakeFunctionServer
+
+
+def _write_outbox(outbox: Path, alerts) -> None:
+    outbox.mkdir(parents=True, exist_ok=True)
+    for i, alert in enumerate(alerts):
+        (outbox / f"{time.time_ns():020d}-0-{i:06d}.json").write_text(json.dumps(alert), encoding="utf-8")
+
+
+def _drain(url: str, outbox: str, batch_max: int) -> None:
+    client = FunctionClient(url, outbox_dir=outbox, backoff_s=0.01, batch_max=batch_max, flush_interval_s=0.01)
+    client.start()
+    client.close(drain_timeout_s=30)
+
+
+def test_rejected_alert_does_not_take_the_batch_with_it(tmp_path):
+    alerts = [{"id": i, "bad": i == 5} for i in range(16)]
+    _write_outbox(tmp_path, alerts)
+    with FakeFunctionServer(latency_s=0.0, reject=lambda a: a["bad"]) as server:
+        _drain(server.url, str(tmp_path), batch_max=16)
+        assert sorted(a["id"] for a in server.received) == [i for i in range(16) if i != 5]
+    dead = list((tmp_path / "dead").iterdir())
+    assert [json.loads(p.read_text(encoding="utf-8"))["id"] for p in dead] == [5]
+    assert not list(tmp_path.glob("*.json")) and not list(tmp_path.glob("*.inflight"))
+
+
+def test_processes_sharing_the_outbox_send_each_alert_once(tmp_path):
+    n = 300
+    _write_outbox(tmp_path, [{"id": i} for i in range(n)])
+    with FakeFunctionServer(latency_s=0.001) as server:
+        procs = [multiprocessing.Process(target=_drain, args=(server.url, str(tmp_path), 4)) for _ in range(3)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(60)
+        ids = [a["id"] for a in server.received]
+    assert sorted(ids) == list(range(n))
+
+
+def test_claims_of_dead_processes_go_back_to_the_outbox(tmp_path):
+    gone = multiprocessing.Process(target=time.sleep, args=(0,))
+    gone.start()
+    gone.join()
+    name = f"{time.time_ns():020d}-0-000000.json"
+    (tmp_path / f"{name}.{gone.pid}.inflight").write_text(json.dumps({"id": 1}), encoding="utf-8")
+
+    client = FunctionClient("http://127.0.0.1:9/unused", outbox_dir=str(tmp_path))
+    assert [p.name for p in client.pending()] == [name]
+    assert client.stats["latencies_s"].maxlen == LATENCY_SAMPLES
+    client.session.close()
@@ -0,0 +1,179 @@
+"""
+Janelas de coocorrência da fusão (fusion/temporal_fusion.py) e as regras
+de fusion/rules.yaml que dependem delas.
+
+Uso:
+    python -m pytest tests
+"""
+from __future__ import annotations
+
+from dataclasses import asdict
+
+import numpy as np
+import pytest
+
+from audio.urgency_detection import detect_clinical_urgency
+from fusion.rules_engine import fuse_events
+from fusion.temporal_fusion import EventIndex, Spans, burst_intervals, cooccurrence_intervals, merge_intervals
+from fusion.timestamps import format_ts
+
+BLEEDING = "anomalous_bleeding"
+DISTRESS = "patient_distress_detected"
+
+
+def _points(*times: float) -> Spans:
+    return Spans.points(np.asarray(times, dtype=np.float64))
+
+
+def _episodes(*spans: tuple) -> Spans:
+    start = np.asarray([s for s, _ in spans], dtype=np.float64)
+    return Spans(start, np.maximum.accumulate(np.asarray([e for _, e in spans], dtype=np.float64)))
+
+
+def _bleeding(t: float, **extra) -> dict:
+    return {"type": "video_event", "event": BLEEDING, "confidence": 0.9, "timestamp": format_ts(t), **extra}
+
+
+def _distress(ts) -> dict:
+    return {"type": "audio_event", "event": DISTRESS, "confidence": 0.8, "timestamp": ts}
+
+
+# ---- cooccurrence_intervals ----
+
+
+def test_cooccurrence_joins_events_within_window():
+    assert cooccurrence_intervals(_points(100.0), _points(120.0), 30.0) == [(100.0, 120.0)]
+
+
+def test_cooccurrence_window_edge_is_inclusive():
+    assert cooccurrence_intervals(_points(100.0), _points(130.0), 30.0) == [(100.0, 130.0)]
+    assert cooccurrence_intervals(_points(100.0), _points(130.001), 30.0) == []
+
+
+def test_cooccurrence_is_symmetric():
+    a = _points(10.0, 200.0, 205.0, 900.0)
+    b = _points(30.0, 220.0)
+    assert cooccurrence_intervals(a, b, 30.0) == cooccurrence_intervals(b, a, 30.0) == [(10.0, 30.0), (200.0, 220.0)]
+
+
+def test_cooccurrence_merges_overlapping_groups():
+    a = _points(100.0, 125.0, 150.0)
+    b = _points(110.0, 140.0)
+    assert cooccurrence_intervals(a, b, 20.0) == [(100.0, 150.0)]
+
+
+def test_cooccurrence_uses_distance_between_episodes():
+    # episódio de sangramento 10-50 s; distress 25 s depois do fim
+    bleeding = _episodes((10.0, 50.0))
+    assert cooccurrence_intervals(bleeding, _points(75.0), 30.0) == [(10.0, 75.0)]
+    assert cooccurrence_intervals(bleeding, _points(81.0), 30.0) == []
+    # distress antes do início também conta pela distância até o episódio
+    assert cooccurrence_intervals(bleeding, _points(-15.0), 30.0) == [(-15.0, 50.0)]
+
+
+def test_cooccurrence_empty_side():
+    assert cooccurrence_intervals(_points(), _points(1.0), 30.0) == []
+
+
+def test_merge_intervals_unsorted_input():
+    starts = np.asarray([50.0, 0.0, 8.0])
+    ends = np.asarray([60.0, 10.0, 20.0])
+    assert merge_intervals(starts, ends) == [(0.0, 20.0), (50.0, 60.0)]
+
+
+def test_burst_intervals_needs_min_count_within_window():
+    spans = _points(0.0, 10.0, 20.0, 100.0, 200.0)
+    assert burst_intervals(spans, 3, 20.0) == [(0.0, 20.0)]
+    assert burst_intervals(spans, 3, 19.0) == []
+
+
+# ---- EventIndex ----
+
+
+def test_index_counts_untimed_events_apart():
+    index = EventIndex()
+    index.add([_distress("N/A"), _distress(format_ts(5.0)), _distress(None)])
+    assert index.untimed(DISTRESS) == 2
+    assert index.count(DISTRESS) == 1
+    assert index.times(DISTRESS).tolist() == [5.0]
+
+
+def test_index_default_time_for_untimed_events():
+    index = EventIndex()
+    index.add([_distress("N/A")], default_time_s=42.0)
+    assert index.untimed(DISTRESS) == 0
+    assert index.times(DISTRESS).tolist() == [42.0]
+
+
+def test_index_out_of_order_matches_in_order():
+    times = [300.0, 10.0, 250.0, 20.0, 260.0]
+    shuffled, ordered = EventIndex(), EventIndex()
+    for t in times:
+        shuffled.add([_bleeding(t)])
+    ordered.add([_bleeding(t) for t in sorted(times)])
+    assert shuffled.times(BLEEDING).tolist() == ordered.times(BLEEDING).tolist()
+    assert shuffled.count(BLEEDING, 240.0, 270.0) == ordered.count(BLEEDING, 240.0, 270.0) == 2
+
+
+def test_index_episode_touches_query_range():
+    index = EventIndex()
+    index.add([_bleeding(10.0, end_timestamp=format_ts(50.0))])
+    assert index.count(BLEEDING, 40.0, 45.0) == 1
+    assert index.count(BLEEDING, 51.0, 60.0) == 0
+    assert index.span(BLEEDING) == (10.0, 50.0)
+
+
+# ---- regras de fusion/rules.yaml ----
+
+
+def test_bleeding_with_distress_inside_window():
+    result = fuse_events([_bleeding(120.0)], [_distress(format_ts(130.0))], window_s=30.0)
+    assert result["rule"] == "bleeding_with_distress"
+    assert result["risk_level"] == "high"
+    assert [(m["start_s"], m["end_s"]) for m in result["matched_intervals"]] == [(120.0, 130.0)]
+
+
+def test_bleeding_and_distress_apart():
+    result = fuse_events([_bleeding(0.0)], [_distress(format_ts(600.0))], window_s=30.0)
+    assert result["rule"] == "bleeding_and_distress_apart"
+    assert result["risk_level"] == "medium"
+    assert result["matched_intervals"] == []
+
+
+@pytest.mark.parametrize("window_s, rule", [(30.0, "bleeding_and_distress_apart"), (60.0, "bleeding_with_distress")])
+def test_window_override(window_s, rule):
+    result = fuse_events([_bleeding(100.0)], [_distress(format_ts(145.0))], window_s=window_s)
+    assert result["rule"] == rule
+    assert result["window_s"] == window_s
+
+
+def test_untimed_distress_is_not_located_and_matches_anywhere():
+    # distress sem tempo ("N/A") não tem onde ser localizado: vale em qualquer ponto
+    result = fuse_events([_bleeding(100.0)], [_distress("N/A")], window_s=30.0)
+    assert result["rule"] == "bleeding_with_distress"
+    assert [(m["start_s"], m["end_s"]) for m in result["matched_intervals"]] == [(100.0, 100.0)]
+
+
+def test_no_events_is_default():
+    result = fuse_events([], [])
+    assert result["rule"] is None
+    assert result["risk_level"] == "low"
+
+
+def test_distress_far_from_first_hit_reaches_windowed_fusion():
+    """Distress em 01:00 e 40:00 + sangramento em 40:00 tem que dar bleeding_with_distress."""
+    features = {
+        "wav_path": "",
+        "transcript": "please help it hurts the procedure continues please help it hurts",
+        "segments": [
+            {"start_s": 60.0, "end_s": 62.5, "text": "please help it hurts"},
+            {"start_s": 600.0, "end_s": 603.0, "text": "the procedure continues"},
+            {"start_s": 2400.0, "end_s": 2402.5, "text": "please help it hurts"},
+        ],
+    }
+    audio = [asdict(e) for e in detect_clinical_urgency(features)]
+    assert [e["timestamp"] for e in audio] == [format_ts(60.0), format_ts(2400.0)]
+
+    result = fuse_events([_bleeding(2400.0)], audio, window_s=30.0)
+    assert result["rule"] == "bleeding_with_distress"
+    assert result["risk_level"] == "high"
@@ -0,0 +1,55 @@
+"""
+BoxTracker (video/tracking.py) sobre frames sintéticos: um bloco texturizado
+que anda para a direita até sair do frame.
+
+Uso:
+    python -m pytest tests
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from video.tracking import BoxTracker
+
+W, H, SIDE, STEP = 320, 240, 60, 12
+TEXTURE = (np.random.default_rng(0).random((SIDE, SIDE)) * 255).astype(np.uint8)
+
+
+def _frame(x: int) -> np.ndarray:
+    frame = np.zeros((H, W, 3), dtype=np.uint8)
+    x0, x1 = max(0, x), min(W, x + SIDE)
+    if x1 > x0:
+        frame[90:90 + SIDE, x0:x1] = TEXTURE[:, x0 - x:x1 - x, None]
+    return frame
+
+
+def test_shifted_box_is_clamped_to_the_frame():
+    tracker = BoxTracker()
+    x = 230
+    tracker.update(tracker.prepare(_frame(x)), [((x, 90.0, x + SIDE, 90.0 + SIDE), 0.9, "blood")])
+    clamped = 0
+    for _ in range(5):
+        x += STEP
+        tracks = tracker.propagate(tracker.prepare(_frame(x)))
+        assert len(tracks) == 1 and not tracker.degraded
+        x1, y1, x2, y2 = tracks[0].bbox
+        assert 0.0 <= x1 < x2 <= W and 0.0 <= y1 < y2 <= H
+        assert abs(x1 - x) < 1.0
+        clamped += x + SIDE > W
+    assert clamped
+
+
+def test_track_that_leaves_the_frame_is_dropped_without_degrading(monkeypatch):
+    tracker = BoxTracker()
+    tracker.update(tracker.prepare(_frame(0)), [((300.0, 90.0, 320.0, 150.0), 0.9, "blood")])
+    # fluxo que empurra a box para fora: o recorte aos limites fica vazio
+    monkeypatch.setattr(
+        "video.tracking.cv2.calcOpticalFlowPyrLK",
+        lambda prev, gray, pts, *a, **k: (pts + np.float32([40.0, 0.0]), np.ones((len(pts), 1), np.uint8), None),
+    )
+    monkeypatch.setattr(
+        "video.tracking.cv2.goodFeaturesToTrack",
+        lambda roi, **k: np.float32([[[1.0, 1.0]]] * 8),
+    )
+    assert tracker.propagate(tracker.prepare(_frame(0))) == []
+    assert not tracker.degraded
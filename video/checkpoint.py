@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from video.video_events import VideoEventTable
+
+CHECKPOINT_VERSION = 1
+
+
+def video_fingerprint(video_path: str) -> str:
+    """Tamanho + mtime: muda se o arquivo for substituído ou regravado."""
+    st = os.stat(video_path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+class EventStream:
+    """
+    Detecções de run_video_inference num JSONL, uma linha por frame com
+    detecção, escritas à medida que saem do pipeline:
+
+        {"f": frame_idx, "t": ts_s, "d": [[x1, y1, x2, y2, conf, label, track_id], ...]}
+
+    O arquivo é aberto com buffer de linha (cada frame chega ao SO logo que é
+    emitido, dá para acompanhar com tail -f); sync() força o fsync e devolve
+    o offset seguro, que vai no checkpoint. Ao retomar, truncate_to=offset
+    descarta o que foi escrito depois do último checkpoint (esses frames são
+    reprocessados).
+    """
+
+    def __init__(self, path: str, truncate_to: Optional[int] = None) -> None:
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if truncate_to is None:
+            self._f = open(path, "w", encoding="utf-8", buffering=1)
+        else:
+            if not os.path.exists(path) or os.path.getsize(path) < truncate_to:
+                raise ValueError(f"{path} é menor que o offset do checkpoint ({truncate_to} bytes); apague o checkpoint para recomeçar")
+            with open(path, "r+b") as f:
+                f.truncate(truncate_to)
+            self._f = open(path, "a", encoding="utf-8", buffering=1)
+
+    def write_frame(
+        self,
+        frame_idx: int,
+        ts_s: float,
+        detections: Sequence[Tuple[Tuple[float, float, float, float], float, Optional[str]]],
+        track_ids: Optional[Sequence[int]] = None,
+    ) -> None:
+        rows = [
+            [*(float(v) for v in bbox), float(conf), label, None if track_ids is None else track_ids[i]]
+            for i, (bbox, conf, label) in enumerate(detections)
+        ]
+        self._f.write(json.dumps({"f": frame_idx, "t": ts_s, "d": rows}, separators=(",", ":")) + "\n")
+
+    def sync(self) -> int:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        return self._f.tell()
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self.sync()
+            self._f.close()
+
+
+def read_event_stream(path: str, table: VideoEventTable, end_offset: Optional[int] = None) -> VideoEventTable:
+    """Recarrega um EventStream (até end_offset bytes) na tabela; uma última linha incompleta é ignorada."""
+    with open(path, "rb") as f:
+        data = f.read() if end_offset is None else f.read(end_offset)
+    if end_offset is not None and len(data) < end_offset:
+        raise ValueError(f"{path} é menor que o offset do checkpoint ({end_offset} bytes); apague o checkpoint para recomeçar")
+    for line in data.splitlines():
+        try:
+            row = json.loads(line)
+        except ValueError:
+            break  # escrita interrompida no meio da linha
+        detections = [((d[0], d[1], d[2], d[3]), d[4], d[5]) for d in row["d"]]
+        track_ids = None if not row["d"] or row["d"][0][6] is None else [d[6] for d in row["d"]]
+        table.append_frame(row["f"], row["t"], detections, track_ids)
+    return table
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint {path} de versão incompatível: {state.get('version')} (esperado {CHECKPOINT_VERSION})")
+    return state
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    """Grava o checkpoint de forma atômica (tmp + fsync + rename)."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CHECKPOINT_VERSION, **state}, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def check_compatible(state: Dict[str, Any], path: str, fingerprint: str, config: Dict[str, Any]) -> None:
+    """O checkpoint só vale para o mesmo arquivo de vídeo e os mesmos parâmetros que afetam os eventos."""
+    if state.get("fingerprint") != fingerprint:
+        raise ValueError(f"Checkpoint {path} é de outra versão do vídeo (apague-o para recomeçar)")
+    diff: List[str] = sorted(k for k in set(config) | set(state.get("config", {})) if config.get(k) != state["config"].get(k))
+    if diff:
+        raise ValueError(f"Checkpoint {path} foi gerado com outros parâmetros ({', '.join(diff)}); apague-o para recomeçar")
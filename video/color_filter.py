@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+# Faixas de vermelho em HSV (duas bandas: o vermelho "dá a volta" no matiz)
+LOWER_RED1 = np.array([0, 120, 70], dtype=np.uint8)
+UPPER_RED1 = np.array([10, 255, 255], dtype=np.uint8)
+LOWER_RED2 = np.array([170, 120, 70], dtype=np.uint8)
+UPPER_RED2 = np.array([180, 255, 255], dtype=np.uint8)
+
+
+def red_mask(img_bgr: np.ndarray, kernel_size: int = 5, dilate: bool = True) -> np.ndarray:
+    """
+    Máscara binária (uint8, 0/255) dos pixels vermelhos do frame BGR.
+    Aplica abertura morfológica (remove ruído) e, opcionalmente, dilatação.
+    """
+    hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
+
+    mask1 = cv2.inRange(hsv, LOWER_RED1, UPPER_RED1)
+    mask2 = cv2.inRange(hsv, LOWER_RED2, UPPER_RED2)
+    mask = cv2.bitwise_or(mask1, mask2)
+
+    # Limpeza morfológica
+    if kernel_size > 1:
+        kernel = np.ones((kernel_size, kernel_size), np.uint8)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        if dilate:
+            mask = cv2.morphologyEx(mask, cv2.MORPH_DILATE, kernel)
+
+    return mask
+
+
+def red_boxes(mask: np.ndarray, min_area_ratio: float = 0.002) -> List[Tuple[int, int, int, int]]:
+    """
+    Bounding boxes (x, y, w, h) dos contornos externos da máscara,
+    descartando os menores que min_area_ratio da área do frame.
+    """
+    h, w = mask.shape[:2]
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes: List[Tuple[int, int, int, int]] = []
+    for cnt in contours:
+        x, y, bw, bh = cv2.boundingRect(cnt)
+
+        # filtra ruído pequeno
+        if bw * bh < min_area_ratio * (w * h):
+            continue
+
+        boxes.append((x, y, bw, bh))
+
+    return boxes
+
+
+def red_area_ratio(img_bgr: np.ndarray, downscale: int = 4, kernel_size: int = 3) -> float:
+    """
+    Fração (0..1) do frame coberta por pixels vermelhos.
+
+    Pensada como pré-filtro barato antes do YOLO: o frame é reduzido em
+    `downscale` vezes antes da conversão HSV, e só a abertura morfológica é
+    aplicada (sem dilatação, para não inflar a área).
+    """
+    if downscale > 1:
+        h, w = img_bgr.shape[:2]
+        img_bgr = cv2.resize(
+            img_bgr,
+            (max(1, w // downscale), max(1, h // downscale)),
+            interpolation=cv2.INTER_AREA,
+        )
+
+    mask = red_mask(img_bgr, kernel_size=kernel_size, dilate=False)
+    return cv2.countNonZero(mask) / float(mask.size)
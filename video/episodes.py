@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from fusion.timestamps import format_ts
+from video.video_events import VideoEventTable
+
+
+@dataclass(slots=True)
+class VideoEpisode:
+    """
+    Detecções consecutivas (com buracos de até max_gap_s) de um mesmo evento.
+    Tem os campos que a fusão lê de um evento (event, confidence, timestamp)
+    mais end_timestamp, então entra em fuse_events como um intervalo.
+    """
+
+    type: str
+    event: str
+    confidence: float  # pico
+    timestamp: str  # início
+    end_timestamp: str
+    start_s: float
+    end_s: float
+    mean_confidence: float
+    max_area_ratio: float  # maior box / área do frame
+    bbox: Optional[Tuple[float, float, float, float]]  # a box de maior área
+    n_detections: int
+    n_frames: int
+    track_ids: List[int] = field(default_factory=list)
+
+
+def aggregate_episodes(
+    events: VideoEventTable,
+    max_gap_s: float = 1.0,
+    min_detections: int = 1,
+) -> List[VideoEpisode]:
+    """
+    Agrupa as detecções da tabela em episódios: uma nova detecção abre um
+    episódio novo quando está a mais de max_gap_s segundos da anterior.
+    Tudo é calculado com reduceat sobre as colunas; só o laço final é por
+    episódio, então o custo e o tamanho do resultado não dependem do fps.
+    """
+    if len(events) == 0:
+        return []
+
+    cols = events.columns()
+    t = cols["time_s"]
+    order = np.argsort(t, kind="stable")
+    t = t[order]
+    conf = cols["confidence"][order]
+    bbox = cols["bbox"][order].astype(np.float64)
+    frame_idx = cols["frame_idx"][order]
+    track_id = cols["track_id"][order]
+
+    area = np.clip(bbox[:, 2] - bbox[:, 0], 0, None) * np.clip(bbox[:, 3] - bbox[:, 1], 0, None)
+    frame_area = float(events.frame_size[0] * events.frame_size[1]) if events.frame_size else 0.0
+
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(t) > max_gap_s) + 1))
+    ends = np.concatenate((starts[1:], [len(t)]))
+
+    counts = ends - starts
+    peak = np.maximum.reduceat(conf, starts)
+    mean = np.add.reduceat(conf, starts) / counts
+    new_frame = np.concatenate(([1], (np.diff(frame_idx) != 0).astype(np.int64)))
+    new_frame[starts] = 1
+    n_frames = np.add.reduceat(new_frame, starts)
+
+    # índice da maior box de cada episódio: ordena por (episódio, área) e pega o último
+    episode_id = np.repeat(np.arange(len(starts)), counts)
+    biggest = np.lexsort((area, episode_id))[ends - 1]
+
+    episodes: List[VideoEpisode] = []
+    for k, (s, e) in enumerate(zip(starts.tolist(), ends.tolist())):
+        if counts[k] < min_detections:
+            continue
+        tracks = track_id[s:e]
+        b = biggest[k]
+        episodes.append(
+            VideoEpisode(
+                type="video_episode",
+                event=events.event,
+                confidence=float(peak[k]),
+                timestamp=format_ts(float(t[s])),
+                end_timestamp=format_ts(float(t[e - 1])),
+                start_s=float(t[s]),
+                end_s=float(t[e - 1]),
+                mean_confidence=float(mean[k]),
+                max_area_ratio=float(area[b] / frame_area) if frame_area else 0.0,
+                bbox=tuple(bbox[b].tolist()),  # type: ignore[arg-type]
+                n_detections=int(counts[k]),
+                n_frames=int(n_frames[k]),
+                track_ids=np.unique(tracks[tracks >= 0]).tolist(),
+            )
+        )
+    return episodes
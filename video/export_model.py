@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+from ultralytics.data.augment import LetterBox
+
+# Saída padrão do train_yolo.py
+DEFAULT_WEIGHTS = "results/yolo_runs/bleeding_yolov8n/weights/best.pt"
+DATASET_YAML = "data/dataset/dataset.yaml"
+CALIB_IMAGES_DIR = "data/dataset/images"
+
+BACKENDS = ("torch", "torchscript", "onnx", "onnx_int8", "openvino", "openvino_int8")
+
+
+def resolve_model_path(model_path: str, backend: str = "torch") -> str:
+    """
+    Mapeia os pesos .pt para o artefato exportado do backend escolhido,
+    seguindo os nomes gerados por export_model():
+
+      torch          -> best.pt
+      torchscript    -> best.torchscript
+      onnx           -> best.onnx
+      onnx_int8      -> best_int8.onnx
+      openvino       -> best_openvino_model/
+      openvino_int8  -> best_int8_openvino_model/
+
+    Se model_path já aponta para um artefato exportado, é devolvido como está.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend inválido: {backend} (opções: {', '.join(BACKENDS)})")
+
+    p = Path(model_path)
+    if backend == "torch" or p.suffix != ".pt":
+        return model_path
+
+    stem = p.with_suffix("")
+    candidates = {
+        "torchscript": p.with_suffix(".torchscript"),
+        "onnx": p.with_suffix(".onnx"),
+        "onnx_int8": stem.parent / f"{stem.name}_int8.onnx",
+        "openvino": stem.parent / f"{stem.name}_openvino_model",
+        "openvino_int8": stem.parent / f"{stem.name}_int8_openvino_model",
+    }
+    resolved = candidates[backend]
+    if not resolved.exists():
+        raise FileNotFoundError(
+            f"Artefato {backend} não encontrado: {resolved} "
+            f"(rode `python -m video.export_model` antes)"
+        )
+    return str(resolved)
+
+
+def _calibration_images(images_dir: str, imgsz: int, limit: int) -> Iterator[np.ndarray]:
+    paths = sorted(
+        p for p in Path(images_dir).rglob("*") if p.suffix.lower() in {".jpg", ".jpeg", ".png"}
+    )
+    if not paths:
+        raise FileNotFoundError(f"Nenhuma imagem de calibração em {images_dir}")
+
+    # mesmo pré-processamento do YOLO exportado (entrada fixa imgsz x imgsz):
+    # letterbox sem distorcer o aspecto, borda 114, depois RGB, CHW, [0, 1]
+    letterbox = LetterBox((imgsz, imgsz), auto=False)
+    for p in paths[:limit]:
+        img = cv2.imread(str(p))
+        if img is None:
+            continue
+        img = letterbox(image=img)
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        yield np.ascontiguousarray(img.transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def _quantize_onnx_int8(onnx_path: str, images_dir: str, imgsz: int, limit: int) -> str:
+    # Import aqui pra não obrigar onnxruntime quando não há quantização ONNX
+    import onnxruntime as ort
+    from onnxruntime.quantization import CalibrationDataReader, QuantType, quantize_static
+
+    input_name = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self) -> None:
+            self._it = _calibration_images(images_dir, imgsz, limit)
+
+        def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+            img = next(self._it, None)
+            return None if img is None else {input_name: img}
+
+    p = Path(onnx_path)
+    out_path = str(p.with_name(f"{p.stem}_int8.onnx"))
+    quantize_static(
+        onnx_path,
+        out_path,
+        _Reader(),
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    return out_path
+
+
+def export_model(
+    weights: str = DEFAULT_WEIGHTS,
+    backends: Optional[List[str]] = None,
+    imgsz: int = 640,
+    data_yaml: str = DATASET_YAML,
+    calib_images_dir: str = CALIB_IMAGES_DIR,
+    calib_limit: int = 300,
+) -> Dict[str, str]:
+    """
+    Exporta os pesos treinados para backends de inferência em CPU.
+
+    - onnx / openvino: exportados com eixo de batch dinâmico (funcionam com
+      batch_size > 1 em run_video_inference);
+    - openvino_int8: quantização pós-treino do próprio Ultralytics/NNCF,
+      calibrada com o dataset de data_yaml;
+    - onnx_int8: quantização estática do onnxruntime, calibrada com até
+      calib_limit imagens de calib_images_dir;
+    - torchscript: batch fixo em 1.
+
+    Retorna {backend: caminho do artefato}.
+    """
+    backends = backends or ["onnx", "openvino"]
+    for b in backends:
+        if b not in BACKENDS or b == "torch":
+            raise ValueError(f"Backend de exportação inválido: {b}")
+
+    if not Path(weights).exists():
+        raise FileNotFoundError(f"Pesos não encontrados: {weights}")
+
+    model = YOLO(weights)
+    artifacts: Dict[str, str] = {}
+
+    if "torchscript" in backends:
+        artifacts["torchscript"] = str(model.export(format="torchscript", imgsz=imgsz))
+
+    if "onnx" in backends or "onnx_int8" in backends:
+        onnx_path = str(model.export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True))
+        if "onnx" in backends:
+            artifacts["onnx"] = onnx_path
+        if "onnx_int8" in backends:
+            artifacts["onnx_int8"] = _quantize_onnx_int8(onnx_path, calib_images_dir, imgsz, calib_limit)
+
+    if "openvino" in backends:
+        artifacts["openvino"] = str(model.export(format="openvino", imgsz=imgsz, dynamic=True))
+
+    if "openvino_int8" in backends:
+        artifacts["openvino_int8"] = str(
+            model.export(format="openvino", imgsz=imgsz, int8=True, data=data_yaml)
+        )
+
+    return artifacts
+
+
+def main():
+    weights = os.getenv("VIDEO_MODEL", DEFAULT_WEIGHTS)
+    backends = os.getenv("EXPORT_BACKENDS", "onnx,openvino").split(",")
+
+    artifacts = export_model(weights=weights, backends=backends)
+    for backend, path in artifacts.items():
+        print(f"{backend}: {path}")
+
+if __name__ == "__main__":
+    main()
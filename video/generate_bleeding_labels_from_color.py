@@ -1,7 +1,8 @@
 import cv2
-import numpy as np
 from pathlib import Path
 
+from video.color_filter import red_boxes, red_mask
+
 FRAMES_DIR = Path("data/frames")
 IMG_TRAIN = Path("data/dataset/images/train")
 LBL_TRAIN = Path("data/dataset/labels/train")
@@ -18,36 +19,11 @@ for img_path in FRAMES_DIR.glob("*.jpg"):
 
     h, w, _ = img.shape
 
-    # Converte para HSV
-    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-
-    # Faixas de vermelho em HSV (duas bandas)
-    lower_red1 = np.array([0, 120, 70])
-    upper_red1 = np.array([10, 255, 255])
-    lower_red2 = np.array([170, 120, 70])
-    upper_red2 = np.array([180, 255, 255])
-
-    mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
-    mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
-    mask = mask1 | mask2
-
-    # Limpeza morfológica
-    kernel = np.ones((5, 5), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_DILATE, kernel)
-
-    # Encontrar contornos
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    mask = red_mask(img)
 
     label_lines = []
 
-    for cnt in contours:
-        x, y, bw, bh = cv2.boundingRect(cnt)
-
-        # filtra ruído pequeno
-        if bw * bh < 0.002 * (w * h):
-            continue
-
+    for x, y, bw, bh in red_boxes(mask, min_area_ratio=0.002):
         # YOLO format: class cx cy w h (normalizado)
         cx = (x + bw / 2) / w
         cy = (y + bh / 2) / h
@@ -1,13 +1,46 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import time
 
 import cv2
+import numpy as np
 import torch
 from ultralytics import YOLO
 
-from video.video_events import VideoEvent
+from fusion.timestamps import format_ts
+from telemetry import metrics
+from video.color_filter import red_area_ratio
+from video.export_model import resolve_model_path
+from video.pipeline import ThreadedConsumer, threaded_producer
+from video.checkpoint import (
+    EventStream,
+    check_compatible,
+    load_checkpoint,
+    read_event_stream,
+    save_checkpoint,
+    video_fingerprint,
+)
+from video.tracking import BoxTracker
+from video.video_events import VideoEvent, VideoEventTable
+from video.video_output import open_video_output
+
+T = TypeVar("T")
+
+Detection = Tuple[Tuple[float, float, float, float], float, Optional[str]]  # (bbox, conf, label)
+# (frame_idx, frame, detecções, track_ids — None fora do modo de rastreamento)
+_FrameResult = Tuple[int, np.ndarray, List[Detection], Optional[List[int]]]
+
+_COUNTERS = (
+    "frames_total",
+    "frames_inferred",
+    "frames_skipped_color_gate",
+    "keyframes",
+    "frames_tracked",
+    "frames_dropped_late",
+)
 
 
 def _pick_device() -> str:
@@ -20,10 +53,25 @@ def _pick_device() -> str:
     return "cpu"
 
 
-def _format_ts(seconds: float) -> str:
-    m = int(seconds // 60)
-    s = seconds - (m * 60)
-    return f"{m:02d}:{s:06.3f}"
+def load_model(model_path: str, backend: str = "torch", warmup: bool = False) -> Tuple[YOLO, str]:
+    """
+    Carrega o modelo (e escolhe o device) uma única vez, para ser reaproveitado
+    em várias chamadas de run_video_inference(model=..., device=...).
+    Com warmup=True roda uma inferência descartável para pagar a inicialização
+    do torch/backend antes do primeiro vídeo.
+    """
+    device = _pick_device() if backend == "torch" else "cpu"
+    model = YOLO(resolve_model_path(model_path, backend), task="detect")
+
+    if warmup:
+        model.predict(source=np.zeros((640, 640, 3), dtype=np.uint8), device=device, verbose=False)
+
+    return model, device
+
+
+def _is_live_source(video_path: str) -> bool:
+    # índice de câmera ("0") ou URL de stream ("rtsp://...", "http://...")
+    return video_path.isdigit() or "://" in video_path
 
 
 def _draw_box(
@@ -44,6 +92,77 @@ def _draw_box(
     cv2.putText(frame, text, (x1 + 3, y1 - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
 
+def _filter_boxes(
+    r0,
+    names: Optional[Dict[int, str]],
+    w: int,
+    h: int,
+    min_conf: float,
+    min_bbox_area_ratio: float,
+) -> List[Detection]:
+    """
+    Aplica os filtros (classe + conf + área) às boxes de um resultado do YOLO.
+    Retorna uma lista de (bbox, conf, label_name) na ordem original das boxes.
+
+    Os filtros são máscaras sobre os arrays inteiros do frame; só as boxes que
+    passam são convertidas para objetos Python, numa única conversão.
+    """
+    boxes = getattr(r0, "boxes", None)
+    if boxes is None or boxes.xyxy is None or len(boxes) == 0:
+        return []
+
+    n = len(boxes)
+    xyxy = boxes.xyxy.cpu().numpy().astype(np.float64)  # [x1, y1, x2, y2]
+    conf = boxes.conf.cpu().numpy().astype(np.float64) if boxes.conf is not None else np.zeros(n)
+    cls_ids = boxes.cls.cpu().numpy().astype(np.int64) if boxes.cls is not None else np.full(n, -1)
+
+    # 1) filtrar por classe (nosso dataset tem "bleeding"); ids sem nome passam
+    keep = conf >= min_conf  # 2) filtrar por confiança
+    if isinstance(names, dict):
+        other_ids = [k for k, v in names.items() if v != "bleeding"]
+        if other_ids:
+            keep &= ~np.isin(cls_ids, other_ids)
+
+    # 3) filtrar por área relativa
+    bbox_w = np.maximum(0.0, xyxy[:, 2] - xyxy[:, 0])
+    bbox_h = np.maximum(0.0, xyxy[:, 3] - xyxy[:, 1])
+    keep &= (bbox_w * bbox_h) / float(w * h) >= min_bbox_area_ratio
+
+    idx = np.flatnonzero(keep)
+    if idx.size == 0:
+        return []
+
+    label_of = names.get if isinstance(names, dict) else (lambda _cls: None)
+    return [
+        (tuple(bbox), c, label_of(cls_id))
+        for bbox, c, cls_id in zip(xyxy[idx].tolist(), conf[idx].tolist(), cls_ids[idx].tolist())
+    ]
+
+
+def _batched(items: Iterable[T], n: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= n:
+            yield batch
+            batch = []
+    # último lote incompleto
+    if batch:
+        yield batch
+
+
+def _seek(cap: cv2.VideoCapture, frame_idx: int) -> None:
+    """Posiciona o capture no frame_idx; se o container não seekar com precisão, decodifica até lá."""
+    if frame_idx <= 0:
+        return
+    if cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx) and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == frame_idx:
+        return
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    for _ in range(frame_idx):
+        if not cap.grab():
+            return
+
+
 def run_video_inference(
     video_path: str,
     model_path: str,
@@ -52,25 +171,182 @@ def run_video_inference(
     target_label: str = "anomalous_bleeding",
     min_conf: float = 0.60,
     min_bbox_area_ratio: float = 0.015,  # 1.5% do frame
-) -> List[VideoEvent]:
+    batch_size: int = 1,
+    pipeline: bool = False,
+    queue_size: int = 32,
+    color_gate_threshold: Optional[float] = None,
+    detect_every: int = 1,
+    scene_change_threshold: float = 30.0,
+    track_conf_decay: float = 0.97,
+    backend: str = "torch",
+    output_mode: str = "full",
+    event_pad_before_s: float = 2.0,
+    event_pad_after_s: float = 2.0,
+    event_output_format: str = "clip",
+    model: Optional[YOLO] = None,
+    device: Optional[str] = None,
+    realtime: bool = False,
+    max_frame_lag_s: Optional[float] = None,
+    on_frame: Optional[Callable[[int, float, Optional[float], List[VideoEvent]], None]] = None,
+    collect_events: bool = True,
+    frame_range: Optional[Tuple[int, Optional[int]]] = None,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every_s: float = 30.0,
+    events_path: Optional[str] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> VideoEventTable:
     """
     Roda YOLOv8 em um vídeo e retorna eventos detectados.
     Gera vídeo anotado APENAS com as boxes filtradas (classe + conf + área).
 
-    Saída: results/video_outputs/annotated_<nome>.mp4
+    Os eventos voltam numa VideoEventTable (colunas compactas que se comportam
+    como uma lista de VideoEvent); video/episodes.py agrupa detecções
+    consecutivas em episódios antes da fusão.
+
+    batch_size > 1 acumula frames e chama o modelo uma vez por lote; os
+    resultados são mapeados de volta para o frame_idx/timestamp de cada frame,
+    então eventos e vídeo anotado são idênticos ao modo frame a frame.
+
+    pipeline=True separa decodificação, inferência e anotação/escrita em
+    estágios (thread de decode -> inferência -> thread de escrita) ligados por
+    filas limitadas a queue_size frames; a ordem dos frames é preservada e a
+    memória fica limitada mesmo em vídeos longos.
+
+    color_gate_threshold (ex.: 0.005) ativa um pré-filtro HSV barato: o YOLO só
+    roda nos frames cuja fração de pixels vermelhos >= limiar; os demais são
+    tratados como "sem detecção" (e ainda assim escritos no vídeo anotado).
+
+    detect_every > 1 ativa o modo de rastreamento: o YOLO roda só nos
+    keyframes (a cada detect_every frames, em mudança de cena ou quando o
+    rastreamento degrada) e as boxes são propagadas entre eles por fluxo
+    óptico, com a confiança decaindo por track_conf_decay a cada frame.
+    Nesse modo os eventos carregam track_id, para distinguir um sangramento
+    persistente de um novo.
+
+    backend escolhe o artefato do modelo ("torch" = .pt original; "onnx",
+    "onnx_int8", "openvino", "openvino_int8", "torchscript" = exportados por
+    video/export_model.py ao lado do .pt). Backends exportados rodam em CPU.
+
+    output_mode controla a saída anotada (ver video/video_output.py):
+      - "full": results/video_outputs/annotated_<nome>.mp4 (vídeo inteiro)
+      - "events_only": só clipes (event_output_format="clip") ou JPEGs ("jpg")
+        em volta dos frames com evento, com event_pad_before_s/event_pad_after_s
+        de margem
+      - "none": nenhum arquivo, nenhuma cópia de frame
+
+    model/device permitem reaproveitar um modelo já carregado (ver load_model
+    e video/model_server.py); nesse caso model_path/backend não são recarregados.
+
+    Modo ao vivo:
+      - video_path também aceita índice de câmera ("0") ou URL ("rtsp://...");
+      - realtime=True reproduz arquivos no ritmo original (simula câmera) e
+        registra o instante de captura de cada frame;
+      - max_frame_lag_s descarta (sem inferência) frames que esperaram mais
+        que isso desde a captura, mantendo a latência limitada;
+      - on_frame(frame_idx, ts_seconds, capture_time, eventos_do_frame) é
+        chamado a cada frame emitido (capture_time em time.perf_counter(),
+        ou None);
+      - collect_events=False não acumula eventos (a tabela retornada fica
+        vazia), para streams longos consumidos via on_frame.
+
+    Vídeos longos (só arquivos):
+      - frame_range=(início, fim) processa só os frames [início, fim) (fim
+        None = até o final), com frame_idx/timestamps absolutos; as saídas
+        anotadas ganham o sufixo .f<início> no nome. É a base de
+        video/long_video.py, que divide um vídeo em trechos paralelos;
+      - events_path grava as detecções num JSONL à medida que são emitidas
+        (ver video/checkpoint.py: EventStream);
+      - checkpoint_path grava, a cada checkpoint_every_s segundos de
+        execução, o próximo frame a processar, o offset seguro do events_path
+        (padrão: <checkpoint>.events.jsonl) e as saídas já finalizadas.
+        Rodar de novo com o mesmo checkpoint_path retoma dali (seek no
+        vídeo), e um checkpoint concluído devolve os eventos sem reprocessar.
+        Cada checkpoint fecha os arquivos anotados abertos: no "full" o
+        vídeo sai em partes annotated_<nome>.<frame inicial>.mp4 (junte com
+        o concat do ffmpeg); no "events_only" um episódio longo continua em
+        event_<nome>_<início>.<frame>.mp4. No modo de rastreamento o frame
+        retomado é um keyframe e a numeração dos tracks continua a do
+        checkpoint.
+
+    Se `stats` for passado, é preenchido com contadores da execução
+    (frames_total, frames_inferred, frames_skipped_color_gate,
+    keyframes, frames_tracked, frames_dropped_late), output_paths
+    (arquivos gerados) e, com checkpoint_path, resumed_from_frame.
     """
+    if batch_size < 1:
+        raise ValueError(f"batch_size deve ser >= 1 (recebido: {batch_size})")
+    if queue_size < 1:
+        raise ValueError(f"queue_size deve ser >= 1 (recebido: {queue_size})")
+    if color_gate_threshold is not None and not 0.0 <= color_gate_threshold <= 1.0:
+        raise ValueError(f"color_gate_threshold deve estar em [0, 1] (recebido: {color_gate_threshold})")
+    if detect_every < 1:
+        raise ValueError(f"detect_every deve ser >= 1 (recebido: {detect_every})")
+    start_frame, end_frame = frame_range or (0, None)
+    if start_frame < 0 or (end_frame is not None and end_frame <= start_frame):
+        raise ValueError(f"frame_range inválido: {frame_range}")
+    if checkpoint_every_s <= 0:
+        raise ValueError(f"checkpoint_every_s deve ser > 0 (recebido: {checkpoint_every_s})")
+
     output_base = Path(output_dir)
     out_dir = output_base / "video_outputs"
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    live_source = _is_live_source(video_path)
     video_file = Path(video_path)
-    if not video_file.exists():
+    if not live_source and not video_file.exists():
         raise FileNotFoundError(f"Vídeo não encontrado: {video_path}")
-
-    device = _pick_device()
-    model = YOLO(model_path)
-
-    cap = cv2.VideoCapture(str(video_file))
+    stem = f"camera{video_path}" if video_path.isdigit() else ("stream" if live_source else video_file.stem)
+    if live_source and (frame_range is not None or checkpoint_path):
+        raise ValueError("frame_range/checkpoint_path só valem para arquivos de vídeo, não para câmera/stream")
+    if frame_range is not None:
+        stem = f"{stem}.f{start_frame:07d}"
+    if checkpoint_path and events_path is None:
+        events_path = str(Path(checkpoint_path).with_suffix(".events.jsonl"))
+
+    # Checkpoint de uma execução anterior: retoma do próximo frame não confirmado
+    fingerprint = video_fingerprint(video_path) if checkpoint_path else ""
+    ckpt_config = {
+        "video": str(video_path),
+        "model_path": model_path,
+        "backend": backend,
+        "conf_threshold": conf_threshold,
+        "target_label": target_label,
+        "min_conf": min_conf,
+        "min_bbox_area_ratio": min_bbox_area_ratio,
+        "color_gate_threshold": color_gate_threshold,
+        "detect_every": detect_every,
+        "scene_change_threshold": scene_change_threshold,
+        "track_conf_decay": track_conf_decay,
+        "frame_range": [start_frame, end_frame],
+        "output_mode": output_mode,
+        "event_output_format": event_output_format,
+        "events_path": events_path,
+    }
+    state = load_checkpoint(checkpoint_path) if checkpoint_path else None
+    if state is not None:
+        assert checkpoint_path is not None
+        check_compatible(state, checkpoint_path, fingerprint, ckpt_config)
+    resume_frame = state["next_frame"] if state else start_frame
+    done_paths: List[str] = list(state["output_paths"]) if state else []
+
+    if state is not None and state["done"]:
+        # já concluído: só recarrega os eventos confirmados
+        events = VideoEventTable(target_label, tuple(state["frame_size"]))
+        if collect_events:
+            read_event_stream(state["events_path"], events, state["events_offset"])
+        if stats is not None:
+            stats.update({name: 0 for name in _COUNTERS})
+            stats["output_paths"] = done_paths
+            stats["resumed_from_frame"] = resume_frame
+        return events
+
+    if model is None:
+        model, device = load_model(model_path, backend)
+    elif device is None:
+        device = _pick_device() if backend == "torch" else "cpu"
+    names = model.names if hasattr(model, "names") and isinstance(model.names, dict) else None
+
+    cap = cv2.VideoCapture(int(video_path) if video_path.isdigit() else str(video_path))
     if not cap.isOpened():
         raise RuntimeError(f"Não consegui abrir o vídeo: {video_path}")
 
@@ -78,95 +354,255 @@ def run_video_inference(
     w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 1280)
     h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 720)
 
-    out_path = out_dir / f"annotated_{video_file.stem}.mp4"
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    writer = cv2.VideoWriter(str(out_path), fourcc, fps, (w, h))
-
-    events: List[VideoEvent] = []
-    frame_idx = 0
-
-    try:
-        while True:
-            ok, frame = cap.read()
+    # com checkpoint, cada checkpoint fecha os arquivos abertos (uma parte por trecho confirmado)
+    video_out = open_video_output(
+        output_mode,
+        out_dir,
+        stem,
+        fps,
+        (w, h),
+        pad_before_s=event_pad_before_s,
+        pad_after_s=event_pad_after_s,
+        event_format=event_output_format,
+        parts=bool(checkpoint_path),
+    )
+    if state is not None:
+        video_out.restore(state["output_state"])
+
+    events = VideoEventTable(target_label, (w, h))
+    if state is not None and collect_events:
+        read_event_stream(state["events_path"], events, state["events_offset"])
+    stream: Optional[EventStream] = None
+    if events_path:
+        stream = EventStream(events_path, truncate_to=state["events_offset"] if state else None)
+    counters = {name: 0 for name in _COUNTERS}
+
+    tracker: Optional[BoxTracker] = None
+    if detect_every > 1:
+        tracker = BoxTracker(
+            conf_decay=track_conf_decay,
+            min_conf=min_conf,
+            scene_change_threshold=scene_change_threshold,
+            first_id=state["next_track_id"] if state else 1,
+        )
+    # o primeiro frame processado (0, início do trecho ou retomada) é keyframe
+    last_keyframe = resume_frame - detect_every
+    next_frame = resume_frame  # primeiro frame ainda não emitido
+    last_checkpoint = time.perf_counter()
+
+    def _checkpoint(done: bool) -> None:
+        nonlocal last_checkpoint
+        assert checkpoint_path is not None and stream is not None
+        output_state = video_out.checkpoint()
+        save_checkpoint(checkpoint_path, {
+            "fingerprint": fingerprint,
+            "config": ckpt_config,
+            "frame_size": [w, h],
+            "fps": fps,
+            "next_frame": next_frame,
+            "done": done,
+            "events_path": events_path,
+            "events_offset": stream.sync(),
+            "next_track_id": tracker.next_id if tracker is not None else 1,
+            "output_paths": done_paths + video_out.paths,
+            "output_state": output_state,
+        })
+        last_checkpoint = time.perf_counter()
+
+    # instante de captura (time.perf_counter) de cada frame ainda não emitido
+    capture_times: Dict[int, float] = {}
+
+    def _read_frames() -> Iterator[Tuple[int, np.ndarray]]:
+        frame_idx = resume_frame
+        _seek(cap, frame_idx)
+        start = time.perf_counter()
+        while end_frame is None or frame_idx < end_frame:
+            with metrics.timer("video.decode"):
+                ok, frame = cap.read()
             if not ok:
-                break
+                return
+
+            if realtime and not live_source:
+                # replay de arquivo no ritmo original, como se fosse uma câmera
+                due = start + (frame_idx - resume_frame) / fps
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                capture_times[frame_idx] = due
+            elif realtime or on_frame is not None:
+                capture_times[frame_idx] = time.perf_counter()
+
+            yield frame_idx, frame
+            frame_idx += 1
 
-            # Inferência no frame
-            results = model.predict(
-                source=frame,
-                conf=conf_threshold,
-                device=device,
-                verbose=False,
-            )
+    def _detect(batch: List[Tuple[int, np.ndarray]]) -> List[List[Detection]]:
+        frames = [frame for _, frame in batch]
+        detections: List[List[Detection]] = [[] for _ in frames]
+        selected = list(range(len(frames)))
+
+        # Frames atrasados demais são descartados para manter a latência limitada
+        if max_frame_lag_s is not None:
+            now = time.perf_counter()
+            selected = [
+                i for i in selected
+                if now - capture_times.get(batch[i][0], now) <= max_frame_lag_s
+            ]
+            counters["frames_dropped_late"] += len(frames) - len(selected)
+
+        # Pré-filtro de cor: só manda ao YOLO frames com vermelho suficiente
+        if color_gate_threshold is not None:
+            before = len(selected)
+            with metrics.timer("video.color_gate"):
+                selected = [i for i in selected if red_area_ratio(frames[i]) >= color_gate_threshold]
+            counters["frames_skipped_color_gate"] += before - len(selected)
+
+        if selected:
+            to_predict = [frames[i] for i in selected]
+
+            # Inferência no lote (uma única chamada ao modelo)
+            with metrics.timer("video.infer"):
+                results = model.predict(
+                    source=to_predict if len(to_predict) > 1 else to_predict[0],
+                    conf=conf_threshold,
+                    device=device,
+                    verbose=False,
+                )
+            counters["frames_inferred"] += len(to_predict)
+
+            # results vem na mesma ordem dos frames de entrada
+            with metrics.timer("video.postprocess"):
+                for i, r0 in zip(selected, results):
+                    detections[i] = _filter_boxes(r0, names, w, h, min_conf, min_bbox_area_ratio)
+
+        return detections
+
+    def _track(frame_idx: int, frame: np.ndarray) -> _FrameResult:
+        nonlocal last_keyframe
+        assert tracker is not None
+
+        with metrics.timer("video.track"):
+            gray = tracker.prepare(frame)
+            keyframe = frame_idx - last_keyframe >= detect_every or tracker.is_scene_change(gray)
+
+            if not keyframe:
+                tracks = tracker.propagate(gray)
+                # rastreamento degradou -> re-detecta neste mesmo frame
+                keyframe = tracker.degraded
+
+        if keyframe:
+            tracks = tracker.update(gray, _detect([(frame_idx, frame)])[0])
+            last_keyframe = frame_idx
+            counters["keyframes"] += 1
+        else:
+            counters["frames_tracked"] += 1
+
+        return (
+            frame_idx,
+            frame,
+            [(t.bbox, t.confidence, t.label) for t in tracks],
+            [t.track_id for t in tracks],
+        )
+
+    def _infer(batch: List[Tuple[int, np.ndarray]]) -> List[_FrameResult]:
+        counters["frames_total"] += len(batch)
+
+        # Modo rastreamento: depende do frame anterior, então é sequencial
+        if tracker is not None:
+            return [_track(frame_idx, frame) for frame_idx, frame in batch]
+
+        detections = _detect(batch)
+        return [
+            (frame_idx, frame, dets, None)
+            for (frame_idx, frame), dets in zip(batch, detections)
+        ]
+
+    def _emit(item: _FrameResult) -> None:
+        nonlocal next_frame
+        frame_idx, frame, detections, track_ids = item
+
+        # tempo do frame
+        ts_seconds = frame_idx / fps
+
+        labels = [
+            "bleeding" if track_ids is None else f"bleeding #{track_ids[i]}"
+            for i in range(len(detections))
+        ]
+
+        capture_time = capture_times.pop(frame_idx, None)
+        if collect_events:
+            events.append_frame(frame_idx, ts_seconds, detections, track_ids)
+        if stream is not None and detections:
+            stream.write_frame(frame_idx, ts_seconds, detections, track_ids)
+        if on_frame is not None:
+            # evento (só os filtrados)
+            ts = format_ts(ts_seconds)
+            frame_events = [
+                VideoEvent(
+                    type="video_event",
+                    event=target_label,  # "anomalous_bleeding"
+                    confidence=conf,
+                    timestamp=ts,
+                    bbox=bbox,
+                    label=label_name,
+                    track_id=track_ids[i] if track_ids is not None else None,
+                )
+                for i, (bbox, conf, label_name) in enumerate(detections)
+            ]
+            on_frame(frame_idx, ts_seconds, capture_time, frame_events)
+
+        def _render() -> np.ndarray:
+            # Vamos desenhar em uma cópia do frame original
+            annotated = frame.copy()
 
-            r0 = results[0]
-            boxes = getattr(r0, "boxes", None)
+            # desenha só as boxes filtradas
+            for (bbox, conf, _), label in zip(detections, labels):
+                _draw_box(annotated, bbox=bbox, label=label, conf=conf)
 
-            # tempo do frame
-            ts_seconds = frame_idx / fps
-            ts = _format_ts(ts_seconds)
+            return annotated
 
-            # Vamos desenhar em uma cópia do frame original
-            annotated = frame.copy()
+        with metrics.timer("video.encode"):
+            video_out.write(frame_idx, frame, _render, bool(detections))
+        next_frame = frame_idx + 1
 
-            if boxes is not None and boxes.xyxy is not None and len(boxes) > 0:
-                for i in range(len(boxes)):
-                    conf = float(boxes.conf[i].item()) if boxes.conf is not None else 0.0
-                    cls_id = int(boxes.cls[i].item()) if boxes.cls is not None else -1
-                    xyxy = boxes.xyxy[i].tolist()  # [x1, y1, x2, y2]
-
-                    # Nome da classe
-                    label_name: Optional[str] = None
-                    if hasattr(model, "names") and isinstance(model.names, dict):
-                        label_name = model.names.get(cls_id)
-
-                    # 1) filtrar por classe (nosso dataset tem "bleeding")
-                    if label_name is not None and label_name != "bleeding":
-                        continue
-
-                    # 2) filtrar por confiança
-                    if conf < min_conf:
-                        continue
-
-                    # 3) filtrar por área relativa
-                    x1, y1, x2, y2 = map(float, xyxy)
-                    bbox_w = max(0.0, x2 - x1)
-                    bbox_h = max(0.0, y2 - y1)
-                    bbox_area_ratio = (bbox_w * bbox_h) / float(w * h)
-                    if bbox_area_ratio < min_bbox_area_ratio:
-                        continue
-
-                    bbox = (x1, y1, x2, y2)
-
-                    # desenha só as boxes filtradas
-                    _draw_box(
-                        annotated,
-                        bbox=bbox,
-                        label="bleeding",
-                        conf=conf,
-                    )
-
-                    # salva evento (também só os filtrados)
-                    events.append(
-                        VideoEvent(
-                            type="video_event",
-                            event=target_label,  # "anomalous_bleeding"
-                            confidence=conf,
-                            timestamp=ts,
-                            bbox=bbox,
-                            label=label_name,
-                        )
-                    )
-
-            # garantir tamanho
-            if annotated.shape[1] != w or annotated.shape[0] != h:
-                annotated = cv2.resize(annotated, (w, h))
-
-            writer.write(annotated)
-            frame_idx += 1
+        if checkpoint_path and time.perf_counter() - last_checkpoint >= checkpoint_every_s:
+            _checkpoint(False)
+
+    frames = _read_frames()
+    try:
+        if not pipeline:
+            for batch in _batched(frames, batch_size):
+                for item in _infer(batch):
+                    _emit(item)
+        else:
+            frames = threaded_producer(frames, maxsize=queue_size, name="video-decode")
+            encoder = ThreadedConsumer(_emit, maxsize=queue_size, name="video-encode")
+            try:
+                for batch in _batched(frames, batch_size):
+                    for item in _infer(batch):
+                        encoder.put(item)
+            except BaseException:
+                encoder.abort()
+                raise
+            encoder.close()
+
+        if checkpoint_path:
+            video_out.close()
+            _checkpoint(True)
 
     finally:
+        # encerra a thread de decode (se houver) antes de liberar o capture
+        frames.close()
         cap.release()
-        writer.release()
+        video_out.close()
+        if stream is not None:
+            stream.close()
+
+        for name, n in counters.items():
+            metrics.count(f"video.{name}", n)
+        if stats is not None:
+            stats.update(counters)
+            stats["output_paths"] = done_paths + video_out.paths
+            if checkpoint_path:
+                stats["resumed_from_frame"] = resume_frame if state else None
 
     return events
@@ -0,0 +1,161 @@
+"""
+Vídeos longos divididos em trechos de frames processados em paralelo
+(VIDEO_PARTS > 1 no main.py).
+
+- split_frame_ranges corta [0, n_frames) em partes contíguas de tamanho
+  quase igual; cada trecho roda run_video_inference(frame_range=...) num
+  processo (spawn) que carrega o YOLO uma vez e usa torch_threads threads.
+- Cada trecho tem seu próprio checkpoint em checkpoint_dir
+  (<nome>.f<início>-<fim>.ckpt.json + .events.jsonl): rodar de novo depois
+  de uma queda retoma cada trecho de onde parou e pula os concluídos.
+- merge_event_tables junta as tabelas na ordem dos trechos (frames
+  disjuntos e crescentes), então o resultado não depende de qual worker
+  terminou primeiro. No modo de rastreamento cada trecho numera seus tracks
+  a partir de 1 e o merge desloca os ids para não colidirem; um
+  sangramento que atravessa a fronteira vira dois tracks, e o primeiro
+  frame de cada trecho é keyframe.
+"""
+from __future__ import annotations
+
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+
+from telemetry import metrics
+from video.video_events import VideoEventTable
+from video.worker_pool import capped_process_pool, default_workers, worker_model
+
+
+def video_frame_count(video_path: str) -> int:
+    """Número de frames declarado no container (sem decodificar o vídeo)."""
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Não consegui abrir o vídeo: {video_path}")
+    try:
+        n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    finally:
+        cap.release()
+    if n <= 0:
+        raise RuntimeError(f"O container não informa o número de frames: {video_path}")
+    return n
+
+
+def split_frame_ranges(n_frames: int, parts: int) -> List[Tuple[int, int]]:
+    """[0, n_frames) em até `parts` trechos [início, fim) contíguos; os primeiros ficam com o resto."""
+    if parts < 1:
+        raise ValueError(f"parts deve ser >= 1 (recebido: {parts})")
+    parts = min(parts, max(1, n_frames))
+    size, rest = divmod(n_frames, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < rest else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def merge_event_tables(tables: Sequence[VideoEventTable]) -> VideoEventTable:
+    """Concatena as tabelas dos trechos, em ordem, deslocando track_ids para não colidirem."""
+    if not tables:
+        return VideoEventTable()
+    merged = VideoEventTable(tables[0].event, tables[0].frame_size)
+    offset = 0
+    for table in tables:
+        merged.extend(table, track_id_offset=offset)
+        offset = merged.max_track_id()
+    return merged
+
+
+def _run_range(
+    video_path: str,
+    frame_range: Tuple[int, int],
+    checkpoint_path: str,
+    kwargs: Dict[str, Any],
+) -> Tuple[VideoEventTable, Dict[str, Any], Dict[str, Any]]:
+    from video.checkpoint import load_checkpoint
+    from video.inference_video import run_video_inference
+
+    # trecho já concluído numa execução anterior: não precisa do modelo
+    state = load_checkpoint(checkpoint_path)
+    model = device = None
+    if state is None or not state["done"]:
+        model, device = worker_model(kwargs["model_path"], kwargs.get("backend", "torch"))
+
+    stats: Dict[str, Any] = {}
+    events = run_video_inference(
+        video_path=video_path,
+        model=model,
+        device=device,
+        frame_range=frame_range,
+        checkpoint_path=checkpoint_path,
+        stats=stats,
+        **kwargs,
+    )
+    return events, stats, metrics.drain()
+
+
+def run_video_ranges(
+    video_path: str,
+    model_path: str,
+    conf_threshold: float,
+    parts: int,
+    workers: int = 0,
+    torch_threads: int = 1,
+    checkpoint_dir: str = "results/video_checkpoints",
+    stats: Optional[Dict[str, Any]] = None,
+    **kwargs: Any,
+) -> VideoEventTable:
+    """
+    Roda run_video_inference em `parts` trechos do vídeo, em até `workers`
+    processos (0 = um por trecho, limitado a núcleos / torch_threads), e
+    devolve a VideoEventTable mesclada. kwargs vão para cada
+    run_video_inference (backend, batch_size, output_mode,
+    checkpoint_every_s...).
+
+    stats recebe a soma dos contadores dos trechos, output_paths de todos
+    eles, ranges (os [início, fim) usados) e ranges_resumed (trechos
+    retomados de um checkpoint).
+    """
+    if not Path(video_path).exists():
+        raise FileNotFoundError(f"Vídeo não encontrado: {video_path}")
+    ranges = split_frame_ranges(video_frame_count(video_path), parts)
+    workers = min(len(ranges), workers or default_workers(torch_threads))
+
+    stem = Path(video_path).stem
+    ckpt_dir = Path(checkpoint_dir)
+    ckpt_dir.mkdir(parents=True, exist_ok=True)
+    kwargs = {"model_path": model_path, "conf_threshold": conf_threshold, **kwargs}
+
+    try:
+        with capped_process_pool(workers, torch_threads) as pool:
+            futures = [
+                pool.submit(
+                    _run_range,
+                    video_path,
+                    (start, end),
+                    str(ckpt_dir / f"{stem}.f{start:07d}-{end:07d}.ckpt.json"),
+                    kwargs,
+                )
+                for start, end in ranges
+            ]
+            # resultados na ordem dos trechos, não na de término
+            results = [fut.result() for fut in futures]
+    except BrokenProcessPool as e:
+        raise RuntimeError(
+            f"Worker de vídeo encerrado abruptamente ({e}); rode de novo para retomar dos checkpoints em {ckpt_dir}."
+        ) from e
+
+    for _, _, metrics_state in results:
+        metrics.merge(metrics_state)
+    if stats is not None:
+        for _, range_stats, _ in results:
+            for name, value in range_stats.items():
+                if name.startswith(("frames_", "keyframes")):
+                    stats[name] = stats.get(name, 0) + value
+        stats["output_paths"] = [p for _, range_stats, _ in results for p in range_stats.get("output_paths", [])]
+        stats["ranges"] = [list(r) for r in ranges]
+        stats["ranges_resumed"] = sum(1 for _, s, _ in results if s.get("resumed_from_frame") is not None)
+    return merge_event_tables([events for events, _, _ in results])
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import ipaddress
+import os
+import secrets
+import socket
+import stat
+from multiprocessing.connection import Client
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from video.video_events import VideoEventTable
+
+DEFAULT_ADDRESS = "127.0.0.1:6010"
+# chave gerada pelo servidor quando VIDEO_SERVER_AUTHKEY não está definida (só o dono lê)
+DEFAULT_AUTHKEY_FILE = os.path.join("~", ".config", "tech-challenge-fase4", "model_server.key")
+
+# Exceções do servidor que são re-levantadas com o mesmo tipo no cliente
+_KNOWN_ERRORS = {
+    "FileNotFoundError": FileNotFoundError,
+    "ValueError": ValueError,
+    "RuntimeError": RuntimeError,
+}
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _is_loopback(host: str) -> bool:
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except socket.gaierror:
+        return False
+    return bool(infos) and all(ipaddress.ip_address(info[4][0]).is_loopback for info in infos)
+
+
+def check_address(address: str) -> Tuple[str, int]:
+    """
+    parse_address + recusa hosts fora do loopback. Listener/Client trocam
+    objetos pickle, e quem tem a chave executa código no servidor: expor a
+    porta na rede exige VIDEO_SERVER_ALLOW_REMOTE=1 e uma VIDEO_SERVER_AUTHKEY
+    explícita (o tráfego continua sem criptografia; use um túnel SSH/VPN).
+    """
+    host, port = parse_address(address)
+    if _is_loopback(host):
+        return host, port
+    if os.getenv("VIDEO_SERVER_ALLOW_REMOTE", "0") != "1":
+        raise ValueError(
+            f"Servidor de inferência em {host} não é loopback; o protocolo (pickle) não é seguro em rede. "
+            "Use 127.0.0.1, ou defina VIDEO_SERVER_ALLOW_REMOTE=1 e VIDEO_SERVER_AUTHKEY se souber o que está fazendo."
+        )
+    if not os.getenv("VIDEO_SERVER_AUTHKEY"):
+        raise ValueError("VIDEO_SERVER_ALLOW_REMOTE=1 exige uma VIDEO_SERVER_AUTHKEY explícita")
+    print(f"Aviso: servidor de inferência fora do loopback ({host}:{port}): tráfego pickle sem criptografia")
+    return host, port
+
+
+def server_authkey(create: bool = False) -> bytes:
+    """
+    VIDEO_SERVER_AUTHKEY, ou a chave aleatória em VIDEO_SERVER_AUTHKEY_FILE
+    (padrão ~/.config/tech-challenge-fase4/model_server.key, modo 0600).
+    O servidor chama com create=True e gera o arquivo na primeira vez; o
+    cliente só lê. Não há chave padrão: sem nenhuma das duas, falha.
+    """
+    key = os.getenv("VIDEO_SERVER_AUTHKEY")
+    if key:
+        return key.encode("utf-8")
+
+    path = os.path.expanduser(os.getenv("VIDEO_SERVER_AUTHKEY_FILE") or DEFAULT_AUTHKEY_FILE)
+    if create and not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass  # outro servidor criou ao mesmo tempo
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(secrets.token_hex(32))
+    if not os.path.exists(path):
+        raise RuntimeError(
+            f"Sem chave do servidor de inferência: defina VIDEO_SERVER_AUTHKEY ou inicie "
+            f"video/model_server.py (que gera {path})"
+        )
+    st = os.stat(path)
+    if st.st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+        raise RuntimeError(f"{path} é legível por outros usuários; rode chmod 600 {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        key = f.read().strip()
+    if not key:
+        raise RuntimeError(f"{path} está vazio; apague-o para o servidor gerar outra chave")
+    return key.encode("utf-8")
+
+
+class ModelClient:
+    """
+    Cliente do servidor de inferência persistente (video/model_server.py).
+
+    Não importa torch/ultralytics: o modelo fica carregado no processo do
+    servidor. Os caminhos de vídeo são resolvidos no servidor (mesma máquina).
+
+    Uso:
+        with ModelClient("127.0.0.1:6010") as client:
+            events = client.run_video_inference("data/videos/clip.mp4", conf_threshold=0.35)
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, authkey: Optional[bytes] = None) -> None:
+        self._conn = Client(check_address(address), authkey=authkey or server_authkey())
+
+    def __enter__(self) -> "ModelClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _call(self, request: Dict[str, Any]) -> Any:
+        self._conn.send(request)
+        resp = self._conn.recv()
+        if resp.get("ok"):
+            return resp.get("result")
+
+        exc_type = _KNOWN_ERRORS.get(resp.get("error_type", ""), RuntimeError)
+        raise exc_type(f"Erro no servidor de inferência: {resp.get('error')}")
+
+    def ping(self) -> Dict[str, Any]:
+        return self._call({"op": "ping"})
+
+    def run_video_inference(
+        self,
+        video_path: str,
+        conf_threshold: float,
+        stats: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> VideoEventTable:
+        """Mesmos parâmetros de run_video_inference, exceto model_path/backend (fixos no servidor)."""
+        result = self._call(
+            {
+                "op": "video",
+                "kwargs": {"video_path": video_path, "conf_threshold": conf_threshold, **kwargs},
+            }
+        )
+        if stats is not None:
+            stats.update(result["stats"])
+        return result["events"]
+
+    def predict_frames(
+        self,
+        frames: List[np.ndarray],
+        conf_threshold: float,
+        min_conf: float = 0.60,
+        min_bbox_area_ratio: float = 0.015,
+    ) -> List[List[Tuple[Tuple[float, float, float, float], float, Optional[str]]]]:
+        """Detecções filtradas (bbox, conf, label) para cada frame BGR enviado."""
+        return self._call(
+            {
+                "op": "frames",
+                "frames": frames,
+                "kwargs": {
+                    "conf_threshold": conf_threshold,
+                    "min_conf": min_conf,
+                    "min_bbox_area_ratio": min_bbox_area_ratio,
+                },
+            }
+        )
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Connection, Listener
+from typing import Any, Dict, List
+
+import numpy as np
+
+from video.inference_video import Detection, _filter_boxes, load_model, run_video_inference
+from video.model_client import DEFAULT_ADDRESS, check_address, server_authkey
+
+
+class ModelServer:
+    """
+    Processo de inferência de longa duração: carrega o YOLO uma vez, faz o
+    warm-up e atende jobs de vídeo/frames de vários clientes (ModelClient).
+
+    Cada conexão é atendida em uma thread; o uso do modelo é serializado por
+    um lock (o modelo não é thread-safe).
+
+    Operações:
+      - {"op": "ping"}
+      - {"op": "video", "kwargs": {...run_video_inference...}}
+      - {"op": "frames", "frames": [np.ndarray, ...], "kwargs": {...}}
+    """
+
+    def __init__(self, model_path: str, backend: str = "torch") -> None:
+        t0 = time.perf_counter()
+        self.model_path = model_path
+        self.backend = backend
+        self.model, self.device = load_model(model_path, backend, warmup=True)
+        self.load_time_s = time.perf_counter() - t0
+        self.names = self.model.names if isinstance(getattr(self.model, "names", None), dict) else None
+        self._lock = threading.Lock()
+
+    def handle(self, request: Dict[str, Any]) -> Any:
+        op = request.get("op")
+
+        if op == "ping":
+            return {
+                "model_path": self.model_path,
+                "backend": self.backend,
+                "device": self.device,
+                "load_time_s": self.load_time_s,
+            }
+
+        if op == "video":
+            kwargs = dict(request.get("kwargs") or {})
+            kwargs.pop("model_path", None)
+            kwargs.pop("backend", None)
+            stats: Dict[str, Any] = {}
+            with self._lock:
+                events = run_video_inference(
+                    model_path=self.model_path,
+                    backend=self.backend,
+                    model=self.model,
+                    device=self.device,
+                    stats=stats,
+                    **kwargs,
+                )
+            return {"events": events, "stats": stats}
+
+        if op == "frames":
+            return self._predict_frames(request.get("frames") or [], **(request.get("kwargs") or {}))
+
+        raise ValueError(f"Operação desconhecida: {op}")
+
+    def _predict_frames(
+        self,
+        frames: List[np.ndarray],
+        conf_threshold: float,
+        min_conf: float = 0.60,
+        min_bbox_area_ratio: float = 0.015,
+    ) -> List[List[Detection]]:
+        if not frames:
+            return []
+
+        with self._lock:
+            results = self.model.predict(
+                source=frames if len(frames) > 1 else frames[0],
+                conf=conf_threshold,
+                device=self.device,
+                verbose=False,
+            )
+
+        detections: List[List[Detection]] = []
+        for frame, r0 in zip(frames, results):
+            h, w = frame.shape[:2]
+            detections.append(_filter_boxes(r0, self.names, w, h, min_conf, min_bbox_area_ratio))
+        return detections
+
+    def _serve_connection(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, ConnectionResetError):
+                    return
+
+                try:
+                    resp = {"ok": True, "result": self.handle(request)}
+                except Exception as e:  # noqa: BLE001 - devolvido ao cliente
+                    resp = {"ok": False, "error": str(e), "error_type": type(e).__name__}
+                conn.send(resp)
+
+    def serve_forever(self, address: str = DEFAULT_ADDRESS) -> None:
+        # antes de abrir a porta: endereço fora do loopback ou sem chave -> erro
+        bind = check_address(address)
+        authkey = server_authkey(create=True)
+        with Listener(bind, authkey=authkey) as listener:
+            print(f"Servidor de inferência em {address} (modelo carregado em {self.load_time_s:.2f}s)")
+            while True:
+                try:
+                    conn = listener.accept()
+                except AuthenticationError:
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+
+def main():
+    address = os.getenv("VIDEO_SERVER", DEFAULT_ADDRESS)
+    check_address(address)  # falha antes de carregar o modelo
+    server = ModelServer(
+        model_path=os.getenv("VIDEO_MODEL", "yolov8n.pt"),
+        backend=os.getenv("VIDEO_BACKEND", "torch"),
+    )
+    server.serve_forever(address)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Callable, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_SENTINEL = object()
+_POLL_S = 0.1
+
+
+def _put(q: "queue.Queue[object]", item: object, stop: threading.Event) -> bool:
+    """
+    put() bloqueante que desiste se `stop` for sinalizado.
+    Retorna False quando o item não foi entregue.
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_S)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def threaded_producer(items: Iterable[T], maxsize: int = 32, name: str = "producer") -> Iterator[T]:
+    """
+    Consome `items` em uma thread dedicada e entrega os itens, na mesma ordem,
+    através de uma fila limitada (backpressure: a thread para quando a fila enche).
+
+    Exceções levantadas pelo produtor são re-levantadas no consumidor.
+    """
+    q: "queue.Queue[object]" = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+    errors: List[BaseException] = []
+
+    def _run() -> None:
+        try:
+            for item in items:
+                if not _put(q, item, stop):
+                    return
+        except BaseException as e:  # noqa: BLE001 - repassado ao consumidor
+            errors.append(e)
+        finally:
+            _put(q, _SENTINEL, stop)
+
+    t = threading.Thread(target=_run, name=name, daemon=True)
+    t.start()
+
+    try:
+        while True:
+            item = q.get()
+            if item is _SENTINEL:
+                break
+            yield item  # type: ignore[misc]
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
+        t.join()
+
+
+class ThreadedConsumer(Generic[T]):
+    """
+    Executa `fn(item)` em uma thread dedicada, na ordem de chegada dos itens,
+    com fila limitada entre quem produz e a thread consumidora.
+
+    Uso:
+        consumer = ThreadedConsumer(fn, maxsize=32)
+        consumer.put(item)  # bloqueia se a fila estiver cheia
+        consumer.close()    # espera esvaziar e re-levanta erros do consumidor
+    """
+
+    def __init__(self, fn: Callable[[T], None], maxsize: int = 32, name: str = "consumer") -> None:
+        self._fn = fn
+        self._q: "queue.Queue[object]" = queue.Queue(maxsize=max(1, maxsize))
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._q.get(timeout=_POLL_S)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            if item is _SENTINEL or self._stop.is_set():
+                return
+            try:
+                self._fn(item)  # type: ignore[arg-type]
+            except BaseException as e:  # noqa: BLE001 - repassado em put()/close()
+                self._error = e
+                self._stop.set()
+                return
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def put(self, item: T) -> None:
+        self._raise_if_failed()
+        if not _put(self._q, item, self._stop):
+            self._raise_if_failed()
+
+    def close(self) -> None:
+        """Espera a fila esvaziar e re-levanta erros do consumidor."""
+        _put(self._q, _SENTINEL, self._stop)
+        self._thread.join()
+        self._raise_if_failed()
+
+    def abort(self) -> None:
+        """Interrompe o consumidor sem esperar a fila esvaziar."""
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+BBox = Tuple[float, float, float, float]  # (x1, y1, x2, y2)
+
+
+def iou(a: BBox, b: BBox) -> float:
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    if inter <= 0.0:
+        return 0.0
+    area_a = max(0.0, a[2] - a[0]) * max(0.0, a[3] - a[1])
+    area_b = max(0.0, b[2] - b[0]) * max(0.0, b[3] - b[1])
+    return inter / (area_a + area_b - inter)
+
+
+@dataclass
+class Track:
+    track_id: int
+    bbox: BBox
+    confidence: float
+    label: Optional[str] = None
+    frames_since_detect: int = 0
+
+
+class BoxTracker:
+    """
+    Rastreador leve de boxes entre keyframes.
+
+    - update(): chamado nos keyframes com as detecções do YOLO; associa cada
+      detecção a um track existente por IoU (guloso), mantendo o track_id, e
+      cria tracks novos para as não associadas. Tracks sem detecção somem.
+    - propagate(): chamado nos frames intermediários; desloca cada box pelo
+      deslocamento mediano do fluxo óptico (Lucas-Kanade) dos pontos dentro
+      dela e decai a confiança. Se algum track perde pontos demais ou cai
+      abaixo de min_conf, `degraded` fica True e o chamador deve re-detectar.
+      Boxes deslocadas são recortadas aos limites do frame; o track cuja box
+      sai inteira do frame é descartado (sem marcar `degraded`).
+
+    O fluxo óptico roda numa versão reduzida do frame (largura <= work_width).
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        conf_decay: float = 0.97,
+        min_conf: float = 0.0,
+        min_points: int = 4,
+        scene_change_threshold: float = 30.0,
+        work_width: int = 480,
+        first_id: int = 1,
+    ) -> None:
+        self.iou_threshold = iou_threshold
+        self.conf_decay = conf_decay
+        self.min_conf = min_conf
+        self.min_points = min_points
+        self.scene_change_threshold = scene_change_threshold
+        self.work_width = work_width
+
+        self.tracks: List[Track] = []
+        self.degraded = False
+        self._next_id = first_id
+        self._prev_gray: Optional[np.ndarray] = None
+        self._scale = 1.0
+
+    @property
+    def next_id(self) -> int:
+        """track_id que o próximo track novo vai receber (para continuar a numeração ao retomar)."""
+        return self._next_id
+
+    def prepare(self, frame_bgr: np.ndarray) -> np.ndarray:
+        """Converte o frame para a imagem em tons de cinza (reduzida) usada pelo rastreador."""
+        h, w = frame_bgr.shape[:2]
+        self._scale = min(1.0, self.work_width / float(w))
+        if self._scale < 1.0:
+            frame_bgr = cv2.resize(
+                frame_bgr,
+                (int(w * self._scale), int(h * self._scale)),
+                interpolation=cv2.INTER_AREA,
+            )
+        return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+
+    def is_scene_change(self, gray: np.ndarray) -> bool:
+        if self._prev_gray is None or self._prev_gray.shape != gray.shape:
+            return True
+        return float(cv2.absdiff(self._prev_gray, gray).mean()) > self.scene_change_threshold
+
+    def update(
+        self,
+        gray: np.ndarray,
+        detections: Sequence[Tuple[BBox, float, Optional[str]]],
+    ) -> List[Track]:
+        # pares (iou, track, detecção) em ordem decrescente de IoU
+        pairs = sorted(
+            (
+                (iou(t.bbox, det[0]), ti, di)
+                for ti, t in enumerate(self.tracks)
+                for di, det in enumerate(detections)
+            ),
+            reverse=True,
+        )
+
+        matched_tracks = set()
+        det_to_id = {}
+        for score, ti, di in pairs:
+            if score < self.iou_threshold:
+                break
+            if ti in matched_tracks or di in det_to_id:
+                continue
+            matched_tracks.add(ti)
+            det_to_id[di] = self.tracks[ti].track_id
+
+        tracks: List[Track] = []
+        for di, (bbox, conf, label) in enumerate(detections):
+            track_id = det_to_id.get(di)
+            if track_id is None:
+                track_id = self._next_id
+                self._next_id += 1
+            tracks.append(Track(track_id=track_id, bbox=bbox, confidence=conf, label=label))
+
+        self.tracks = tracks
+        self.degraded = False
+        self._prev_gray = gray
+        return self.tracks
+
+    def propagate(self, gray: np.ndarray) -> List[Track]:
+        prev = self._prev_gray
+        self._prev_gray = gray
+        if prev is None or prev.shape != gray.shape:
+            self.degraded = True
+            return self.tracks
+
+        alive: List[Track] = []
+        for t in self.tracks:
+            shifted = self._shift(prev, gray, t.bbox)
+            conf = t.confidence * self.conf_decay
+            if shifted is None or conf < self.min_conf:
+                self.degraded = True
+                continue
+            if shifted[2] <= shifted[0] or shifted[3] <= shifted[1]:
+                continue  # saiu do frame
+            t.bbox = shifted
+            t.confidence = conf
+            t.frames_since_detect += 1
+            alive.append(t)
+
+        self.tracks = alive
+        return self.tracks
+
+    def _shift(self, prev: np.ndarray, gray: np.ndarray, bbox: BBox) -> Optional[BBox]:
+        s = self._scale
+        gh, gw = prev.shape[:2]
+        x1 = int(max(0, min(gw - 1, bbox[0] * s)))
+        y1 = int(max(0, min(gh - 1, bbox[1] * s)))
+        x2 = int(max(x1 + 1, min(gw, bbox[2] * s)))
+        y2 = int(max(y1 + 1, min(gh, bbox[3] * s)))
+
+        roi = prev[y1:y2, x1:x2]
+        pts = cv2.goodFeaturesToTrack(roi, maxCorners=30, qualityLevel=0.01, minDistance=3)
+        if pts is None or len(pts) < self.min_points:
+            return None
+        pts = pts.astype(np.float32) + np.array([x1, y1], dtype=np.float32)
+
+        nxt, status, _ = cv2.calcOpticalFlowPyrLK(prev, gray, pts, None, winSize=(15, 15), maxLevel=2)
+        if nxt is None:
+            return None
+        good = status.reshape(-1) == 1
+        if int(good.sum()) < self.min_points:
+            return None
+
+        dx, dy = np.median((nxt - pts).reshape(-1, 2)[good], axis=0) / s
+        w, h = gw / s, gh / s
+        return (
+            min(w, max(0.0, bbox[0] + float(dx))),
+            min(h, max(0.0, bbox[1] + float(dy))),
+            min(w, max(0.0, bbox[2] + float(dx))),
+            min(h, max(0.0, bbox[3] + float(dy))),
+        )
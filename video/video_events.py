@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 
-@dataclass
+from fusion.timestamps import format_ts
+
+
+@dataclass(slots=True)
 class VideoEvent:
     type: str
     event: str
@@ -12,3 +17,107 @@ class VideoEvent:
     timestamp: str
     bbox: Optional[Tuple[float, float, float, float]] = None  # (x1, y1, x2, y2)
     label: Optional[str] = None
+    track_id: Optional[int] = None  # só no modo de rastreamento (detect_every > 1)
+
+
+class VideoEventTable:
+    """
+    Eventos de vídeo em colunas (array.array, ~46 bytes por detecção), em vez
+    de um VideoEvent por box por frame.
+
+    Funciona como uma sequência de VideoEvent (len, índice, iteração — cada
+    item é montado sob demanda) e columns() expõe as colunas como np.ndarray
+    para agregação vetorizada (ver video/episodes.py). Todos os eventos têm o
+    mesmo tipo (event).
+    """
+
+    def __init__(self, event: str = "anomalous_bleeding", frame_size: Optional[Tuple[int, int]] = None) -> None:
+        self.event = event
+        self.frame_size = frame_size  # (w, h), para áreas relativas
+        self._frame_idx = array("q")
+        self._time_s = array("d")
+        self._confidence = array("d")
+        self._bbox = array("f")  # x1, y1, x2, y2 intercalados
+        self._track_id = array("i")  # -1 = sem track
+        self._label = array("h")  # índice em self.labels
+        self.labels: List[Optional[str]] = []
+        self._label_codes: Dict[Optional[str], int] = {}
+
+    def _label_code(self, label: Optional[str]) -> int:
+        code = self._label_codes.get(label)
+        if code is None:
+            code = self._label_codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def append_frame(
+        self,
+        frame_idx: int,
+        time_s: float,
+        detections: Sequence[Tuple[Tuple[float, float, float, float], float, Optional[str]]],
+        track_ids: Optional[Sequence[int]] = None,
+    ) -> None:
+        """Adiciona as detecções (bbox, conf, label) de um frame."""
+        for i, (bbox, conf, label) in enumerate(detections):
+            self._frame_idx.append(frame_idx)
+            self._time_s.append(time_s)
+            self._confidence.append(conf)
+            self._bbox.extend(bbox)
+            self._track_id.append(-1 if track_ids is None else track_ids[i])
+            self._label.append(self._label_code(label))
+
+    def extend(self, other: "VideoEventTable", track_id_offset: int = 0) -> None:
+        """Acrescenta as linhas de other (track_ids somados a track_id_offset, -1 continua -1)."""
+        codes = array("h", (self._label_code(label) for label in other.labels))
+        self._frame_idx.extend(other._frame_idx)
+        self._time_s.extend(other._time_s)
+        self._confidence.extend(other._confidence)
+        self._bbox.extend(other._bbox)
+        if track_id_offset:
+            self._track_id.extend(t + track_id_offset if t >= 0 else t for t in other._track_id)
+        else:
+            self._track_id.extend(other._track_id)
+        self._label.extend(codes[c] for c in other._label)
+
+    def max_track_id(self) -> int:
+        """Maior track_id da tabela (0 se não houver tracks)."""
+        return max(0, max(self._track_id, default=0))
+
+    def __len__(self) -> int:
+        return len(self._time_s)
+
+    def __getitem__(self, i: int) -> VideoEvent:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        track_id = self._track_id[i]
+        return VideoEvent(
+            type="video_event",
+            event=self.event,
+            confidence=float(self._confidence[i]),
+            timestamp=format_ts(self._time_s[i]),
+            bbox=tuple(float(v) for v in self._bbox[4 * i:4 * i + 4]),  # type: ignore[arg-type]
+            label=self.labels[self._label[i]],
+            track_id=None if track_id < 0 else track_id,
+        )
+
+    def __iter__(self) -> Iterator[VideoEvent]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Cópias NumPy das colunas: frame_idx, time_s, confidence, bbox (N x 4), track_id, label."""
+        return {
+            "frame_idx": np.frombuffer(self._frame_idx, dtype=np.int64).copy(),
+            "time_s": np.frombuffer(self._time_s, dtype=np.float64).copy(),
+            "confidence": np.frombuffer(self._confidence, dtype=np.float64).copy(),
+            "bbox": np.frombuffer(self._bbox, dtype=np.float32).reshape(-1, 4).copy(),
+            "track_id": np.frombuffer(self._track_id, dtype=np.int32).copy(),
+            "label": np.frombuffer(self._label, dtype=np.int16).copy(),
+        }
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (
+            self._frame_idx, self._time_s, self._confidence, self._bbox, self._track_id, self._label
+        ))
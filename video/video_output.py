@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+OUTPUT_MODES = ("none", "events_only", "full")
+EVENT_FORMATS = ("clip", "jpg")
+
+# Gera o frame anotado sob demanda (só é chamado quando a saída precisa dele)
+RenderFn = Callable[[], np.ndarray]
+
+
+class _NullOutput:
+    """output_mode="none": não escreve nada (nem copia frames)."""
+
+    def __init__(self) -> None:
+        self.paths: List[str] = []
+
+    def write(self, frame_idx: int, frame: np.ndarray, render: RenderFn, has_events: bool) -> None:
+        return None
+
+    def checkpoint(self) -> Dict[str, Any]:
+        return {}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+class _FullVideoOutput:
+    """
+    output_mode="full": re-encoda o vídeo inteiro, anotado.
+
+    parts=True (execuções com checkpoint): um arquivo por trecho entre
+    checkpoints, annotated_<stem>.<frame inicial>.mp4, aberto no primeiro
+    frame depois do checkpoint.
+    """
+
+    def __init__(self, out_dir: Path, stem: str, fps: float, size: Tuple[int, int], parts: bool = False) -> None:
+        self._out_dir = out_dir
+        self._stem = stem
+        self._fps = fps
+        self._size = size
+        self._parts = parts
+        self._writer: Optional[cv2.VideoWriter] = None
+        self.paths: List[str] = []
+        if not parts:
+            self._open(f"annotated_{stem}.mp4")
+
+    def _open(self, name: str) -> None:
+        path = self._out_dir / name
+        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        self._writer = cv2.VideoWriter(str(path), fourcc, self._fps, self._size)
+        self.paths.append(str(path))
+
+    def write(self, frame_idx: int, frame: np.ndarray, render: RenderFn, has_events: bool) -> None:
+        if self._writer is None:
+            self._open(f"annotated_{self._stem}.{frame_idx:07d}.mp4")
+        assert self._writer is not None
+        self._writer.write(_fit(render(), self._size))
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """Fecha a parte atual: todos os arquivos em paths ficam completos."""
+        if not self._parts:
+            raise ValueError('output_mode="full" com checkpoint precisa de parts=True')
+        self.close()
+        return {}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        return None
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.release()
+        self._writer = None
+
+
+class _EventOutput:
+    """
+    output_mode="events_only": grava apenas trechos em volta dos frames com
+    evento. Cada trecho ("episódio") vai de pad_before_s antes do primeiro
+    frame com evento até pad_after_s depois do último; eventos que se
+    sobrepõem ao padding estendem o mesmo episódio.
+
+    - format="clip": um mp4 por episódio (event_<stem>_<frame>.mp4)
+    - format="jpg": um diretório por episódio com um JPEG por frame
+
+    Frames com evento são gravados anotados; os de padding, crus.
+
+    checkpoint() fecha o clipe aberto sem encerrar o episódio: os próximos
+    frames dele vão para event_<stem>_<frame>.<frame de continuação>.mp4, e
+    o estado do episódio (padding posterior pendente) volta com restore()
+    numa execução retomada.
+    """
+
+    def __init__(
+        self,
+        out_dir: Path,
+        stem: str,
+        fps: float,
+        size: Tuple[int, int],
+        pad_before_s: float,
+        pad_after_s: float,
+        fmt: str,
+    ) -> None:
+        self._out_dir = out_dir
+        self._stem = stem
+        self._fps = fps
+        self._size = size
+        self._fmt = fmt
+        self._pad_after = max(0, int(round(pad_after_s * fps)))
+
+        # frames crus mais recentes, para o padding anterior ao evento
+        self._before: Deque[Tuple[int, np.ndarray]] = deque(maxlen=max(0, int(round(pad_before_s * fps))))
+
+        self._writer: Optional[cv2.VideoWriter] = None
+        self._episode_dir: Optional[Path] = None
+        self._episode_first: Optional[int] = None  # frame inicial do episódio aberto
+        self._after_left = 0
+        self.paths: List[str] = []
+
+    def write(self, frame_idx: int, frame: np.ndarray, render: RenderFn, has_events: bool) -> None:
+        if has_events:
+            if not self._is_open():
+                first_idx = self._before[0][0] if self._before else frame_idx
+                self._open(first_idx)
+                for idx, raw in self._before:
+                    self._put(idx, raw)
+                self._before.clear()
+            self._put(frame_idx, render())
+            self._after_left = self._pad_after
+        elif self._is_open() and self._after_left > 0:
+            self._put(frame_idx, frame)
+            self._after_left -= 1
+            if self._after_left == 0:
+                self._close_episode()
+        else:
+            if self._is_open():
+                self._close_episode()
+            if self._before.maxlen:
+                self._before.append((frame_idx, frame))
+
+    def checkpoint(self) -> Dict[str, Any]:
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None  # reaberto (nova parte) no próximo frame do episódio
+        # os frames de padding anterior em memória não voltam numa retomada
+        return {"episode_first": self._episode_first, "after_left": self._after_left}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self._episode_first = state.get("episode_first")
+        self._after_left = state.get("after_left", 0)
+        if self._episode_first is not None and self._fmt == "jpg":
+            self._episode_dir = self._out_dir / f"event_{self._stem}_{self._episode_first:07d}"
+
+    def close(self) -> None:
+        self._close_episode()
+        self._before.clear()
+
+    def _is_open(self) -> bool:
+        return self._episode_first is not None
+
+    def _open(self, first_idx: int) -> None:
+        self._episode_first = first_idx
+        name = f"event_{self._stem}_{first_idx:07d}"
+        if self._fmt == "clip":
+            path = self._out_dir / f"{name}.mp4"
+            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+            self._writer = cv2.VideoWriter(str(path), fourcc, self._fps, self._size)
+        else:
+            path = self._out_dir / name
+            path.mkdir(parents=True, exist_ok=True)
+            self._episode_dir = path
+        self.paths.append(str(path))
+
+    def _put(self, frame_idx: int, frame: np.ndarray) -> None:
+        frame = _fit(frame, self._size)
+        if self._writer is None and self._fmt == "clip" and self._episode_first is not None:
+            # continuação do episódio depois de um checkpoint
+            path = self._out_dir / f"event_{self._stem}_{self._episode_first:07d}.{frame_idx:07d}.mp4"
+            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+            self._writer = cv2.VideoWriter(str(path), fourcc, self._fps, self._size)
+            self.paths.append(str(path))
+        if self._writer is not None:
+            self._writer.write(frame)
+        elif self._episode_dir is not None:
+            cv2.imwrite(str(self._episode_dir / f"frame_{frame_idx:07d}.jpg"), frame)
+
+    def _close_episode(self) -> None:
+        if self._writer is not None:
+            self._writer.release()
+        self._writer = None
+        self._episode_dir = None
+        self._episode_first = None
+        self._after_left = 0
+
+
+def _fit(frame: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    # garantir tamanho
+    if frame.shape[1] != size[0] or frame.shape[0] != size[1]:
+        frame = cv2.resize(frame, size)
+    return frame
+
+
+def open_video_output(
+    mode: str,
+    out_dir: Path,
+    stem: str,
+    fps: float,
+    size: Tuple[int, int],
+    pad_before_s: float = 2.0,
+    pad_after_s: float = 2.0,
+    event_format: str = "clip",
+    parts: bool = False,
+):
+    """
+    Cria a saída anotada de run_video_inference conforme o modo:
+      - "none": nada é escrito
+      - "events_only": só trechos em volta dos eventos (clipes ou JPEGs)
+      - "full": results/video_outputs/annotated_<stem>.mp4 (vídeo inteiro)
+
+    O objeto retornado expõe write(frame_idx, frame, render, has_events),
+    close(), paths (arquivos/diretórios gerados) e, para os checkpoints de
+    run_video_inference, checkpoint() (fecha os arquivos abertos e devolve
+    o estado a persistir) e restore(estado). parts=True é obrigatório para
+    "full" com checkpoint: o vídeo sai em uma parte por checkpoint.
+    """
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"output_mode inválido: {mode} (opções: {', '.join(OUTPUT_MODES)})")
+    if event_format not in EVENT_FORMATS:
+        raise ValueError(f"event_format inválido: {event_format} (opções: {', '.join(EVENT_FORMATS)})")
+
+    if mode == "none":
+        return _NullOutput()
+    if mode == "full":
+        return _FullVideoOutput(out_dir, stem, fps, size, parts=parts)
+    return _EventOutput(out_dir, stem, fps, size, pad_before_s, pad_after_s, event_format)
@@ -0,0 +1,91 @@
+"""
+Pool de processos para inferência em paralelo, compartilhado pelo lote
+(batch/orchestrator.py) e pelos trechos de vídeo longo (video/long_video.py).
+
+- capped_process_pool: ProcessPoolExecutor com spawn (sem herdar threads
+  nem estado do CUDA/OpenMP do pai) em que cada worker usa `threads`
+  threads (OpenCV, torch e as variáveis OMP/MKL/OPENBLAS). As variáveis
+  valem só enquanto o pool existe (os workers são criados sob demanda, nos
+  submit) e o ambiente do chamador volta ao que era na saída.
+- worker_model: o YOLO carregado uma vez por processo worker e reaproveitado
+  nos jobs seguintes.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import cv2
+
+from telemetry import metrics
+
+# lidas pelo OpenMP/MKL/OpenBLAS quando a biblioteca é carregada no worker
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+_worker_models: Dict[Tuple[str, str], Tuple[Any, str]] = {}
+
+
+def default_workers(threads: int) -> int:
+    """Workers para ocupar os núcleos com `threads` threads cada."""
+    return max(1, (os.cpu_count() or 1) // max(1, threads))
+
+
+def _init_worker(threads: int, metrics_enabled: bool) -> None:
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    metrics.configure(enabled=metrics_enabled)
+
+
+@contextmanager
+def capped_process_pool(
+    max_workers: int,
+    threads: int,
+    metrics_enabled: Optional[bool] = None,
+) -> Iterator[ProcessPoolExecutor]:
+    """
+    with capped_process_pool(4, threads=1) as pool: ...
+
+    metrics_enabled (padrão: o estado do registro do pai) liga as métricas
+    nos workers. Na saída espera os jobs em andamento, cancela os que não começaram e
+    restaura OMP/MKL/OPENBLAS_NUM_THREADS do chamador.
+    """
+    threads = max(1, threads)
+    saved: Dict[str, Optional[str]] = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    try:
+        pool = ProcessPoolExecutor(
+            max_workers=max(1, max_workers),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads, metrics.REGISTRY.enabled if metrics_enabled is None else metrics_enabled),
+        )
+        try:
+            yield pool
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def worker_model(model_path: str, backend: str = "torch") -> Tuple[Any, str]:
+    """(modelo, device) de load_model, carregado (com warm-up) uma vez por processo."""
+    key = (model_path, backend)
+    loaded = _worker_models.get(key)
+    if loaded is None:
+        from video.inference_video import load_model
+
+        loaded = _worker_models[key] = load_model(model_path, backend, warmup=True)
+    return loaded